@@ -0,0 +1,188 @@
+"""FastAPI 앱을 통해 업로드부터 SPARQL까지 주요 경로의 처리량과 지연 시간을 측정합니다.
+
+    python benchmark.py --documents 20 --pages 8 --language mixed --table-density 0.3
+    python benchmark.py --compare benchmark_results/이전결과.json
+
+앱은 작업 디렉토리 기준으로 uploads/, parsed/ 등을 만들기 때문에 임시 디렉토리(--workdir)로
+이동한 뒤 불러옵니다. 결과는 benchmark_results/{시각}_{커밋}.json에 저장되어 커밋끼리 비교할 수 있습니다.
+"""
+from typing import Callable, Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from create_test_pdf import create_corpus
+
+KOREAN_QUERIES = ["문서 파싱", "성능 측정", "서울 연구소", "데이터 모델"]
+ENGLISH_QUERIES = ["document parsing", "performance measure", "Seoul laboratory", "data model"]
+SPARQL_QUERIES = [
+    "PREFIX schema: <https://schema.org/> SELECT ?d ?name WHERE { ?d schema:name ?name }",
+    "PREFIX schema: <https://schema.org/> SELECT ?d ?k WHERE { ?d schema:keywords ?k } LIMIT 100",
+    "PREFIX schema: <https://schema.org/> SELECT ?e (COUNT(?d) AS ?n) WHERE { ?d schema:mentions ?e } GROUP BY ?e"
+]
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def summarize(latencies: List[float], errors: int, elapsed: float, units: int) -> Dict:
+    """지연 시간 목록(초)으로 p50/p99와 초당 처리량을 계산합니다."""
+    values = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "total_s": round(elapsed, 4),
+        "throughput_per_s": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "units_per_s": round(units / elapsed, 3) if elapsed else 0.0,
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+class Benchmark:
+    def __init__(self, client):
+        self.client = client
+        self.stages: Dict[str, Dict] = {}
+
+    def run(self, stage: str, calls: List[Callable], units_per_call: int = 1):
+        """calls를 차례로 실행하여 단계별 통계를 남깁니다. 2xx가 아닌 응답은 오류로 셉니다."""
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for call in calls:
+            start = time.perf_counter()
+            response = call()
+            latency = time.perf_counter() - start
+            if 200 <= response.status_code < 300:
+                latencies.append(latency)
+            else:
+                errors += 1
+                print(f"  {stage}: {response.status_code} {response.text[:200]}", file=sys.stderr)
+        elapsed = time.perf_counter() - started
+        self.stages[stage] = summarize(latencies, errors, elapsed, len(latencies) * units_per_call)
+        result = self.stages[stage]
+        print(
+            f"{stage:<16} n={result['count']:<5} err={result['errors']:<3} "
+            f"{result['throughput_per_s']:>9.2f}/s  p50={result['p50_ms']:>9.2f}ms  p99={result['p99_ms']:>9.2f}ms"
+        )
+
+def run_benchmark(args) -> Dict:
+    corpus_dir = Path(args.workdir) / "corpus"
+    print(f"합성 문서 생성: {args.documents}개 x {args.pages}쪽 ({args.language}, 표 비율 {args.table_density})")
+    generate_start = time.perf_counter()
+    paths = create_corpus(corpus_dir, args.documents, args.pages, args.language, args.table_density, args.seed)
+    generate_s = time.perf_counter() - generate_start
+
+    # 앱이 만드는 디렉토리가 작업 디렉토리 아래에 생기도록 이동한 뒤 불러옴
+    os.chdir(args.workdir)
+    from fastapi.testclient import TestClient
+    import main
+
+    client = TestClient(main.app)
+    bench = Benchmark(client)
+    names = [path.name for path in paths]
+    payloads = {path.name: path.read_bytes() for path in paths}
+    queries = (KOREAN_QUERIES if args.language != "en" else []) + (ENGLISH_QUERIES if args.language != "ko" else [])
+
+    bench.run("upload", [
+        (lambda name=name: client.post("/upload/", files={"file": (name, payloads[name], "application/pdf")}))
+        for name in names
+    ])
+    bench.run("parse", [(lambda name=name: client.post(f"/parse/{name}")) for name in names], args.pages)
+    bench.run("search", [
+        (lambda query=query: client.get("/search/", params={"query": query}))
+        for _ in range(args.iterations) for query in queries
+    ])
+    bench.run("semantic_search", [
+        (lambda query=query: client.get("/semantic-search/", params={"query": query}))
+        for _ in range(args.iterations) for query in queries
+    ])
+    bench.run("analysis", [(lambda name=name: client.get(f"/files/{name}/analysis")) for name in names])
+    bench.run("analysis_cached", [(lambda name=name: client.get(f"/files/{name}/analysis")) for name in names])
+    bench.run("convert_all", [(lambda name=name: client.post(f"/files/{name}/convert-all")) for name in names])
+    bench.run("sparql", [
+        (lambda query=query: client.post("/sparql", params={"query": query}))
+        for _ in range(args.iterations) for query in SPARQL_QUERIES
+    ])
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "documents": args.documents,
+            "pages": args.pages,
+            "language": args.language,
+            "table_density": args.table_density,
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "corpus_bytes": sum(len(data) for data in payloads.values()),
+            "generate_s": round(generate_s, 3)
+        },
+        "stages": bench.stages
+    }
+
+def compare(current: Dict, baseline: Dict):
+    """이전 결과와 단계별 p50/p99/처리량 변화율을 출력합니다."""
+    print(f"\n비교 기준: {baseline.get('commit')} ({baseline.get('created_at')})")
+    for stage, result in current["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous:
+            continue
+        changes = []
+        for key in ("p50_ms", "p99_ms", "throughput_per_s"):
+            if previous[key]:
+                changes.append(f"{key} {(result[key] - previous[key]) / previous[key] * 100:+.1f}%")
+        print(f"{stage:<16} " + "  ".join(changes))
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="문서 파이프라인 벤치마크")
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--language", choices=["ko", "en", "mixed"], default="mixed")
+    parser.add_argument("--table-density", type=float, default=0.3)
+    parser.add_argument("--iterations", type=int, default=5, help="검색/SPARQL 쿼리 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="앱 데이터 디렉토리 (기본: 새 임시 디렉토리)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: benchmark_results/{시각}_{커밋}.json)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    args.workdir = str(Path(args.workdir or tempfile.mkdtemp(prefix="parse-bench-")).resolve())
+    Path(args.workdir).mkdir(parents=True, exist_ok=True)
+    output = Path(args.output).resolve() if args.output else None
+    baseline_path = Path(args.compare).resolve() if args.compare else None
+
+    result = run_benchmark(args)
+
+    if output is None:
+        output = BACKEND_DIR / "benchmark_results" / f"{datetime.now():%Y%m%d-%H%M%S}_{result['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+    if baseline_path:
+        with baseline_path.open("r", encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+if __name__ == "__main__":
+    main_cli()
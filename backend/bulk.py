@@ -0,0 +1,367 @@
+"""디렉토리 아래의 PDF를 API 서버 없이 한꺼번에 파싱 → 분석 → 변환 → RDF 내보내기합니다.
+
+    python bulk.py 문서디렉토리 --processes 8
+    python bulk.py 문서디렉토리 --workdir /srv/parse-ai --formats markdown,html --analyses analysis,entities
+
+앱과 같은 파이프라인(main.py)을 쓰므로 결과는 workdir(앱 데이터 디렉토리)의 uploads/, parsed/, converted/,
+rdf_store/ 등에 저장되어 API 서버에서 바로 조회할 수 있습니다. 문서 이름은 입력 디렉토리 기준 상대 경로의 '/'를
+'__'로 바꾼 이름입니다. 파일마다 끝난 단계를 체크포인트(SQLite)에 바로 기록하므로, 중단된 뒤 다시 실행하면
+바뀌지 않은 파일과 이미 끝난 단계는 건너뜁니다. 실패한 단계는 다음 실행 때 다시 시도합니다.
+"""
+from typing import Dict, Iterator, List, Optional
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from collections import Counter
+from functools import partial
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+DEFAULT_ANALYSES = "analysis,entities"
+# 색인은 부모 프로세스가 순서대로 갱신 (의미 검색 색인 파일은 프로세스 하나만 써야 함)
+INDEX_STAGE = "index"
+
+# 작업 프로세스마다 불러 둔 앱 모듈
+app = None
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def document_name(path: Path, root: Path) -> str:
+    return path.relative_to(root).as_posix().replace("/", "__")
+
+class Checkpoint:
+    """입력 파일별 크기, mtime, SHA-256과 끝난 단계를 기록합니다. 부모 프로세스만 씁니다."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT,
+                done TEXT NOT NULL,
+                errors TEXT,
+                pages INTEGER,
+                seconds REAL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, path: str) -> Optional[Dict]:
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, sha256, done, errors FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "size": row[0],
+            "mtime_ns": row[1],
+            "sha256": row[2],
+            "done": json.loads(row[3]),
+            "errors": json.loads(row[4]) if row[4] else {}
+        }
+
+    def record(self, result: Dict):
+        # 파일 하나가 끝날 때마다 커밋 (중단되어도 여기까지는 다시 하지 않음)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, name, size, mtime_ns, sha256, done, errors, pages, seconds, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (result["path"], result["name"], result["size"], result["mtime_ns"], result["sha256"],
+                 json.dumps(sorted(result["done"])), json.dumps(result["errors"], ensure_ascii=False) if result["errors"] else None,
+                 result["pages"], result["seconds"], time.time())
+            )
+
+    def close(self):
+        self._conn.close()
+
+def init_process(workdir: str, level: int):
+    """작업 프로세스 초기화: 앱 데이터 디렉토리로 이동한 뒤 앱 모듈을 불러옵니다."""
+    global app
+    os.chdir(workdir)
+    logging.basicConfig(level=level, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    import main
+    app = main
+
+def run_stage(stage: str, name: str, source: Path, ocr: bool) -> Optional[Dict]:
+    kind, _, arg = stage.partition(":")
+    if kind == "parse":
+        upload_path = app.UPLOAD_DIR / name
+        app.UPLOAD_DIR.mkdir(exist_ok=True)
+        if source.resolve() != upload_path.resolve():
+            shutil.copy2(source, upload_path)
+        app.BLOBS.push(upload_path)
+        return app.process_parse(name, ocr=ocr, index=False)
+    if kind == "analysis":
+        return app.cached_analysis(arg, name, partial(app.ANALYZERS[arg], name))
+    if kind == "convert":
+        app.render_conversion(name, arg)
+        return None
+    if kind == "rdf":
+        # 분석 결과(키워드, 개체)까지 포함해 다시 내보냄
+        app.emit_rdf(name)
+        return None
+    raise ValueError(f"알 수 없는 단계입니다: {stage}")
+
+def process_file(job: Dict) -> Dict:
+    """파일 하나의 남은 단계를 순서대로 처리합니다. 작업 프로세스에서 실행됩니다."""
+    start = time.perf_counter()
+    source = Path(job["path"])
+    stat = source.stat()
+    digest = file_sha256(source)
+    # 내용이 바뀌었으면 처음부터 다시 (mtime만 바뀐 경우는 이전 결과를 그대로 씀)
+    done = set(job["done"]) if digest == job["sha256"] else set()
+    result = {
+        "path": job["path"],
+        "name": job["name"],
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest,
+        "done": done,
+        "errors": {},
+        "pages": job.get("pages"),
+        "parsed": False,
+        "stage_seconds": {}
+    }
+
+    stages = app.begin_stages()
+    for stage in job["stages"]:
+        if stage in done:
+            continue
+        stage_start = time.perf_counter()
+        try:
+            output = run_stage(stage, job["name"], source, job["ocr"])
+        except Exception as e:
+            result["errors"][stage] = f"{type(e).__name__}: {str(e)}"
+            if stage == "parse":
+                # 파싱이 안 되면 나머지 단계는 할 수 없음
+                break
+            continue
+        finally:
+            result["stage_seconds"][stage.partition(":")[0]] = (
+                result["stage_seconds"].get(stage.partition(":")[0], 0.0) + time.perf_counter() - stage_start
+            )
+        done.add(stage)
+        if stage.startswith("analysis:"):
+            # 새 분석 결과(키워드, 개체)를 RDF에 반영
+            done.discard("rdf")
+        if stage == "parse":
+            result["parsed"] = True
+            result["pages"] = output["metadata"].get("pages")
+            # 다시 파싱했으면 색인도 다시
+            done.discard(INDEX_STAGE)
+
+    # 파이프라인 세부 단계(pdf_decode, ocr, conversion 등) 시간
+    result["pipeline_seconds"] = dict(stages)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def plan_stages(analyses: List[str], formats: List[str]) -> List[str]:
+    return ["parse"] + [f"analysis:{kind}" for kind in analyses] + [f"convert:{format}" for format in formats] + ["rdf"]
+
+def scan(root: Path, pattern: str) -> Iterator[Path]:
+    for path in sorted(root.rglob(pattern)):
+        if path.is_file():
+            yield path
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+class Progress:
+    """처리한 파일 수, 처리량(파일/초, 페이지/초, MB/초), 남은 시간을 주기적으로 출력합니다."""
+
+    def __init__(self, total: int, total_bytes: int, interval: float):
+        self.total = total
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.last_report = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.unchanged = 0
+        self.pages = 0
+        self.bytes = 0
+        self.stage_seconds: Counter = Counter()
+        self.pipeline_seconds: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def add(self, result: Dict):
+        self.completed += 1
+        self.bytes += result["size"]
+        if result["errors"]:
+            self.failed += 1
+            for stage, error in result["errors"].items():
+                self.errors[f"{stage}: {error[:120]}"] += 1
+        elif not result["stage_seconds"]:
+            self.unchanged += 1
+        if result["parsed"]:
+            self.pages += result["pages"] or 0
+        self.stage_seconds.update(result["stage_seconds"])
+        self.pipeline_seconds.update(result.get("pipeline_seconds", {}))
+        if time.perf_counter() - self.last_report >= self.interval or self.completed == self.total:
+            self.report()
+
+    def report(self):
+        self.last_report = time.perf_counter()
+        elapsed = max(self.last_report - self.start, 1e-9)
+        rate = self.completed / elapsed
+        # 파일 크기가 제각각이므로 남은 시간은 처리한 바이트 기준으로 추정
+        byte_rate = self.bytes / elapsed
+        eta = (self.total_bytes - self.bytes) / byte_rate if byte_rate else 0
+        print(
+            f"[{self.completed}/{self.total}] {self.completed / max(self.total, 1) * 100:5.1f}% "
+            f"{rate:.2f} 파일/s, {self.pages / elapsed:.1f} 페이지/s, {self.bytes / elapsed / 1e6:.2f} MB/s, "
+            f"실패 {self.failed}, 경과 {_format_seconds(elapsed)}, 남은 시간 {_format_seconds(eta)}",
+            flush=True
+        )
+
+    def summary(self, skipped: int) -> Dict:
+        elapsed = time.perf_counter() - self.start
+        return {
+            "files": self.total + skipped,
+            "processed": self.completed - self.unchanged,
+            "skipped": skipped + self.unchanged,
+            "failed": self.failed,
+            "pages": self.pages,
+            "bytes": self.bytes,
+            "elapsed_s": round(elapsed, 3),
+            "files_per_s": round(self.completed / elapsed, 3) if elapsed else None,
+            "pages_per_s": round(self.pages / elapsed, 3) if elapsed else None,
+            "stage_seconds": {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.most_common()},
+            "pipeline_seconds": {stage: round(seconds, 3) for stage, seconds in self.pipeline_seconds.most_common()},
+            "errors": dict(self.errors.most_common(20))
+        }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="디렉토리 일괄 파싱/분석/변환/RDF 내보내기")
+    parser.add_argument("input", help="PDF가 있는 디렉토리 (하위 디렉토리 포함)")
+    parser.add_argument("--workdir", default=".", help="앱 데이터 디렉토리 (uploads/, parsed/ 등의 상위, 기본: 현재 디렉토리)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pattern", default="*.pdf")
+    parser.add_argument("--analyses", default=DEFAULT_ANALYSES, help="analysis, summary, entities 중 실행할 분석 (쉼표로 구분, 빈 값이면 건너뜀)")
+    parser.add_argument("--formats", default=None, help="변환 형식 (쉼표로 구분, 기본: 전부, 빈 값이면 건너뜀)")
+    parser.add_argument("--no-ocr", action="store_true", help="스캔 페이지 OCR을 하지 않음")
+    parser.add_argument("--checkpoint", default=None, help="체크포인트 파일 (기본: {workdir}/bulk_checkpoint.sqlite3)")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="진행 상황 출력 주기(초)")
+    parser.add_argument("--report", default=None, help="처리 결과 요약을 저장할 JSON 경로")
+    parser.add_argument("--max-tasks-per-child", type=int, default=None, help="작업 프로세스를 이 파일 수마다 새로 띄움 (메모리 누수 대비)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    input_root = Path(args.input).resolve()
+    if not input_root.is_dir():
+        parser.error(f"디렉토리가 아닙니다: {input_root}")
+    workdir = Path(args.workdir).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    report_path = Path(args.report).resolve() if args.report else None
+    level = logging.INFO if args.verbose else logging.WARNING
+
+    # 색인을 갱신할 앱 모듈을 부모 프로세스에도 불러옴
+    init_process(str(workdir), level)
+    analyses = [kind.strip() for kind in args.analyses.split(",") if kind.strip()]
+    unknown = [kind for kind in analyses if kind not in app.ANALYZERS]
+    formats = list(app.FORMAT_EXTENSIONS) if args.formats is None else [
+        format.strip() for format in args.formats.split(",") if format.strip()
+    ]
+    unknown += [format for format in formats if format not in app.FORMAT_EXTENSIONS]
+    if unknown:
+        parser.error(f"지원하지 않는 분석 또는 형식입니다: {unknown}")
+    stages = plan_stages(analyses, formats)
+    required = set(stages) | {INDEX_STAGE}
+
+    checkpoint = Checkpoint(Path(args.checkpoint).resolve() if args.checkpoint else workdir / "bulk_checkpoint.sqlite3")
+    jobs = []
+    skipped = 0
+    total_bytes = 0
+    for path in scan(input_root, args.pattern):
+        stat = path.stat()
+        previous = checkpoint.get(str(path))
+        if (previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns
+                and required <= set(previous["done"])):
+            skipped += 1
+            continue
+        jobs.append({
+            "path": str(path),
+            "name": document_name(path, input_root),
+            "sha256": previous["sha256"] if previous and previous["size"] == stat.st_size else None,
+            "done": previous["done"] if previous else [],
+            "stages": stages,
+            "ocr": not args.no_ocr
+        })
+        total_bytes += stat.st_size
+    print(f"입력 {len(jobs) + skipped}개 중 {skipped}개는 바뀌지 않아 건너뜀, {len(jobs)}개 처리 ({args.processes}개 프로세스)", flush=True)
+
+    progress = Progress(len(jobs), total_bytes, args.report_interval)
+    if jobs:
+        # 부모의 스레드와 SQLite 연결을 물려받지 않도록 새 인터프리터로 띄움
+        context = multiprocessing.get_context("spawn")
+        pool = context.Pool(
+            min(args.processes, len(jobs)),
+            initializer=init_process,
+            initargs=(str(workdir), level),
+            maxtasksperchild=args.max_tasks_per_child
+        )
+        try:
+            for result in pool.imap_unordered(process_file, jobs):
+                if result["parsed"] or ("parse" in result["done"] and INDEX_STAGE not in result["done"]):
+                    try:
+                        app.index_document(result["name"])
+                        result["done"].add(INDEX_STAGE)
+                    except Exception as e:
+                        result["errors"][INDEX_STAGE] = f"{type(e).__name__}: {str(e)}"
+                checkpoint.record(result)
+                progress.add(result)
+            pool.close()
+        except KeyboardInterrupt:
+            # 끝난 파일은 체크포인트에 기록되어 있으므로 다시 실행하면 이어서 처리
+            pool.terminate()
+            progress.report()
+            print("중단됨: 다시 실행하면 남은 파일부터 이어서 처리합니다.", flush=True)
+            sys.exit(130)
+        finally:
+            pool.join()
+            checkpoint.close()
+
+    summary = progress.summary(skipped)
+    print(
+        f"\n완료: 처리 {summary['processed']}, 건너뜀 {summary['skipped']}, 실패 {summary['failed']}, "
+        f"{summary['pages']}페이지, {summary['elapsed_s']}초 ({summary['files_per_s']} 파일/s, {summary['pages_per_s']} 페이지/s)"
+    )
+    if summary["stage_seconds"]:
+        print("단계별 누적 시간(초): " + ", ".join(f"{stage} {seconds}" for stage, seconds in summary["stage_seconds"].items()))
+    for error, count in summary["errors"].items():
+        print(f"  실패 {count}건: {error}")
+    if report_path:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with report_path.open("w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {report_path}")
+    sys.exit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    main_cli()
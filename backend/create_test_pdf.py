@@ -1,19 +1,157 @@
 from reportlab.pdfgen import canvas
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.lib.pagesizes import A4
+import argparse
 import os
+import random
+from pathlib import Path
 
-# 현재 스크립트의 디렉토리에 PDF 생성
-pdf_path = "test.pdf"
+# 한글이 텍스트로 추출되도록 CID 글꼴 사용 (글꼴 파일 없이 reportlab 내장 CMap 사용)
+KOREAN_FONT = "HYSMyeongJo-Medium"
+ENGLISH_FONT = "Helvetica"
 
-# PDF 생성
-c = canvas.Canvas(pdf_path)
+KOREAN_WORDS = [
+    "문서", "파싱", "분석", "결과", "데이터", "모델", "성능", "측정", "검색", "색인",
+    "서울", "부산", "대한민국", "삼성전자", "연구소", "대학교", "정부", "보고서", "표", "수식",
+    "처리", "변환", "저장", "요약", "키워드", "개체", "추출", "시스템", "사용자", "플랫폼"
+]
+KOREAN_ENDINGS = ["입니다.", "합니다.", "했습니다.", "됩니다.", "있습니다."]
+ENGLISH_WORDS = [
+    "document", "parsing", "analysis", "result", "data", "model", "performance", "measure",
+    "search", "index", "Seoul", "Busan", "Korea", "Samsung", "laboratory", "university",
+    "government", "report", "table", "equation", "processing", "conversion", "storage",
+    "summary", "keyword", "entity", "extraction", "system", "user", "platform"
+]
 
-# 텍스트 추가 (UTF-8 인코딩 사용)
-text = "테스트 문서입니다.".encode('utf-8').decode('utf-8')
-c.drawString(50, 700, text)
+def _sentence(rng: random.Random, language: str) -> str:
+    if language == "ko":
+        words = rng.choices(KOREAN_WORDS, k=rng.randint(4, 9))
+        return " ".join(words) + " " + rng.choice(KOREAN_ENDINGS)
+    words = rng.choices(ENGLISH_WORDS, k=rng.randint(6, 14))
+    return " ".join(words).capitalize() + "."
 
-# PDF 저장
-c.save() 
\ No newline at end of file
+def _wrap(text: str, font: str, size: float, width: float):
+    line = ""
+    for word in text.split(" "):
+        candidate = f"{line} {word}".strip()
+        if line and pdfmetrics.stringWidth(candidate, font, size) > width:
+            yield line
+            line = word
+        else:
+            line = candidate
+    if line:
+        yield line
+
+def _draw_table(c: canvas.Canvas, rng: random.Random, language: str, font: str, x: float, y: float, width: float) -> float:
+    """격자 선이 있는 표를 그리고 표 아래 y 좌표를 반환합니다."""
+    columns = rng.randint(3, 5)
+    rows = rng.randint(3, 6)
+    column_width = width / columns
+    row_height = 18
+    words = KOREAN_WORDS if language == "ko" else ENGLISH_WORDS
+    c.setFont(font, 9)
+    for row in range(rows + 1):
+        c.line(x, y - row * row_height, x + width, y - row * row_height)
+    for column in range(columns + 1):
+        c.line(x + column * column_width, y, x + column * column_width, y - rows * row_height)
+    for row in range(rows):
+        for column in range(columns):
+            value = rng.choice(words) if row == 0 or column == 0 else str(rng.randint(1, 99999))
+            c.drawString(x + column * column_width + 4, y - (row + 1) * row_height + 5, value)
+    return y - rows * row_height - 24
+
+def create_document_pdf(
+    pdf_path: Path,
+    pages: int = 5,
+    language: str = "ko",
+    table_density: float = 0.3,
+    seed: int = 0,
+    title: str = ""
+) -> Path:
+    """제목, 번호가 붙은 절, 문단과 (table_density 확률로) 표가 있는 여러 쪽짜리 PDF를 만듭니다."""
+    rng = random.Random(seed)
+    font = KOREAN_FONT if language == "ko" else ENGLISH_FONT
+    if font == KOREAN_FONT and KOREAN_FONT not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(UnicodeCIDFont(KOREAN_FONT))
+
+    page_width, page_height = A4
+    margin = 60
+    text_width = page_width - margin * 2
+    c = canvas.Canvas(str(pdf_path), pagesize=A4)
+    c.setTitle(title or Path(pdf_path).stem)
+    c.setAuthor("benchmark")
+    section = 0
+    for page in range(pages):
+        y = page_height - margin
+        if rng.random() < table_density:
+            y = _draw_table(c, rng, language, font, margin, y, text_width)
+        while y > margin + 80:
+            section += 1
+            c.setFont(font, 14)
+            heading = _sentence(rng, language).rstrip(".")[:40]
+            c.drawString(margin, y, f"{section}. {heading}")
+            y -= 26
+            c.setFont(font, 10)
+            for _ in range(rng.randint(2, 4)):
+                paragraph = " ".join(_sentence(rng, language) for _ in range(rng.randint(3, 6)))
+                for line in _wrap(paragraph, font, 10, text_width):
+                    if y < margin:
+                        break
+                    c.drawString(margin, y, line)
+                    y -= 14
+                y -= 10
+        c.showPage()
+    c.save()
+    return Path(pdf_path)
+
+def create_corpus(
+    output_dir: Path,
+    documents: int = 10,
+    pages: int = 5,
+    language: str = "mixed",
+    table_density: float = 0.3,
+    seed: int = 0
+):
+    """documents개의 합성 PDF를 만들고 경로 목록을 반환합니다. mixed는 한국어/영어를 번갈아 만듭니다."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(documents):
+        document_language = language if language != "mixed" else ("ko" if i % 2 == 0 else "en")
+        paths.append(create_document_pdf(
+            output_dir / f"bench_{document_language}_{i:04d}.pdf",
+            pages=pages,
+            language=document_language,
+            table_density=table_density,
+            seed=seed + i
+        ))
+    return paths
+
+def create_test_pdf(pdf_path: str = "test.pdf"):
+    """한 줄짜리 test.pdf를 만듭니다."""
+    c = canvas.Canvas(pdf_path)
+
+    # 텍스트 추가 (UTF-8 인코딩 사용)
+    text = "테스트 문서입니다.".encode('utf-8').decode('utf-8')
+    c.drawString(50, 700, text)
+
+    # PDF 저장
+    c.save()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="테스트/벤치마크용 PDF를 생성합니다.")
+    parser.add_argument("--output", default=None, help="합성 문서를 만들 디렉토리 (없으면 test.pdf 하나만 생성)")
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--language", choices=["ko", "en", "mixed"], default="mixed")
+    parser.add_argument("--table-density", type=float, default=0.3, help="표가 들어갈 쪽의 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.output is None:
+        # 현재 스크립트의 디렉토리에 PDF 생성
+        create_test_pdf(os.path.join(os.getcwd(), "test.pdf"))
+    else:
+        for path in create_corpus(args.output, args.documents, args.pages, args.language, args.table_density, args.seed):
+            print(path)
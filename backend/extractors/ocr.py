@@ -0,0 +1,187 @@
+from typing import Dict, List, Optional, Tuple
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+import pytesseract
+from extractors.page_images import PageImages
+
+# OCR 설정
+OCR_LANG = os.getenv("OCR_LANG", "kor+eng")
+OCR_DPI = int(os.getenv("OCR_DPI", 300))
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", 60))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", max((os.cpu_count() or 2) // 2, 1)))
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", 20))
+OCR_CACHE_DIR = Path(os.getenv("OCR_CACHE_DIR", "ocr_cache"))
+
+def _report_pid(pids):
+    """OCR 작업자 프로세스 초기화: 멈춘 작업자를 종료할 수 있도록 자기 pid를 알립니다."""
+    pids.put(os.getpid())
+
+class _OCRPool:
+    """OCR 프로세스 풀과 작업자 pid, 끝나지 않은 작업 수를 함께 관리합니다."""
+
+    def __init__(self, workers: int):
+        context = multiprocessing.get_context()
+        self._pids = context.SimpleQueue()
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_report_pid, initargs=(self._pids,)
+        )
+        self.pending = 0
+        self._lock = threading.Lock()
+
+    def _finished(self, future: Optional[Future] = None):
+        with self._lock:
+            self.pending -= 1
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._finished()
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def kill(self):
+        """풀을 닫고 작업자 프로세스를 모두 종료합니다."""
+        pids = []
+        while not self._pids.empty():
+            pids.append(self._pids.get())
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+_pool: Optional[_OCRPool] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> _OCRPool:
+    """프로세스 전체에서 공유하는 OCR 프로세스 풀을 반환합니다."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _OCRPool(OCR_WORKERS)
+        return _pool
+
+def _reset_pool(pool: _OCRPool):
+    """작업이 멈추거나 깨진 풀을 버리고 프로세스를 종료합니다. 다음 OCR은 새 풀에서 실행됩니다.
+
+    이미 실행 중인 작업은 future.cancel()로 멈출 수 없어, 그대로 두면 멈춘 작업자가 풀 자리를 계속 차지합니다.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:
+            # 다른 스레드가 이미 새 풀로 바꿈
+            return
+        _pool = None
+    pool.kill()
+
+def pending() -> int:
+    """OCR 풀에 넣었지만 끝나지 않은 작업 수 (대기열 깊이 지표)."""
+    pool = _pool
+    return pool.pending if pool is not None else 0
+
+def needs_ocr(text: str, min_chars: int = OCR_MIN_CHARS) -> bool:
+    """텍스트 레이어가 사실상 비어 있는 페이지인지 확인합니다."""
+    return sum(1 for char in text if not char.isspace()) < min_chars
+
+def ocr_page(image_path: str, lang: str, timeout: float) -> str:
+    """렌더링된 페이지 이미지를 OCR합니다. 프로세스 풀에서 실행됩니다.
+
+    tesseract는 제한 시간이 지나면 하위 프로세스를 종료하고 예외를 발생시킵니다.
+    """
+    return pytesseract.image_to_string(image_path, lang=lang, timeout=timeout)
+
+class OCRStage:
+    """이미지뿐인 페이지만 골라 OCR하고, 결과를 페이지 해시로 캐시합니다."""
+
+    def __init__(
+        self,
+        lang: str = OCR_LANG,
+        dpi: int = OCR_DPI,
+        timeout: float = OCR_TIMEOUT,
+        min_chars: int = OCR_MIN_CHARS,
+        cache_dir: Path = OCR_CACHE_DIR
+    ):
+        self.lang = lang
+        self.dpi = dpi
+        self.timeout = timeout
+        self.min_chars = min_chars
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _cache_path(self, page_hash: str) -> Path:
+        return self.cache_dir / f"{page_hash}_{self.dpi}_{self.lang}.txt"
+
+    def _submit(self, image_path: Path) -> Tuple[_OCRPool, Future]:
+        pool = _get_pool()
+        return pool, pool.submit(ocr_page, str(image_path), self.lang, self.timeout)
+
+    def run(self, pages: List[Dict], images: PageImages) -> List[int]:
+        """pages의 {'page', 'text', 'hash'} 중 텍스트가 없는 페이지를 OCR 결과로 채우고 OCR한 페이지 번호를 반환합니다.
+
+        페이지 이미지는 images에 렌더링하여 같은 파싱의 표 추출 단계가 다시 래스터화하지 않고 쓰게 합니다.
+        """
+        targets = [page for page in pages if needs_ocr(page["text"], self.min_chars)]
+        if not targets:
+            return []
+
+        ocr_pages = []
+        uncached = []
+        for page in targets:
+            cache_path = self._cache_path(page["hash"]) if page.get("hash") else None
+            if cache_path and cache_path.exists():
+                page["text"] = cache_path.read_text(encoding="utf-8")
+                ocr_pages.append(page["page"])
+                continue
+            uncached.append((page, cache_path))
+
+        pdf_path = images.pdf_path
+        image_paths = images.get([page["page"] for page, _ in uncached], self.dpi, timeout=self.timeout)
+        futures = {
+            page["page"]: (page, cache_path, self._submit(image_paths[page["page"]]))
+            for page, cache_path in uncached if page["page"] in image_paths
+        }
+
+        for page_number, (page, cache_path, (pool, future)) in futures.items():
+            text = None
+            for attempt in range(2):
+                try:
+                    # tesseract 자체 타임아웃 외에 풀에서 기다리는 시간까지 고려한 여유
+                    text = future.result(timeout=self.timeout * 2)
+                except TimeoutError:
+                    # 하위 프로세스 제한 시간으로도 끝나지 않은 작업: 실행 중인 작업은 취소할 수 없으므로 풀을 새로 만듦
+                    logging.error(f"OCR 시간 초과, OCR 프로세스 풀을 다시 만듭니다: {pdf_path} {page_number}페이지")
+                    _reset_pool(pool)
+                except (BrokenProcessPool, CancelledError) as e:
+                    if attempt:
+                        logging.error(f"OCR 중 오류 발생: {pdf_path} {page_number}페이지: {str(e)}")
+                        break
+                    # 다른 페이지가 멈춰 풀을 다시 만들면서 중단되거나 취소된 경우, 또는 작업자가 죽어 풀이
+                    # 깨진 경우: 깨진 풀은 버리고(이미 바뀌었으면 그대로 둠) 새 풀에서 한 번 더 시도
+                    _reset_pool(pool)
+                    pool, future = self._submit(image_paths[page_number])
+                    continue
+                except Exception as e:
+                    logging.error(f"OCR 중 오류 발생: {pdf_path} {page_number}페이지: {str(e)}")
+                break
+            if text is None:
+                continue
+
+            page["text"] = text
+            ocr_pages.append(page_number)
+            if cache_path:
+                tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_text(text, encoding="utf-8")
+                os.replace(tmp_path, cache_path)
+
+        return sorted(ocr_pages)
@@ -0,0 +1,155 @@
+from typing import Dict, Iterable, Optional, Set
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from pdf2image import convert_from_path
+
+PAGE_CACHE_DIR = Path(os.getenv("PAGE_CACHE_DIR", "page_cache"))
+PAGE_RENDER_WORKERS = int(os.getenv("PAGE_RENDER_WORKERS", 4))
+# 캐시 용량(MB)과 보관 기간(시간). 넘으면 가장 오래 쓰지 않은 이미지부터 지움
+PAGE_CACHE_MAX_MB = int(os.getenv("PAGE_CACHE_MAX_MB", 2048))
+PAGE_CACHE_MAX_AGE_HOURS = float(os.getenv("PAGE_CACHE_MAX_AGE_HOURS", 24 * 7))
+# 렌더링할 때마다 캐시 전체를 훑지 않도록 정리 간격(초)
+PAGE_CACHE_PRUNE_INTERVAL = 60
+
+_last_prune = float("-inf")
+_prune_lock = threading.Lock()
+
+def prune_page_cache(
+    cache_dir: Path = PAGE_CACHE_DIR,
+    max_bytes: int = PAGE_CACHE_MAX_MB * 1024 * 1024,
+    max_age: float = PAGE_CACHE_MAX_AGE_HOURS * 3600,
+    keep: Iterable[Path] = ()
+) -> int:
+    """보관 기간이 지난 이미지와, 용량을 넘는 만큼 오래 쓰지 않은 이미지를 지우고 지운 파일 수를 반환합니다.
+
+    캐시를 쓸 때마다 수정 시각을 갱신하므로 수정 시각 순서가 사용 순서입니다. keep의 이미지는 남깁니다.
+    """
+    keep = {Path(path) for path in keep}
+    entries = []
+    for path in Path(cache_dir).glob("*/*/*.png"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort(key=lambda entry: entry[0])
+    total = sum(size for _, size, _ in entries)
+    cutoff = time.time() - max_age
+    removed = 0
+    for mtime, size, path in entries:
+        if mtime >= cutoff and total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+        # 비어 있는 dpi/문서 디렉토리 정리 (다른 프로세스가 막 렌더링 중이면 비어 있지 않아 실패함)
+        for directory in (path.parent, path.parent.parent):
+            try:
+                directory.rmdir()
+            except OSError:
+                break
+    return removed
+
+def remove_page_images(pdf_hash: str, cache_dir: Path = PAGE_CACHE_DIR):
+    """한 PDF 내용(해시)의 페이지 이미지를 모두 지웁니다. 문서를 삭제하거나 새 내용으로 다시 파싱할 때 씁니다."""
+    if pdf_hash:
+        shutil.rmtree(Path(cache_dir) / pdf_hash, ignore_errors=True)
+
+class PageImages:
+    """한 PDF의 페이지를 PNG로 렌더링해 {캐시}/{pdf 해시}/{dpi}/page_N.png에 두고 OCR과 표 추출이 함께 씁니다.
+
+    같은 파싱에서 이미 렌더링한 페이지는 다른 단계가 다른 DPI를 요청해도 그 이미지를 그대로 돌려주므로
+    페이지마다 한 번만 래스터화합니다. 캐시에 남은 이미지는 다시 실행할 때 렌더링을 건너뛰게 합니다.
+
+    렌더링은 별도 프로세스(pdftoppm)가 하므로 매핑된 버퍼 대신 파일 경로를 넘깁니다. pdf2image의
+    convert_from_bytes도 바이트를 임시 파일에 쓴 뒤 같은 명령을 실행하므로 버퍼를 넘기면 복사만 늘어납니다.
+    """
+
+    def __init__(
+        self,
+        pdf_path: Path,
+        pdf_hash: Optional[str] = None,
+        cache_dir: Path = PAGE_CACHE_DIR,
+        workers: int = PAGE_RENDER_WORKERS
+    ):
+        self.pdf_path = Path(pdf_path)
+        self.pdf_hash = pdf_hash or self._file_hash(self.pdf_path)
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers
+        self.images: Dict[int, Path] = {}
+        # 렌더링에 실패한 페이지 (같은 파싱의 다른 단계가 다시 시도하지 않음)
+        self.failed: Set[int] = set()
+
+    def _path(self, page: int, dpi: int) -> Path:
+        return self.cache_dir / self.pdf_hash / str(dpi) / f"page_{page}.png"
+
+    def get(self, pages: Iterable[int], dpi: int, timeout: Optional[float] = None) -> Dict[int, Path]:
+        """페이지 번호 -> 이미지 경로. 렌더링에 실패한 페이지는 빠집니다."""
+        pages = list(pages)
+        missing = []
+        for page in pages:
+            if page in self.images or page in self.failed:
+                continue
+            path = self._path(page, dpi)
+            try:
+                # 수정 시각을 사용 시각으로 씀 (정리할 때 최근에 쓴 이미지를 남기도록)
+                os.utime(path)
+                self.images[page] = path
+            except FileNotFoundError:
+                missing.append(page)
+
+        def render(page: int):
+            path = self._path(page, dpi)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                image = convert_from_path(
+                    str(self.pdf_path), dpi=dpi, first_page=page, last_page=page, timeout=timeout
+                )[0]
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp.png")
+                image.save(tmp_path)
+                os.replace(tmp_path, path)
+                return page, path
+            except Exception as e:
+                logging.error(f"페이지 렌더링 실패: {self.pdf_path} {page}페이지: {str(e)}")
+                return page, None
+
+        # pdftoppm은 별도 프로세스로 실행되므로 스레드로 충분히 병렬화됩니다
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for page, path in executor.map(render, missing):
+                    if path is None:
+                        self.failed.add(page)
+                    else:
+                        self.images[page] = path
+            self._prune()
+
+        return {page: self.images[page] for page in pages if page in self.images}
+
+    def _prune(self):
+        global _last_prune
+        with _prune_lock:
+            if time.monotonic() - _last_prune < PAGE_CACHE_PRUNE_INTERVAL:
+                return
+            _last_prune = time.monotonic()
+        try:
+            prune_page_cache(self.cache_dir, keep=self.images.values())
+        except Exception as e:
+            logging.error(f"페이지 이미지 캐시 정리 실패: {str(e)}")
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        """파일의 SHA-256 해시를 계산합니다."""
+        digest = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
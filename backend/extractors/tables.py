@@ -0,0 +1,118 @@
+from typing import Dict, List, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import cv2
+import numpy as np
+import pytesseract
+from extractors.page_images import PageImages
+
+Box = Tuple[int, int, int, int]
+
+class TableExtractor:
+    """페이지 이미지에서 OpenCV로 격자선을 찾아 표를 추출합니다."""
+
+    def __init__(
+        self,
+        dpi: int = int(os.getenv("TABLE_DPI", 200)),
+        workers: int = int(os.getenv("TABLE_WORKERS", 4)),
+        lang: str = os.getenv("TABLE_OCR_LANG", "kor+eng")
+    ):
+        self.dpi = dpi
+        self.workers = workers
+        self.lang = lang
+
+    def extract(self, images: PageImages, pages: List[int]) -> List[Dict]:
+        """지정된 페이지에서 표를 추출합니다.
+
+        OCR 단계가 이미 렌더링한 페이지는 그 이미지를 쓰고, 나머지만 self.dpi로 렌더링합니다.
+        """
+        image_paths = images.get(pages, self.dpi)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            page_tables = executor.map(self._extract_page, image_paths.keys(), image_paths.values())
+
+        tables = []
+        for found in page_tables:
+            tables.extend(found)
+        for i, table in enumerate(tables, 1):
+            table["caption"] = f"Table {i}"
+        return tables
+
+    def _extract_page(self, page: int, image_path: Path) -> List[Dict]:
+        """한 페이지 이미지에서 표를 찾고 셀만 OCR합니다."""
+        image = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            return []
+
+        tables = []
+        for table_box, cells in self.detect_tables(image):
+            data = [[self._ocr_cell(image, cell) for cell in row] for row in cells]
+            if any(any(value for value in row) for row in data):
+                tables.append({
+                    "page": page,
+                    "data": data,
+                    "bbox": list(table_box)
+                })
+        return tables
+
+    def detect_tables(self, image: np.ndarray) -> List[Tuple[Box, List[List[Box]]]]:
+        """격자선을 감지하여 (표 영역, 행별 셀 목록) 목록을 반환합니다."""
+        binary = cv2.adaptiveThreshold(
+            ~image, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 15, -2
+        )
+        height, width = binary.shape
+
+        # 가로선/세로선만 남기기
+        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(width // 40, 1), 1))
+        vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(height // 40, 1)))
+        horizontal = cv2.dilate(cv2.erode(binary, horizontal_kernel), horizontal_kernel)
+        vertical = cv2.dilate(cv2.erode(binary, vertical_kernel), vertical_kernel)
+        grid = cv2.add(horizontal, vertical)
+
+        # 교차점이 없는 선(밑줄 등)은 표로 보지 않음
+        joints = cv2.bitwise_and(horizontal, vertical)
+
+        tables = []
+        contours, _ = cv2.findContours(grid, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w < width * 0.1 or h < height * 0.02:
+                continue
+            if cv2.countNonZero(joints[y:y + h, x:x + w]) < 4:
+                continue
+            cells = self._detect_cells(grid[y:y + h, x:x + w], (x, y))
+            if cells:
+                tables.append(((x, y, w, h), cells))
+        return sorted(tables, key=lambda table: (table[0][1], table[0][0]))
+
+    def _detect_cells(self, grid: np.ndarray, origin: Tuple[int, int]) -> List[List[Box]]:
+        """표 영역 안의 셀 경계 상자를 찾아 행 단위로 정렬합니다."""
+        contours, _ = cv2.findContours(~grid, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        grid_h, grid_w = grid.shape
+        boxes = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            # 너무 작은 조각과 표 바깥 영역은 제외
+            if w < 10 or h < 8 or (w > grid_w * 0.98 and h > grid_h * 0.98):
+                continue
+            boxes.append((x + origin[0], y + origin[1], w, h))
+
+        # y 중심이 가까운 셀끼리 같은 행으로 묶기
+        rows: List[List[Box]] = []
+        for box in sorted(boxes, key=lambda b: (b[1], b[0])):
+            center = box[1] + box[3] / 2
+            if rows and abs(center - (rows[-1][0][1] + rows[-1][0][3] / 2)) < rows[-1][0][3] / 2:
+                rows[-1].append(box)
+            else:
+                rows.append([box])
+        return [sorted(row, key=lambda b: b[0]) for row in rows]
+
+    def _ocr_cell(self, image: np.ndarray, box: Box, padding: int = 3) -> str:
+        """셀 영역만 잘라 OCR합니다."""
+        x, y, w, h = box
+        crop = image[y + padding:y + h - padding, x + padding:x + w - padding]
+        if crop.size == 0 or cv2.countNonZero(~crop) == 0:
+            return ""
+        text = pytesseract.image_to_string(crop, lang=self.lang, config="--psm 6")
+        return " ".join(text.split())
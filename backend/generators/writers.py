@@ -0,0 +1,314 @@
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO, Type
+import csv
+import html
+import io
+import json
+import re
+
+# 등록된 형식별 writer
+WRITERS: Dict[str, Type["FormatWriter"]] = {}
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+LATEX_SPECIAL_CHARS = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}"
+}
+LATEX_SPECIAL_PATTERN = re.compile("|".join(re.escape(c) for c in LATEX_SPECIAL_CHARS))
+
+def register_writer(name: str, extension: str, media_type: str) -> Callable:
+    """형식 writer 클래스를 레지스트리에 등록하는 데코레이터입니다."""
+    def decorator(cls: Type["FormatWriter"]) -> Type["FormatWriter"]:
+        cls.name = name
+        cls.extension = extension
+        cls.media_type = media_type
+        WRITERS[name] = cls
+        return cls
+    return decorator
+
+def _iter_paragraphs(text: str) -> Iterator[str]:
+    """텍스트를 빈 줄 기준으로 나누어 문단을 하나씩 반환합니다."""
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        paragraph = text[start:match.start()].strip()
+        if paragraph:
+            yield paragraph
+        start = match.end()
+    paragraph = text[start:].strip()
+    if paragraph:
+        yield paragraph
+
+def iter_blocks(document: Dict) -> Iterator[Dict]:
+    """파싱된 문서를 page/paragraph/table/equation 블록 스트림으로 변환합니다.
+
+    content는 하나의 문자열(parse_pdf)이거나 {'page', 'text'} 목록(PDFParser)일 수 있으며,
+    페이지 목록은 제너레이터여도 됩니다.
+    """
+    content = document.get("content", "")
+    if isinstance(content, str):
+        for paragraph in _iter_paragraphs(content):
+            yield {"type": "paragraph", "page": None, "text": paragraph}
+    else:
+        for page in content:
+            yield {"type": "page", "page": page["page"]}
+            for paragraph in _iter_paragraphs(page.get("text") or ""):
+                yield {"type": "paragraph", "page": page["page"], "text": paragraph}
+
+    for table in document.get("tables") or []:
+        yield {
+            "type": "table",
+            "page": table.get("page"),
+            "caption": table.get("caption", "Table"),
+            "data": table.get("data", [])
+        }
+
+    for equation in document.get("equations") or []:
+        if isinstance(equation, str):
+            equation = {"latex": equation}
+        yield {
+            "type": "equation",
+            "page": equation.get("page"),
+            "latex": equation.get("latex", ""),
+            "context": equation.get("context", "")
+        }
+
+def table_to_markdown(table_data: List[List[str]]) -> str:
+    """표 데이터를 마크다운 테이블 형식으로 변환합니다."""
+    if not table_data:
+        return ""
+
+    def cell(value) -> str:
+        return str(value if value is not None else "").replace("|", "\\|").replace("\n", " ")
+
+    width = max(len(row) for row in table_data)
+    rows = [[cell(value) for value in row] + [""] * (width - len(row)) for row in table_data]
+    markdown = ["| " + " | ".join(rows[0]) + " |", "| " + " | ".join(["---"] * width) + " |"]
+    for row in rows[1:]:
+        markdown.append("| " + " | ".join(row) + " |")
+    return "\n".join(markdown)
+
+def latex_escape(text: str) -> str:
+    """LaTeX 특수 문자를 이스케이프합니다."""
+    return LATEX_SPECIAL_PATTERN.sub(lambda match: LATEX_SPECIAL_CHARS[match.group()], str(text))
+
+class FormatWriter:
+    """블록 스트림을 받아 출력 조각을 순서대로 만들어 내는 writer의 기본 클래스입니다."""
+
+    name = ""
+    extension = ""
+    media_type = "text/plain; charset=utf-8"
+
+    def begin(self, metadata: Dict) -> Iterable[str]:
+        return ()
+
+    def write_block(self, block: Dict) -> Iterable[str]:
+        return ()
+
+    def end(self) -> Iterable[str]:
+        return ()
+
+    def render(self, document: Dict) -> Iterator[str]:
+        """문서 전체를 출력 조각 단위로 생성합니다."""
+        yield from self.begin(document.get("metadata", {}))
+        for block in iter_blocks(document):
+            yield from self.write_block(block)
+        yield from self.end()
+
+@register_writer("markdown", extension="md", media_type="text/markdown; charset=utf-8")
+class MarkdownWriter(FormatWriter):
+    def __init__(self):
+        self.section = None
+
+    def begin(self, metadata: Dict) -> Iterable[str]:
+        yield f"# {metadata.get('title') or 'Untitled'}\n\n"
+        yield f"**작성자**: {metadata.get('author') or ''}\n\n"
+        if metadata.get("date"):
+            yield f"**작성일**: {metadata['date']}\n\n"
+        if metadata.get("pages"):
+            yield f"**페이지 수**: {metadata['pages']}\n\n"
+
+    def write_block(self, block: Dict) -> Iterable[str]:
+        if block["type"] == "page":
+            yield f"## Page {block['page']}\n\n"
+        elif block["type"] == "paragraph":
+            yield block["text"] + "\n\n"
+        elif block["type"] == "table":
+            if self.section != "table":
+                self.section = "table"
+                yield "## Tables\n\n"
+            yield f"### {block['caption']}\n\n"
+            yield table_to_markdown(block["data"]) + "\n\n"
+        elif block["type"] == "equation":
+            if self.section != "equation":
+                self.section = "equation"
+                yield "## Equations\n\n"
+            if block["page"]:
+                yield f"### Equation on Page {block['page']}\n\n"
+            yield f"```latex\n{block['latex']}\n```\n\n"
+            if block["context"]:
+                yield f"Context: {block['context']}\n\n"
+
+@register_writer("latex", extension="tex", media_type="application/x-tex; charset=utf-8")
+class LatexWriter(FormatWriter):
+    def begin(self, metadata: Dict) -> Iterable[str]:
+        yield "\\documentclass{article}\n"
+        yield f"\\title{{{latex_escape(metadata.get('title') or '')}}}\n"
+        yield f"\\author{{{latex_escape(metadata.get('author') or '')}}}\n"
+        yield f"\\date{{{latex_escape(metadata.get('date') or '')}}}\n"
+        yield "\\begin{document}\n\\maketitle\n\n"
+
+    def write_block(self, block: Dict) -> Iterable[str]:
+        if block["type"] == "page":
+            yield f"\\section*{{Page {block['page']}}}\n\n"
+        elif block["type"] == "paragraph":
+            yield latex_escape(block["text"]) + "\n\n"
+        elif block["type"] == "table" and block["data"]:
+            width = max(len(row) for row in block["data"])
+            yield "\\begin{table}[h]\n\\centering\n"
+            yield f"\\begin{{tabular}}{{{'|'.join(['l'] * width)}}}\n"
+            for row in block["data"]:
+                cells = [latex_escape(value) for value in row] + [""] * (width - len(row))
+                yield " & ".join(cells) + " \\\\\n"
+            yield "\\end{tabular}\n"
+            yield f"\\caption{{{latex_escape(block['caption'])}}}\n\\end{{table}}\n\n"
+        elif block["type"] == "equation":
+            yield f"\\begin{{equation}}\n{block['latex']}\n\\end{{equation}}\n\n"
+
+    def end(self) -> Iterable[str]:
+        yield "\\end{document}\n"
+
+@register_writer("csv", extension="csv", media_type="text/csv; charset=utf-8")
+class CSVWriter(FormatWriter):
+    """문단마다 한 행을 씁니다."""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def _row(self, row: List) -> str:
+        self.writer.writerow(row)
+        value = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return value
+
+    def begin(self, metadata: Dict) -> Iterable[str]:
+        yield self._row(["paragraph", "length"])
+
+    def write_block(self, block: Dict) -> Iterable[str]:
+        if block["type"] == "paragraph":
+            yield self._row([block["text"], len(block["text"])])
+
+@register_writer("csv_tables", extension="tables.csv", media_type="text/csv; charset=utf-8")
+class CSVTablesWriter(CSVWriter):
+    """추출된 표의 셀마다 한 행(table, page, row, column, value)을 씁니다."""
+
+    def __init__(self):
+        super().__init__()
+        self.table_index = 0
+
+    def begin(self, metadata: Dict) -> Iterable[str]:
+        yield self._row(["table", "page", "row", "column", "value"])
+
+    def write_block(self, block: Dict) -> Iterable[str]:
+        if block["type"] != "table":
+            return
+        self.table_index += 1
+        for row_index, row in enumerate(block["data"], 1):
+            for column_index, value in enumerate(row, 1):
+                yield self._row([self.table_index, block["page"], row_index, column_index, value])
+
+@register_writer("jsonld", extension="jsonld", media_type="application/ld+json")
+class JSONLDWriter(FormatWriter):
+    """schema.org Document를 문단 단위로 이어 쓰며 text 필드를 스트리밍합니다."""
+
+    def __init__(self):
+        self.first_paragraph = True
+
+    def begin(self, metadata: Dict) -> Iterable[str]:
+        yield "{\n"
+        yield '  "@context": "https://schema.org",\n'
+        yield '  "@type": "Document",\n'
+        yield f'  "name": {json.dumps(metadata.get("title", ""), ensure_ascii=False)},\n'
+        yield '  "author": {\n    "@type": "Person",\n'
+        yield f'    "name": {json.dumps(metadata.get("author", ""), ensure_ascii=False)}\n  }},\n'
+        yield f'  "dateCreated": {json.dumps(metadata.get("date", ""), ensure_ascii=False)},\n'
+        yield '  "text": "'
+
+    def write_block(self, block: Dict) -> Iterable[str]:
+        if block["type"] == "paragraph":
+            if not self.first_paragraph:
+                yield "\\n\\n"
+            self.first_paragraph = False
+            # 따옴표를 뺀 JSON 문자열 조각
+            yield json.dumps(block["text"], ensure_ascii=False)[1:-1]
+
+    def end(self) -> Iterable[str]:
+        yield '"\n}\n'
+
+@register_writer("html", extension="html", media_type="text/html; charset=utf-8")
+class HTMLWriter(FormatWriter):
+    def __init__(self):
+        self.in_section = False
+
+    def begin(self, metadata: Dict) -> Iterable[str]:
+        title = html.escape(metadata.get("title") or "Untitled")
+        yield "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+        yield f"<title>{title}</title>\n</head>\n<body>\n<h1>{title}</h1>\n"
+        yield f"<p class=\"author\">{html.escape(metadata.get('author') or '')}</p>\n"
+        if metadata.get("date"):
+            yield f"<p class=\"date\">{html.escape(metadata['date'])}</p>\n"
+
+    def _close_section(self) -> Iterable[str]:
+        if self.in_section:
+            self.in_section = False
+            yield "</section>\n"
+
+    def write_block(self, block: Dict) -> Iterable[str]:
+        if block["type"] == "page":
+            yield from self._close_section()
+            self.in_section = True
+            yield f"<section data-page=\"{block['page']}\">\n<h2>Page {block['page']}</h2>\n"
+        elif block["type"] == "paragraph":
+            yield f"<p>{html.escape(block['text'])}</p>\n"
+        elif block["type"] == "table":
+            yield from self._close_section()
+            yield f"<table>\n<caption>{html.escape(block['caption'])}</caption>\n"
+            for i, row in enumerate(block["data"]):
+                tag = "th" if i == 0 else "td"
+                cells = "".join(f"<{tag}>{html.escape(str(value))}</{tag}>" for value in row)
+                yield f"<tr>{cells}</tr>\n"
+            yield "</table>\n"
+        elif block["type"] == "equation":
+            yield from self._close_section()
+            yield f"<pre class=\"latex\">{html.escape(block['latex'])}</pre>\n"
+
+    def end(self) -> Iterable[str]:
+        yield from self._close_section()
+        yield "</body>\n</html>\n"
+
+def get_writer(format: str) -> FormatWriter:
+    """등록된 writer의 새 인스턴스를 반환합니다."""
+    if format not in WRITERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {format}")
+    return WRITERS[format]()
+
+def iter_document(document: Dict, format: str) -> Iterator[str]:
+    """문서를 지정된 형식의 출력 조각으로 생성합니다. 소켓 스트리밍에 사용합니다."""
+    return get_writer(format).render(document)
+
+def write_document(document: Dict, format: str, stream: TextIO):
+    """문서를 지정된 형식으로 스트림에 조금씩 씁니다."""
+    for chunk in iter_document(document, format):
+        stream.write(chunk)
+
+def render_document(document: Dict, format: str) -> str:
+    """문서를 지정된 형식의 문자열로 변환합니다."""
+    return "".join(iter_document(document, format))
@@ -0,0 +1,388 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF, XSD
+from rdflib.plugins.sparql import prepareQuery
+from monitoring.metrics import stage_timer
+from storage.compression import COMPRESSOR, Compressor
+
+RDF_BASE_URI = os.getenv("RDF_BASE_URI", "http://localhost:8008/")
+SDO = Namespace("https://schema.org/")
+PARSE = Namespace(f"{RDF_BASE_URI}vocab#")
+
+# 개체 추출 결과 키 → schema.org 타입
+ENTITY_TYPES = {
+    "organizations": SDO.Organization,
+    "locations": SDO.Place,
+    "persons": SDO.Person
+}
+
+Triple = Tuple[URIRef, URIRef, object]
+
+# 트리플 몇 개마다 쿼리 제한 시간을 확인할지
+DEADLINE_CHECK_INTERVAL = 256
+
+# rdflib의 SPARQL 파서(pyparsing)는 스레드에 안전하지 않으므로 파싱만 한 번에 하나씩 (평가는 동시에)
+_PARSE_LOCK = threading.Lock()
+
+class QueryTimeout(Exception):
+    """SPARQL 쿼리가 제한 시간 안에 끝나지 않았을 때 발생합니다."""
+
+class UnsupportedQuery(ValueError):
+    """SELECT, ASK가 아닌 쿼리(CONSTRUCT, DESCRIBE 등)일 때 발생합니다."""
+
+# 결과를 SPARQL JSON(bindings/boolean)으로 돌려줄 수 있는 쿼리 형식
+SUPPORTED_QUERY_FORMS = {"SelectQuery": "SELECT", "AskQuery": "ASK"}
+
+class ReadWriteLock:
+    """읽기끼리는 서로 막지 않고 쓰기만 혼자 잡는 잠금. 기다리는 쓰기가 있으면 새 읽기는 뒤로 미룹니다."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+class GuardedGraph(Graph):
+    """SPARQL 평가 중 트리플을 읽을 때마다 현재 스레드의 제한 시간을 확인하는 그래프.
+
+    rdflib의 쿼리 평가는 모두 triples()를 거치므로, 결과 행을 하나도 내지 않는
+    교차 조인 같은 쿼리도 제한 시간이 지나면 QueryTimeout으로 중단됩니다.
+    triples()는 패턴 하나의 결과를 읽기 잠금 안에서 목록으로 복사한 뒤 잠금을 풀고 돌려주므로,
+    쿼리 평가 전체가 아니라 트리플을 읽는 동안만 잠금을 잡습니다. 트리플을 바꾸는 쪽은 rwlock.write()를 씁니다.
+    """
+
+    _guard = threading.local()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rwlock = ReadWriteLock()
+
+    def triples(self, triple):
+        deadline = getattr(self._guard, "deadline", None)
+        with self.rwlock.read():
+            found = []
+            for i, match in enumerate(super().triples(triple)):
+                if deadline is not None and i % DEADLINE_CHECK_INTERVAL == 0 and time.monotonic() > deadline:
+                    raise QueryTimeout()
+                found.append(match)
+        for i, match in enumerate(found):
+            if deadline is not None and i % DEADLINE_CHECK_INTERVAL == 0 and time.monotonic() > deadline:
+                raise QueryTimeout()
+            yield match
+
+def document_uri(filename: str) -> URIRef:
+    return URIRef(f"{RDF_BASE_URI}documents/{quote(filename)}")
+
+def entity_uri(kind: str, name: str) -> URIRef:
+    return URIRef(f"{RDF_BASE_URI}entities/{kind}/{quote(name)}")
+
+def document_jsonld(
+    filename: str,
+    metadata: Dict,
+    tags: List[str],
+    keywords: Optional[List[Dict]] = None,
+    entities: Optional[Dict] = None
+) -> Dict:
+    """문서 메타데이터, 태그, 키워드, 개체를 schema.org JSON-LD로 만듭니다."""
+    document = {
+        "@context": {
+            "@vocab": str(SDO),
+            "parse": str(PARSE)
+        },
+        "@id": str(document_uri(filename)),
+        "@type": "DigitalDocument",
+        "identifier": filename,
+        "name": metadata.get("title", ""),
+        "author": metadata.get("author", ""),
+        "numberOfPages": metadata.get("pages", 0),
+        "parse:tag": list(tags)
+    }
+    if metadata.get("date"):
+        document["dateCreated"] = {"@value": metadata["date"], "@type": str(XSD.date)}
+    if keywords:
+        document["keywords"] = [keyword["word"] for keyword in keywords]
+    if entities:
+        mentions = []
+        for kind, entity_type in ENTITY_TYPES.items():
+            for name in sorted(set(entities.get(kind, []))):
+                mentions.append({
+                    "@id": str(entity_uri(kind, name)),
+                    "@type": entity_type.split("/")[-1],
+                    "name": name
+                })
+        document["mentions"] = mentions
+        document["temporalCoverage"] = sorted(set(entities.get("dates", [])))
+        for keyword in entities.get("keywords", []):
+            document.setdefault("keywords", [])
+            if keyword["word"] not in document["keywords"]:
+                document["keywords"].append(keyword["word"])
+    return document
+
+def document_triples(
+    filename: str,
+    metadata: Dict,
+    tags: List[str],
+    keywords: Optional[List[Dict]] = None,
+    entities: Optional[Dict] = None
+) -> Set[Triple]:
+    """document_jsonld와 같은 내용을 JSON-LD 파싱 없이 바로 트리플로 만듭니다."""
+    subject = document_uri(filename)
+    triples = {
+        (subject, RDF.type, SDO.DigitalDocument),
+        (subject, SDO.identifier, Literal(filename)),
+        (subject, SDO.name, Literal(metadata.get("title", ""))),
+        (subject, SDO.author, Literal(metadata.get("author", ""))),
+        (subject, SDO.numberOfPages, Literal(int(metadata.get("pages", 0) or 0)))
+    }
+    if metadata.get("date"):
+        triples.add((subject, SDO.dateCreated, Literal(metadata["date"], datatype=XSD.date)))
+    for tag in tags:
+        triples.add((subject, PARSE.tag, Literal(tag)))
+
+    words = [keyword["word"] for keyword in keywords or []]
+    if entities:
+        words += [keyword["word"] for keyword in entities.get("keywords", [])]
+        for kind, entity_type in ENTITY_TYPES.items():
+            for name in set(entities.get(kind, [])):
+                entity = entity_uri(kind, name)
+                triples.add((subject, SDO.mentions, entity))
+                triples.add((entity, RDF.type, entity_type))
+                triples.add((entity, SDO.name, Literal(name)))
+        for value in set(entities.get("dates", [])):
+            triples.add((subject, SDO.temporalCoverage, Literal(value)))
+    for word in words:
+        triples.add((subject, SDO.keywords, Literal(word)))
+    return triples
+
+class DocumentGraph:
+    """문서별 트리플을 하나의 메모리 그래프에 유지하고 변경분만 반영합니다.
+
+    - JSON_STORE/{filename}.json: 문서의 JSON-LD (내보내기/호환용)
+    - RDF_STORE/{filename}.nt: 같은 내용의 N-Triples. 시작할 때 이 파일만 읽어 그래프를 만듭니다.
+    이전 버전에서 JSON_STORE에 넣은 JSON-LD 파일은 처음 한 번만 파싱하여 .nt로 옮깁니다.
+    두 파일 모두 compressor로 압축하여 저장하며, 압축하지 않은 이전 파일도 읽습니다.
+    version은 그래프가 바뀔 때마다 증가합니다.
+    """
+
+    def __init__(self, json_store: Path, rdf_store: Path, compressor: Compressor = COMPRESSOR):
+        self.json_store = Path(json_store)
+        self.rdf_store = Path(rdf_store)
+        self.compressor = compressor
+        self.json_store.mkdir(parents=True, exist_ok=True)
+        self.rdf_store.mkdir(parents=True, exist_ok=True)
+        self.graph = GuardedGraph()
+        self.graph.bind("schema", SDO)
+        self.graph.bind("parse", PARSE)
+        self.version = 0
+        self._listeners: List[Callable[[int], None]] = []
+        self._triples: Dict[str, Set[Triple]] = {}
+        self._lock = threading.RLock()
+        with stage_timer("rdf_load"):
+            self._load()
+
+    def _nt_path(self, name: str) -> Path:
+        return self.rdf_store / f"{name}.nt"
+
+    def _jsonld_path(self, name: str) -> Path:
+        return self.json_store / f"{name}.json"
+
+    def paths(self, filename: str) -> Tuple[Path, Path]:
+        """문서의 JSON-LD와 N-Triples 파일 경로"""
+        return self._jsonld_path(filename), self._nt_path(filename)
+
+    def _load(self):
+        for path in sorted(self.json_store.glob("*.json")):
+            if self._nt_path(path.stem).exists():
+                continue
+            # 이전 버전의 JSON-LD 파일: 한 번만 파싱하여 N-Triples로 저장
+            try:
+                legacy = Graph()
+                legacy.parse(data=self.compressor.read_text(path), format="json-ld")
+                self._write(self._nt_path(path.stem), legacy.serialize(format="nt"), "nt")
+            except Exception as e:
+                logging.error(f"JSON-LD 파일 변환 실패: {path}: {str(e)}")
+
+        for path in sorted(self.rdf_store.glob("*.nt")):
+            try:
+                triples = self._read_triples(path)
+            except Exception as e:
+                logging.error(f"N-Triples 파일 읽기 실패: {path}: {str(e)}")
+                continue
+            self._triples[path.name[:-len(".nt")]] = triples
+            with self.graph.rwlock.write():
+                for triple in triples:
+                    self.graph.add(triple)
+
+    def add_listener(self, listener: Callable[[int], None]):
+        """그래프가 바뀔 때마다 새 version으로 호출할 함수를 등록합니다."""
+        self._listeners.append(listener)
+
+    def _changed(self):
+        self.version += 1
+        for listener in self._listeners:
+            try:
+                listener(self.version)
+            except Exception as e:
+                logging.error(f"그래프 변경 알림 처리 실패: {str(e)}")
+
+    def documents(self) -> Set[str]:
+        with self._lock:
+            return set(self._triples)
+
+    def emit(
+        self,
+        filename: str,
+        metadata: Dict,
+        tags: List[str],
+        keywords: Optional[List[Dict]] = None,
+        entities: Optional[Dict] = None
+    ) -> Dict:
+        """문서의 JSON-LD와 N-Triples를 쓰고, 그래프에는 바뀐 트리플만 더하고 뺍니다."""
+        with stage_timer("rdf_emit"):
+            triples = document_triples(filename, metadata, tags, keywords, entities)
+            jsonld = document_jsonld(filename, metadata, tags, keywords, entities)
+            with self._lock:
+                previous = self._triples.get(filename, set())
+                removed = previous - triples
+                added = triples - previous
+                if not removed and not added and self._nt_path(filename).exists():
+                    return {"added": 0, "removed": 0, "version": self.version}
+
+                self._write(self._jsonld_path(filename), json.dumps(jsonld, ensure_ascii=False), "jsonld")
+                self._write(self._nt_path(filename), "".join(
+                    f"{s.n3()} {p.n3()} {o.n3()} .\n" for s, p, o in sorted(triples)
+                ), "nt")
+                self._apply(filename, triples)
+                return {"added": len(added), "removed": len(removed), "version": self.version}
+
+    def _apply(self, filename: str, triples: Optional[Set[Triple]]):
+        """메모리 그래프의 문서 트리플을 triples로 바꿉니다. None이면 문서를 그래프에서 뺍니다."""
+        previous = self._triples.pop(filename, set())
+        current = triples or set()
+        removed = previous - current
+        # 다른 문서와 공유하는 개체 트리플은 그래프에서 빼지 않음
+        for other in self._triples.values():
+            removed = removed - other
+        with self.graph.rwlock.write():
+            for triple in removed:
+                self.graph.remove(triple)
+            for triple in current - previous:
+                self.graph.add(triple)
+        if triples is not None:
+            self._triples[filename] = triples
+        self._changed()
+
+    def remove(self, filename: str):
+        with self._lock:
+            self._apply(filename, None)
+            self._jsonld_path(filename).unlink(missing_ok=True)
+            self._nt_path(filename).unlink(missing_ok=True)
+
+    def refresh(self, filename: str) -> bool:
+        """다른 작업자가 바꾼 문서의 N-Triples 파일을 다시 읽어 메모리 그래프에 반영합니다.
+
+        파일이 없으면 그래프에서 뺍니다. 바뀐 것이 없으면 False를 반환합니다.
+        """
+        path = self._nt_path(filename)
+        triples = None
+        if path.exists():
+            try:
+                triples = self._read_triples(path)
+            except Exception as e:
+                logging.error(f"N-Triples 파일 읽기 실패: {path}: {str(e)}")
+                return False
+        with self._lock:
+            if triples == self._triples.get(filename) or (triples is None and filename not in self._triples):
+                return False
+            self._apply(filename, triples)
+            return True
+
+    def _read_triples(self, path: Path) -> Set[Triple]:
+        document = Graph()
+        document.parse(data=self.compressor.read_text(path), format="nt")
+        return set(document)
+
+    def _write(self, path: Path, text: str, kind: str):
+        self.compressor.write_text(path, text, kind)
+
+    def select(self, query: str, max_rows: Optional[int] = None, timeout: Optional[float] = None) -> Dict:
+        """SPARQL 쿼리를 실행하여 SPARQL JSON 형식({'head', 'results'})으로 반환합니다.
+
+        max_rows를 넘는 행은 버리고 "truncated": True를 붙입니다.
+        timeout(초)이 지나면 평가를 멈추고 QueryTimeout을 발생시킵니다.
+        SELECT, ASK가 아니면 평가하지 않고 UnsupportedQuery를 발생시킵니다.
+        """
+        guard = GuardedGraph._guard
+        guard.deadline = time.monotonic() + timeout if timeout else None
+        try:
+            # 그래프 잠금(_lock)은 잡지 않음: 트리플 읽기마다 GuardedGraph가 읽기 잠금을 잠깐 잡으므로
+            # 오래 걸리는 쿼리도 다른 쿼리나 emit/remove/refresh를 막지 않음
+            with _PARSE_LOCK:
+                prepared = prepareQuery(query, initNs=dict(self.graph.namespaces()))
+            if prepared.algebra.name not in SUPPORTED_QUERY_FORMS:
+                form = prepared.algebra.name.replace("Query", "").upper()
+                raise UnsupportedQuery(f"지원하지 않는 쿼리 형식입니다: {form} (SELECT, ASK만 지원)")
+            results = self.graph.query(prepared)
+            if results.type == "ASK":
+                return {"head": {}, "boolean": bool(results.askAnswer)}
+            variables = [str(var) for var in results.vars or []]
+            bindings = []
+            truncated = False
+            for row in results:
+                if max_rows is not None and len(bindings) >= max_rows:
+                    truncated = True
+                    break
+                if guard.deadline is not None and time.monotonic() > guard.deadline:
+                    raise QueryTimeout()
+                binding = {}
+                for var in results.vars or []:
+                    value = row[var]
+                    if value:
+                        binding[str(var)] = str(value)
+                bindings.append(binding)
+        finally:
+            guard.deadline = None
+        response = {
+            "head": {"vars": variables},
+            "results": {"bindings": bindings}
+        }
+        if truncated:
+            response["truncated"] = True
+        return response
@@ -0,0 +1,190 @@
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+SPARQL_CACHE_ENTRIES = int(os.getenv("SPARQL_CACHE_ENTRIES", 256))
+SPARQL_CACHE_MAX_BYTES = int(os.getenv("SPARQL_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# 그래프가 바뀐 뒤 다시 실행해 둘 자주 쓰는 쿼리 수 (0이면 미리 채우지 않음)
+SPARQL_CACHE_WARM_QUERIES = int(os.getenv("SPARQL_CACHE_WARM_QUERIES", 0))
+# 연속된 변경을 모아 한 번만 다시 채우기 위한 대기 시간(초)
+SPARQL_CACHE_WARM_DELAY = float(os.getenv("SPARQL_CACHE_WARM_DELAY", 1.0))
+
+# 문자열 리터럴과 IRI는 그대로 두고 그 밖의 공백/주석만 정리
+QUERY_TOKEN_PATTERN = re.compile(
+    r'"""(?:[^"\\]|\\.|"(?!""))*"""'
+    r"|'''(?:[^'\\]|\\.|'(?!''))*'''"
+    r'|"(?:[^"\\\n]|\\.)*"'
+    r"|'(?:[^'\\\n]|\\.)*'"
+    r"|<[^<>\"{}|^`\\\s]*>"
+    r"|#[^\n]*"
+    r"|\s+"
+    r"|[^\s\"'<#]+|."
+)
+
+def normalize_query(query: str) -> str:
+    """주석을 지우고 연속된 공백을 하나로 줄여 같은 쿼리가 같은 키를 갖도록 합니다."""
+    parts = []
+    for token in QUERY_TOKEN_PATTERN.findall(query):
+        if token.startswith("#") or token.isspace():
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+            continue
+        parts.append(token)
+    return "".join(parts).strip()
+
+class QueryCache:
+    """정규화한 쿼리를 키로 SPARQL 결과를 그래프 버전과 함께 보관합니다(LRU).
+
+    저장된 버전이 현재 그래프 버전과 다르면 결과를 쓰지 않고 다시 실행합니다.
+    항목 수(max_entries)와 결과 크기 합(max_bytes)을 넘으면 오래 쓰지 않은 항목부터 지웁니다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SPARQL_CACHE_ENTRIES,
+        max_bytes: int = SPARQL_CACHE_MAX_BYTES,
+        warm_queries: int = SPARQL_CACHE_WARM_QUERIES,
+        warm_delay: float = SPARQL_CACHE_WARM_DELAY
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.warm_queries = warm_queries
+        self.warm_delay = warm_delay
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.warmed = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._warm_event = threading.Event()
+        self._warm_thread: Optional[threading.Thread] = None
+        self._warm_target = None
+
+    def get(self, query: str, version: int) -> Optional[Dict]:
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry["requests"] += 1
+            if entry["version"] != version:
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry["hits"] += 1
+            entry["last_hit"] = datetime.now().isoformat()
+            self.hits += 1
+            return entry["result"]
+
+    def put(self, query: str, version: int, result: Dict):
+        key = normalize_query(query)
+        size = len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry["size"]
+            if size > self.max_bytes:
+                return
+            if entry is None:
+                entry = {"query": key, "hits": 0, "requests": 1, "last_hit": None}
+            entry.update({
+                "version": version,
+                "result": result,
+                "size": size,
+                "cached_at": datetime.now().isoformat()
+            })
+            self._entries[key] = entry
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["size"]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def warm(self, execute: Callable[[str], Dict], version: Callable[[], int]) -> int:
+        """요청이 많았던 쿼리 중 결과가 오래된 것을 현재 그래프로 다시 실행해 채웁니다."""
+        current = version()
+        with self._lock:
+            queries = [
+                entry["query"]
+                for entry in sorted(self._entries.values(), key=lambda entry: entry["requests"], reverse=True)
+                if entry["version"] != current
+            ][:self.warm_queries]
+        warmed = 0
+        for query in queries:
+            try:
+                result = execute(query)
+            except Exception as e:
+                logging.error(f"SPARQL 캐시 미리 채우기 실패: {str(e)}")
+                continue
+            self.put(query, current, result)
+            warmed += 1
+        with self._lock:
+            self.warmed += warmed
+        return warmed
+
+    def schedule_warm(self, execute: Callable[[str], Dict], version: Callable[[], int]):
+        """그래프가 바뀐 뒤 백그라운드 스레드에서 자주 쓰는 쿼리를 다시 채우도록 예약합니다."""
+        if self.warm_queries <= 0:
+            return
+        with self._lock:
+            self._warm_target = (execute, version)
+            if self._warm_thread is None or not self._warm_thread.is_alive():
+                self._warm_thread = threading.Thread(target=self._warm_loop, name="sparql-cache-warm", daemon=True)
+                self._warm_thread.start()
+        self._warm_event.set()
+
+    def _warm_loop(self):
+        while True:
+            self._warm_event.wait()
+            time.sleep(self.warm_delay)
+            self._warm_event.clear()
+            execute, version = self._warm_target
+            self.warm(execute, version)
+
+    def stats(self, top: int = 10) -> Dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            entries: List[Dict] = sorted(
+                (
+                    {
+                        "query": entry["query"],
+                        "hits": entry["hits"],
+                        "requests": entry["requests"],
+                        "size_bytes": entry["size"],
+                        "version": entry["version"],
+                        "cached_at": entry["cached_at"],
+                        "last_hit": entry["last_hit"]
+                    }
+                    for entry in self._entries.values()
+                ),
+                key=lambda entry: (entry["hits"], entry["requests"]),
+                reverse=True
+            )
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "warmed": self.warmed,
+                "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+                "top_entries": entries[:top]
+            }
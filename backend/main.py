@@ -1,16 +1,18 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 import os
+import hashlib
 import shutil
 from pathlib import Path
-from pdfminer.high_level import extract_text
+from parsers.pdf_document import file_sha256, page_diff, page_hashes, parse_document
 import json
 from datetime import datetime, date
 from konlpy.tag import Okt
-from collections import Counter
+import collections
 import re
 import markdown
 import latex2mathml
@@ -19,20 +21,62 @@ import csv
 from transformers import pipeline
 import spacy
 import zipfile
+import tarfile
 import io
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pydantic import BaseModel
 import logging
+import asyncio
+import threading
+import time
+from functools import partial
+from contextlib import asynccontextmanager
 from rdflib import Graph, URIRef, Literal, Namespace
 from rdflib.namespace import RDF, RDFS, XSD
 import uuid
+from urllib.parse import quote
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 import secrets
 from dotenv import load_dotenv
+from storage.conversion_cache import ConversionCache
+from storage.document_store import DOCUMENT_FIELDS, DocumentStore
+from storage.blob_store import BlobCache, create_blob_store
+from storage.change_journal import ChangeJournal
+from storage.compression import COMPRESSOR
+from parsers.content_model import page_blocks
+from search.bm25 import BM25Index, make_snippet
+from search.minhash import DUPLICATE_THRESHOLD, DuplicateIndex
+from search.semantic import SemanticIndex
+from storage.analysis_cache import AnalysisCache
+from graph.emitter import DocumentGraph, QueryTimeout, UnsupportedQuery
+from graph.query_cache import QueryCache
+from monitoring.metrics import (
+    REGISTRY, REQUEST_SECONDS, REQUESTS_IN_PROGRESS, begin_stages, register_cache, register_queue, stage_timer
+)
+# collections.Counter와 헷갈리지 않도록 지표 클래스는 다른 이름으로 가져옴
+from monitoring.metrics import Counter as MetricCounter, Histogram as MetricHistogram
+from monitoring.profiler import ProfileStore, SamplingProfiler, SlowRequestLog
+from scheduling.admission import BATCH, INTERACTIVE, AdmissionController, Rejected, client_address
+from tasks.broker import create_broker
+from tasks.worker import PermanentTaskError
+from starlette.routing import Match
+from extractors import ocr as ocr_extractor
+from extractors.page_images import remove_page_images
+from storage.responses import ranged_file_response
+from generators.writers import WRITERS, iter_document, write_document
 
 # 환경 변수 로드
 load_dotenv()
 
-app = FastAPI(title="AI-Parseable 문서 플랫폼")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 그래프가 생기기 전에 파싱된 문서를 한 번 반영 (쿼리마다 저장소 전체를 나열하지 않도록 시작할 때 백그라운드에서).
+    # 그 뒤의 변경은 파싱/수정 시 emit_rdf와 변경 기록(apply_remote_change)으로 반영됨
+    threading.Thread(target=backfill_graph, name="graph-backfill", daemon=True).start()
+    yield
+
+app = FastAPI(title="AI-Parseable 문서 플랫폼", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -51,6 +95,10 @@ STATIC_DIR.mkdir(exist_ok=True)
 # 정적 파일 마운트
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# 원본, 파싱 결과, 그래프 파일을 두는 blob 저장소 (BLOB_BACKEND=s3이면 작업 디렉토리는 읽기 캐시가 되고
+# 여러 API 노드가 같은 저장소를 공유. 기본 local은 작업 디렉토리에 그대로 저장)
+BLOBS = BlobCache(create_blob_store())
+
 # 업로드 디렉토리 설정
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
@@ -59,6 +107,19 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 PARSED_DIR = Path("parsed")
 PARSED_DIR.mkdir(exist_ok=True)
 
+# 파싱 결과 저장소 (작은 JSON 헤더 + 페이지별 압축 블록)
+DOCUMENT_STORE = DocumentStore(PARSED_DIR, blobs=BLOBS)
+
+# 키워드 검색 색인 (BM25 단어 통계) 과 의미 검색 색인 (청크 임베딩을 메모리 매핑된 행렬에 저장)
+KEYWORD_INDEX = BM25Index()
+SEMANTIC_INDEX = SemanticIndex()
+
+# 유사 문서 탐지 색인 (MinHash 서명 + LSH 버킷) 과 분석 결과 캐시
+DUPLICATE_INDEX = DuplicateIndex()
+ANALYSIS_CACHE = AnalysisCache()
+# 이 유사도 이상인 사본은 분석/요약/개체 추출 결과를 재사용
+ANALYSIS_REUSE_THRESHOLD = float(os.getenv("ANALYSIS_REUSE_THRESHOLD", 0.95))
+
 # 변환 결과 저장 디렉토리
 CONVERTED_DIR = Path("converted")
 CONVERTED_DIR.mkdir(exist_ok=True)
@@ -79,6 +140,62 @@ nlp = None  # 임시로 None으로 설정
 RDF_STORE = "rdf_store"
 os.makedirs(RDF_STORE, exist_ok=True)
 
+# 문서 메타데이터/개체/키워드 그래프 (문서별 N-Triples를 메모리 그래프에 유지하고 변경분만 반영)
+# 다른 노드가 만든 N-Triples를 먼저 받아 둠
+BLOBS.pull(Path(RDF_STORE))
+KNOWLEDGE_GRAPH = DocumentGraph(JSON_STORE, Path(RDF_STORE))
+
+# SPARQL 실행 제한: 전용 워커 스레드에서 제한 시간(초)과 최대 결과 행 수를 두고 실행
+SPARQL_TIMEOUT = float(os.getenv("SPARQL_TIMEOUT", 10))
+SPARQL_MAX_ROWS = int(os.getenv("SPARQL_MAX_ROWS", 10000))
+SPARQL_WORKERS = int(os.getenv("SPARQL_WORKERS", 2))
+# 그래프를 읽지 않는 평가(조인, 정렬, 집계)는 SPARQL_TIMEOUT으로 끊기지 않으므로 요청은 이만큼 더 기다린 뒤 504로 응답
+SPARQL_TIMEOUT_GRACE = float(os.getenv("SPARQL_TIMEOUT_GRACE", 2))
+# 로그에는 결과 수와 앞부분 몇 행만 저장
+SPARQL_LOG_SAMPLE_ROWS = int(os.getenv("SPARQL_LOG_SAMPLE_ROWS", 20))
+SPARQL_LOG_MAX_QUERY_CHARS = 10000
+SPARQL_EXECUTOR = ThreadPoolExecutor(max_workers=SPARQL_WORKERS, thread_name_prefix="sparql")
+run_sparql = partial(KNOWLEDGE_GRAPH.select, max_rows=SPARQL_MAX_ROWS, timeout=SPARQL_TIMEOUT)
+SPARQL_QUERIES = MetricCounter("sparql_queries", "SPARQL 쿼리 수 (result=hit|miss|timeout|error)", ("result",))
+SPARQL_TRUNCATED = MetricCounter("sparql_truncated_results", "SPARQL_MAX_ROWS에서 잘린 결과 수")
+
+# SPARQL 결과 캐시 (정규화한 쿼리 + 그래프 버전 기준, 그래프가 바뀌면 자주 쓰는 쿼리를 다시 채움)
+SPARQL_CACHE = QueryCache()
+KNOWLEDGE_GRAPH.add_listener(
+    lambda version: SPARQL_CACHE.schedule_warm(run_sparql, lambda: KNOWLEDGE_GRAPH.version)
+)
+register_cache("sparql", SPARQL_CACHE.stats)
+
+# 워커를 기다리는 SPARQL 쿼리 수 (대기열 깊이 지표)
+_sparql_waiting = 0
+_sparql_waiting_lock = threading.Lock()
+
+def _count_sparql_waiting(delta: int):
+    global _sparql_waiting
+    with _sparql_waiting_lock:
+        _sparql_waiting += delta
+
+def submit_sparql(query: str) -> Future:
+    """SPARQL 워커에 쿼리를 넣습니다. 워커가 실행을 시작하거나 시작 전에 취소될 때 대기 수에서 뺍니다."""
+    def run():
+        _count_sparql_waiting(-1)
+        return run_sparql(query)
+
+    _count_sparql_waiting(1)
+    try:
+        future = SPARQL_EXECUTOR.submit(run)
+    except Exception:
+        _count_sparql_waiting(-1)
+        raise
+    future.add_done_callback(lambda f: f.cancelled() and _count_sparql_waiting(-1))
+    return future
+
+register_queue("sparql", lambda: _sparql_waiting)
+
+# 작업자 사이 변경 기록: 다른 작업자가 바꾼 문서를 메모리 그래프와 변환 캐시에 반영
+# (SQLite 색인, 분석 캐시, 문서 저장소는 디스크를 직접 읽고 의미 검색 색인은 스스로 다시 읽음)
+CHANGE_JOURNAL = ChangeJournal()
+
 # SPARQL 쿼리 로그 디렉토리 설정
 SPARQL_LOG_DIR = Path("sparql_logs")
 SPARQL_LOG_DIR.mkdir(exist_ok=True)
@@ -96,39 +213,55 @@ def get_admin_credentials(credentials: HTTPBasicCredentials = Depends(security))
         )
     return credentials.username
 
-def log_sparql_query(query: str, results: dict, execution_time: float):
+def log_sparql_query(query: str, results: dict, execution_time: float, cached: bool = False):
     """SPARQL 쿼리와 실행 결과를 로그에 저장합니다."""
     try:
         timestamp = datetime.now().isoformat()
         log_entry = {
             "timestamp": timestamp,
-            "query": query,
-            "results_count": len(results["results"]["bindings"]),
+            "query": query[:SPARQL_LOG_MAX_QUERY_CHARS],
+            "results_count": len(results["results"]["bindings"]) if "results" in results else 0,
+            "truncated": results.get("truncated", False),
             "execution_time_ms": execution_time * 1000,
-            "results": results
+            "cached": cached
         }
+        # 전체 결과 대신 앞부분 일부만 저장 (로그가 결과 크기만큼 커지지 않도록)
+        if "results" in results:
+            log_entry["results"] = {
+                "head": results["head"],
+                "results": {"bindings": results["results"]["bindings"][:SPARQL_LOG_SAMPLE_ROWS]}
+            }
+        else:
+            log_entry["results"] = results
         
-        # 로그 파일 이름 생성 (연/월/일 기준)
+        # 로그 파일 이름 생성 (연/월/일 기준). 쿼리마다 한 줄씩 덧붙임 (그날의 로그를 다시 읽고 쓰지 않음)
         log_date = datetime.now().strftime("%Y-%m-%d")
-        log_file = SPARQL_LOG_DIR / f"sparql_log_{log_date}.json"
-        
-        # 기존 로그 읽기
-        existing_logs = []
-        if log_file.exists():
-            with log_file.open("r", encoding="utf-8") as f:
-                existing_logs = json.load(f)
-        
-        # 새 로그 추가
-        existing_logs.append(log_entry)
-        
-        # 로그 저장
-        with log_file.open("w", encoding="utf-8") as f:
-            json.dump(existing_logs, f, ensure_ascii=False, indent=2)
+        log_file = SPARQL_LOG_DIR / f"sparql_log_{log_date}.jsonl"
+        COMPRESSOR.append_bytes(log_file, (json.dumps(log_entry, ensure_ascii=False) + "\n").encode("utf-8"))
             
         logging.info(f"SPARQL 쿼리 로그가 저장되었습니다: {log_file}")
     except Exception as e:
         logging.error(f"SPARQL 쿼리 로그 저장 중 오류 발생: {str(e)}")
 
+def sparql_log_files() -> List[Path]:
+    # .json은 한 파일에 목록 하나로 저장하던 이전 형식
+    return sorted(SPARQL_LOG_DIR.glob("sparql_log_*.jsonl")) + sorted(SPARQL_LOG_DIR.glob("sparql_log_*.json"))
+
+def read_sparql_logs() -> List[dict]:
+    """모든 SPARQL 쿼리 로그 항목을 읽습니다."""
+    logs = []
+    for log_file in sparql_log_files():
+        if log_file.suffix == ".json":
+            logs.extend(COMPRESSOR.read_json(log_file))
+            continue
+        for line in COMPRESSOR.read_text(log_file).splitlines():
+            try:
+                logs.append(json.loads(line))
+            except ValueError:
+                # 기록하다 중단된 줄
+                continue
+    return logs
+
 @app.get("/")
 async def root():
     return {"message": "AI-Parseable 문서 플랫폼 API 서버"}
@@ -142,20 +275,26 @@ async def upload_file(file: UploadFile = File(...)):
     file_path = UPLOAD_DIR / file.filename
     with file_path.open("wb") as buffer:
         shutil.copyfileobj(file.file, buffer)
+    # 큰 파일은 멀티파트로 올림
+    await run_in_threadpool(BLOBS.push, file_path)
     
     return {"filename": file.filename}
 
 @app.get("/files/")
 async def list_files():
     """업로드된 파일 목록을 반환합니다."""
+    # 원본과 파싱 결과를 한 번씩만 나열 (파일마다 저장소에 묻지 않음)
+    parsed = set(DOCUMENT_STORE.list_documents())
     files = []
-    for file in UPLOAD_DIR.glob("*.pdf"):
-        parsed_file = PARSED_DIR / f"{file.name}.json"
+    for info in BLOBS.list(UPLOAD_DIR):
+        name = info.key[len(UPLOAD_DIR.name) + 1:]
+        if "/" in name or not name.endswith(".pdf"):
+            continue
         files.append({
-            "filename": file.name,
-            "size": file.stat().st_size,
-            "uploaded_at": file.stat().st_mtime,
-            "is_parsed": parsed_file.exists()
+            "filename": name,
+            "size": info.size,
+            "uploaded_at": info.modified,
+            "is_parsed": name in parsed
         })
     return files
 
@@ -163,238 +302,694 @@ async def list_files():
 async def delete_file(filename: str):
     """파일을 삭제합니다."""
     file_path = UPLOAD_DIR / filename
-    parsed_path = PARSED_DIR / f"{filename}.json"
     
-    if not file_path.exists():
+    if not BLOBS.exists(file_path):
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
     
     try:
         # 원본 파일 삭제
-        file_path.unlink()
+        BLOBS.remove(file_path)
         
-        # 파싱된 파일이 있으면 삭제
-        if parsed_path.exists():
-            parsed_path.unlink()
+        # 파싱된 파일이 있으면 삭제 (렌더링해 둔 페이지 이미지도 함께)
+        remove_page_images(parsed_sha256(filename))
+        DOCUMENT_STORE.delete(filename)
+        
+        # 변환 결과 캐시와 검색 색인에서 삭제
+        CONVERSION_CACHE.invalidate(filename)
+        KEYWORD_INDEX.remove_document(filename)
+        SEMANTIC_INDEX.remove_document(filename)
+        DUPLICATE_INDEX.remove_document(filename)
+        KNOWLEDGE_GRAPH.remove(filename)
+        for path in KNOWLEDGE_GRAPH.paths(filename):
+            BLOBS.remove(path)
+        CHANGE_JOURNAL.append("delete", filename)
         
         return {"message": "파일이 삭제되었습니다."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def parse_pdf(file_path: Path) -> dict:
-    """PDF 파일을 파싱하여 텍스트와 메타데이터를 추출합니다."""
+def _keyword_text(metadata: dict, content: str) -> str:
+    """키워드 색인 대상 텍스트 (제목, 작성자, 본문)"""
+    return "\n".join([metadata.get("title", ""), metadata.get("author", ""), content])
+
+def index_keywords(filename: str):
+    """저장된 문서를 키워드 검색 색인에 추가합니다. 색인 실패는 파싱 결과에 영향을 주지 않습니다."""
+    try:
+        data = DOCUMENT_STORE.load(filename)
+        KEYWORD_INDEX.index_document(filename, _keyword_text(data["metadata"], data["content"]))
+    except Exception as e:
+        logging.error(f"키워드 검색 색인 중 오류 발생: {filename}: {str(e)}")
+
+def index_semantic(filename: str):
+    """저장된 문서를 의미 검색 색인에 추가합니다. 색인 실패는 파싱 결과에 영향을 주지 않습니다."""
     try:
-        # 텍스트 추출
-        text = extract_text(str(file_path))
+        SEMANTIC_INDEX.index_document(filename, DOCUMENT_STORE.iter_pages(filename))
+    except Exception as e:
+        logging.error(f"의미 검색 색인 중 오류 발생: {filename}: {str(e)}")
+
+def index_duplicates(filename: str):
+    """저장된 문서의 MinHash 서명을 유사 문서 색인에 추가합니다."""
+    try:
+        DUPLICATE_INDEX.add_document(filename, DOCUMENT_STORE.load(filename)["content"])
+    except Exception as e:
+        logging.error(f"유사 문서 색인 중 오류 발생: {filename}: {str(e)}")
+
+def index_document(filename: str):
+    """저장된 문서를 키워드, 의미, 유사 문서 색인에 모두 반영합니다."""
+    with stage_timer("indexing"):
+        index_keywords(filename)
+        index_semantic(filename)
+        index_duplicates(filename)
+
+def sync_duplicate_index():
+    """서명이 없는 문서를 색인에 추가하고, 저장소에 없는 문서는 색인에서 뺍니다."""
+    documents = set(DOCUMENT_STORE.list_documents())
+    indexed = DUPLICATE_INDEX.documents()
+    for name in documents - indexed:
+        index_duplicates(name)
+    for name in indexed - documents:
+        DUPLICATE_INDEX.remove_document(name)
+
+def emit_rdf(filename: str):
+    """문서의 메타데이터, 태그와 (계산되어 있으면) 키워드, 개체를 JSON-LD/RDF로 내보내고 그래프에 반영합니다."""
+    try:
+        header = DOCUMENT_STORE.read_header(filename)
+        content_hash = header.get("content_hash") or DOCUMENT_STORE.content_hash(filename)
+        analysis = ANALYSIS_CACHE.peek("analysis", content_hash)
+        delta = KNOWLEDGE_GRAPH.emit(
+            filename,
+            header["metadata"],
+            header.get("tags", []),
+            analysis["keywords"] if analysis else None,
+            ANALYSIS_CACHE.peek("entities", content_hash)
+        )
+        if delta["added"] or delta["removed"]:
+            for path in KNOWLEDGE_GRAPH.paths(filename):
+                BLOBS.push(path)
+            CHANGE_JOURNAL.append("rdf", filename)
+    except Exception as e:
+        logging.error(f"RDF 내보내기 중 오류 발생: {filename}: {str(e)}")
+
+def backfill_graph():
+    """그래프에 아직 없는 문서(그래프가 생기기 전에 파싱된 문서)를 내보냅니다."""
+    try:
+        missing = set(DOCUMENT_STORE.list_documents()) - KNOWLEDGE_GRAPH.documents()
+    except Exception as e:
+        logging.error(f"그래프 채우기 실패: {str(e)}")
+        return
+    for filename in sorted(missing):
+        emit_rdf(filename)
+
+def sync_search_indexes():
+    """색인이 생기기 전에 파싱된 문서를 색인에 추가하고, 저장소에 없는 문서는 색인에서 뺍니다."""
+    documents = set(DOCUMENT_STORE.list_documents())
+    keyword_documents = KEYWORD_INDEX.documents()
+    for name in documents - keyword_documents:
+        index_keywords(name)
+    for name in keyword_documents - documents:
+        KEYWORD_INDEX.remove_document(name)
+    semantic_documents = SEMANTIC_INDEX.documents()
+    for name in documents - semantic_documents:
+        index_semantic(name)
+    for name in semantic_documents - documents:
+        SEMANTIC_INDEX.remove_document(name)
+
+def cached_analysis(kind: str, filename: str, compute):
+    """본문이 같은(또는 거의 같은) 문서의 분석 결과가 있으면 다시 계산하지 않고 재사용합니다."""
+    content_hash = DOCUMENT_STORE.content_hash(filename)
+    result = ANALYSIS_CACHE.get(kind, content_hash)
+    if result is not None:
+        return result
+    
+    # 다시 내보내거나 조금 고친 사본이면 원본의 결과를 재사용
+    for duplicate in DUPLICATE_INDEX.near_duplicates(filename, ANALYSIS_REUSE_THRESHOLD):
+        if not DOCUMENT_STORE.exists(duplicate["filename"]):
+            continue
+        result = ANALYSIS_CACHE.get(kind, DOCUMENT_STORE.content_hash(duplicate["filename"]))
+        if result is not None:
+            break
+    
+    if result is None:
+        result = compute()
+    ANALYSIS_CACHE.put(kind, content_hash, result)
+    return result
+
+def parse_pdf(file_path: Path, ocr: bool = True, previous: Optional[List[dict]] = None) -> dict:
+    """PDF 파일을 파싱하여 텍스트와 메타데이터를 추출합니다. pages는 저장용 페이지별 텍스트입니다."""
+    try:
+        # PDF를 한 번만 열어 메타데이터, 페이지 텍스트, OCR, 표, 수식을 함께 추출
+        result = parse_document(file_path, ocr=ocr, previous=previous)
         
         return {
-            "content": text,
-            "metadata": {
-                "title": "제목 없음",
-                "author": "작성자 불명",
-                "date": datetime.now().strftime("%Y-%m-%d")
-            }
+            "content": "".join(page["text"] for page in result["pages"]),
+            "pages": result["pages"],
+            "metadata": result["metadata"],
+            "tables": result["tables"],
+            "equations": result["equations"],
+            "reused_pages": result["reused_pages"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF 파싱 중 오류 발생: {str(e)}")
 
-@app.post("/parse/{filename}")
-async def parse_file(filename: str):
-    """PDF 파일을 파싱하고 결과를 저장합니다."""
+def previous_pages(filename: str) -> Optional[List[dict]]:
+    """다시 파싱할 때 재사용할 이전 파싱 결과 페이지. 텍스트가 비어 OCR이 필요한 페이지는 빼서 다시 처리합니다."""
+    if not DOCUMENT_STORE.exists(filename):
+        return None
+    try:
+        ocr_pages = set(DOCUMENT_STORE.read_header(filename)["metadata"].get("ocr_pages", []))
+        return [
+            {"hash": page["hash"], "text": page["text"], "tables": page["tables"], "ocr": page["page"] in ocr_pages}
+            for page in DOCUMENT_STORE.iter_pages(filename)
+            if page.get("hash") and not ocr_extractor.needs_ocr(page["text"])
+        ]
+    except Exception as e:
+        logging.error(f"이전 파싱 결과 읽기 실패: {filename}: {str(e)}")
+        return None
+
+def parsed_sha256(filename: str) -> Optional[str]:
+    """마지막으로 파싱한 원본 PDF의 내용 해시 (페이지 이미지 캐시 키). 파싱 결과가 없으면 None."""
+    try:
+        return DOCUMENT_STORE.read_header(filename)["metadata"].get("sha256")
+    except Exception:
+        return None
+
+def process_parse(filename: str, ocr: bool = True, index: bool = True, incremental: bool = True) -> dict:
+    """업로드된 PDF를 파싱하여 저장하고 색인과 그래프를 갱신합니다. API와 작업자(tasks.worker, bulk.py)가 함께 씁니다.
+
+    ocr=False이면 OCR을 건너뛰고, 텍스트가 없어 OCR이 필요한 페이지 번호를 ocr_pending으로 돌려줍니다.
+    index=False이면 검색 색인은 호출한 쪽에서 따로 갱신합니다.
+    incremental이면 이전에 파싱한 결과에서 페이지 해시가 같은 페이지를 재사용하고 바뀐 페이지만 다시 처리합니다.
+    """
     file_path = UPLOAD_DIR / filename
-    if not file_path.exists():
+    if not BLOBS.fetch(file_path):
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
     
+    # PDF 파싱
+    previous_sha256 = parsed_sha256(filename)
+    parsed_data = parse_pdf(file_path, ocr=ocr, previous=previous_pages(filename) if incremental else None)
+    if previous_sha256 != parsed_data["metadata"]["sha256"]:
+        # 내용이 바뀐 문서: 이전 내용의 페이지 이미지는 더 쓰지 않음
+        remove_page_images(previous_sha256)
+    
+    # 결과 저장 (페이지/블록 구조로 변환하여 압축 저장)
+    with stage_timer("document_store"):
+        DOCUMENT_STORE.save_document(filename, parsed_data)
+    pages = parsed_data.pop("pages")
+    if not ocr:
+        parsed_data["ocr_pending"] = [page["page"] for page in pages if ocr_extractor.needs_ocr(page["text"])]
+    
+    # 검색 색인과 유사 문서 서명 갱신
+    if index:
+        index_document(filename)
+    emit_rdf(filename)
+    CHANGE_JOURNAL.append("parse", filename)
+    return parsed_data
+
+@app.post("/parse/{filename}")
+async def parse_file(
+    filename: str,
+    background: bool = Query(False, description="작업 대기열에 넣고 바로 반환 (작업자가 처리)"),
+    full: bool = Query(False, description="이전 파싱 결과를 재사용하지 않고 모든 페이지를 다시 처리"),
+    then: Optional[List[str]] = Query(None, description="파싱이 끝나면 이어서 넣을 작업 (analysis, summary, entities, convert)")
+):
+    """PDF 파일을 파싱하고 결과를 저장합니다."""
+    if background:
+        if not await run_in_threadpool(BLOBS.exists, UPLOAD_DIR / filename):
+            raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
+        unknown = [kind for kind in then or [] if kind not in FOLLOWUP_KINDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 작업입니다: {unknown}")
+        task_id = await run_in_threadpool(submit_task, "parse", {"filename": filename, "then": then or [], "full": full})
+        return JSONResponse(
+            status_code=202,
+            content={"status": "queued", "task_id": task_id},
+            headers={"Location": f"/tasks/{task_id}"}
+        )
+    
     try:
-        # PDF 파싱
-        parsed_data = parse_pdf(file_path)
-        
-        # 결과 저장
-        output_path = PARSED_DIR / f"{filename}.json"
-        with output_path.open("w", encoding="utf-8") as f:
-            json.dump(parsed_data, f, ensure_ascii=False, indent=2)
+        parsed_data = process_parse(filename, incremental=not full)
         
         return {
             "status": "success",
             "message": "파싱이 완료되었습니다.",
             "data": parsed_data
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# 변환 형식별 파일 확장자와 MIME 타입 (generators.writers 레지스트리 기준)
+FORMAT_EXTENSIONS = {name: writer.extension for name, writer in WRITERS.items()}
+FORMAT_MEDIA_TYPES = {name: writer.media_type for name, writer in WRITERS.items()}
+
+# 변환 결과 캐시 (원본 해시/mtime 기반 신선도 확인, LRU 용량 제한)
+CONVERSION_CACHE = ConversionCache(
+    CONVERTED_DIR,
+    max_bytes=int(os.getenv("CONVERSION_CACHE_MAX_MB", 1024)) * 1024 * 1024
+)
+
+# 일괄 내보내기 작업자 수
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", 4))
+# 일괄 내보내기 응답으로 보내는 덩어리 크기(바이트)
+EXPORT_CHUNK_SIZE = 256 * 1024
+# 변환에 실패한 문서/형식 목록을 담아 아카이브 끝에 넣는 파일
+EXPORT_ERRORS_NAME = "export_errors.json"
+
+register_cache("analysis", ANALYSIS_CACHE.stats)
+register_cache("conversion", CONVERSION_CACHE.stats)
+register_cache("blob", BLOBS.stats)
+register_queue("ocr", ocr_extractor.pending)
+
+def apply_remote_change(event: dict):
+    """다른 작업자가 기록한 변경을 이 작업자의 메모리 그래프와 검색 색인에 반영합니다.
+
+    변환 캐시 색인은 작업자들이 같은 SQLite 파일을 쓰므로 따로 반영할 것이 없습니다.
+    """
+    for name in event.get("files", []):
+        # 저장소의 N-Triples를 받아 바뀐 트리플만 반영 (그래프 버전이 바뀌면 SPARQL 캐시도 무효화됨)
+        BLOBS.fetch(KNOWLEDGE_GRAPH.paths(name)[1])
+        KNOWLEDGE_GRAPH.refresh(name)
+    if not CHANGE_JOURNAL.is_local(event):
+        # 다른 호스트(작업자 노드 등)의 변경: 검색 색인은 호스트마다 따로 두므로 이 호스트의 색인에도 반영
+        if event.get("op") == "parse":
+            for name in event.get("files", []):
+                index_document(name)
+        elif event.get("op") in ("rename", "delete"):
+            sync_search_indexes()
+            sync_duplicate_index()
+
+CHANGE_JOURNAL.subscribe(apply_remote_change)
+CHANGE_JOURNAL.start()
+
+def _converted_path(filename: str, format: str) -> Path:
+    """변환 결과가 저장될 경로를 반환합니다."""
+    return CONVERTED_DIR / format / f"{filename}.{FORMAT_EXTENSIONS[format]}"
+
+def add_to_archive(archive, path: Path, arcname: str):
+    """압축해 저장한 변환 결과를 풀면서 ZIP 또는 tar 아카이브에 추가합니다."""
+    with COMPRESSOR.open_reader(path) as source:
+        if isinstance(archive, zipfile.ZipFile):
+            with archive.open(arcname, "w") as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+        else:
+            info = tarfile.TarInfo(arcname)
+            info.size = COMPRESSOR.raw_size(path)
+            info.mtime = int(path.stat().st_mtime)
+            archive.addfile(info, source)
+
+def add_bytes_to_archive(archive, arcname: str, data: bytes):
+    """메모리의 작은 파일을 ZIP 또는 tar 아카이브에 추가합니다."""
+    if isinstance(archive, zipfile.ZipFile):
+        archive.writestr(arcname, data)
+    else:
+        info = tarfile.TarInfo(arcname)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        archive.addfile(info, io.BytesIO(data))
+
+class ArchivePipe:
+    """아카이브 writer가 쓰는 바이트를 덩어리로 모아 응답 스트림으로 넘기는 탐색할 수 없는 파일 객체입니다.
+
+    대기열이 차면 쓰는 쪽이 기다리므로 클라이언트가 느려도 메모리에 쌓이는 양은 덩어리 몇 개로 제한되고,
+    읽는 쪽이 cancel()하면(연결이 끊김) 다음 쓰기에서 BrokenPipeError가 발생합니다.
+    """
+
+    _END = object()
+
+    def __init__(self, chunk_size: int = EXPORT_CHUNK_SIZE, max_chunks: int = 8):
+        self.chunk_size = chunk_size
+        self._queue = queue.Queue(max_chunks)
+        self._buffer = bytearray()
+        self._cancelled = threading.Event()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        return len(data)
+
+    def flush(self):
+        """모아 둔 바이트를 덩어리 크기와 관계없이 바로 넘깁니다."""
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def _put(self, item):
+        while True:
+            if self._cancelled.is_set():
+                raise BrokenPipeError("내보내기 응답을 받는 연결이 끊겼습니다.")
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def finish(self, error: Optional[BaseException] = None):
+        """남은 바이트를 넘기고 스트림을 끝냅니다. error가 있으면 읽는 쪽에서 다시 발생시킵니다."""
+        try:
+            if error is None:
+                self.flush()
+            self._put(error if error is not None else self._END)
+        except BrokenPipeError:
+            pass
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+def stream_archive(write_archive):
+    """write_archive(pipe)를 별도 스레드에서 실행하면서 쓰이는 대로 바이트를 내보내는 제너레이터입니다."""
+    pipe = ArchivePipe()
+    
+    def run():
+        try:
+            write_archive(pipe)
+        except BrokenPipeError:
+            pipe.finish()
+        except BaseException as e:
+            logging.error(f"아카이브 생성 실패: {str(e)}")
+            pipe.finish(e)
+        else:
+            pipe.finish()
+    
+    threading.Thread(target=run, name="export-archive", daemon=True).start()
+    try:
+        yield from pipe
+    finally:
+        pipe.cancel()
+
+def conversion_source(filename: str) -> dict:
+    """변환할 문서를 페이지 단위로 읽는 형태로 준비합니다.
+
+    본문은 페이지를 하나씩 읽으며 내보내고, 표와 수식은 같은 페이지를 읽을 때 모아 두었다가
+    writer가 본문 뒤에 쓰므로 문서 전체를 메모리에 올리거나 두 번 읽지 않습니다.
+    """
+    header = DOCUMENT_STORE.read_header(filename)
+    tables, equations = [], []
+    
+    def pages():
+        for page in DOCUMENT_STORE.iter_pages(filename):
+            tables.extend(page.get("tables") or [])
+            equations.extend(page.get("equations") or [])
+            yield page
+    
+    return {
+        "metadata": header["metadata"],
+        "content": pages(),
+        "tables": tables,
+        "equations": equations
+    }
+
+def render_conversion(filename: str, format: str, force: bool = False) -> Path:
+    """파싱된 문서를 지정된 형식으로 변환하여 CONVERTED_DIR에 저장합니다."""
+    if format not in FORMAT_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다: {format}")
+    
+    if not DOCUMENT_STORE.exists(filename):
+        raise HTTPException(status_code=404, detail="파싱된 파일을 찾을 수 없습니다.")
+    parsed_path = DOCUMENT_STORE.path(filename)
+    
+    output_path = _converted_path(filename, format)
+    if not force:
+        cached_path = CONVERSION_CACHE.lookup(parsed_path, output_path)
+        if cached_path is not None:
+            return cached_path
+    
+    data = conversion_source(filename)
+    
+    # 변환 결과 저장 디렉토리 생성
+    output_path.parent.mkdir(exist_ok=True)
+    
+    # 압축하면서 임시 파일에 쓴 뒤 교체 (동시 변환 시 반쯤 쓰인 파일이 노출되지 않음)
+    with stage_timer("conversion"), COMPRESSOR.open_text_writer(output_path, newline="") as f:
+        write_document(data, format, f)
+    
+    CONVERSION_CACHE.store(parsed_path, output_path, filename)
+    return output_path
+
 @app.get("/convert/{filename}")
 async def convert_file(
     filename: str,
-    format: str = Query(..., description="변환할 형식 (markdown, latex, csv, jsonld)")
+    format: str = Query(..., description="변환할 형식 (markdown, latex, csv, jsonld, html)"),
+    force: bool = False
 ):
-    """파일을 지정된 형식으로 변환합니다."""
-    parsed_path = PARSED_DIR / f"{filename}.json"
-    if not parsed_path.exists():
-        raise HTTPException(status_code=404, detail="파싱된 파일을 찾을 수 없습니다.")
-    
+    """파일을 지정된 형식으로 변환합니다. 원본이 바뀌지 않았으면 캐시된 결과를 사용합니다."""
     try:
-        with parsed_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        # 변환 결과 저장 디렉토리 생성
-        format_dir = CONVERTED_DIR / format
-        format_dir.mkdir(exist_ok=True)
-        
-        if format == "markdown":
-            # Markdown 변환
-            md_content = f"# {data['metadata']['title']}\n\n"
-            md_content += f"**작성자**: {data['metadata']['author']}\n\n"
-            md_content += f"**작성일**: {data['metadata']['date']}\n\n"
-            md_content += data['content']
-            
-            output_path = format_dir / f"{filename}.md"
-            with output_path.open("w", encoding="utf-8") as f:
-                f.write(md_content)
-                
-        elif format == "latex":
-            # LaTeX 변환
-            latex_content = f"\\documentclass{{article}}\n\\title{{{data['metadata']['title']}}}\n\\author{{{data['metadata']['author']}}}\n\\date{{{data['metadata']['date']}}}\n\\begin{{document}}\n\\maketitle\n\n"
-            latex_content += data['content'].replace('\n', '\n\n')
-            latex_content += "\n\\end{document}"
-            
-            output_path = format_dir / f"{filename}.tex"
-            with output_path.open("w", encoding="utf-8") as f:
-                f.write(latex_content)
-                
-        elif format == "csv":
-            # CSV 변환 (표 형식 데이터 추출)
-            # 간단한 예시: 각 문단을 행으로 변환
-            paragraphs = [p.strip() for p in data['content'].split('\n\n') if p.strip()]
-            df = pd.DataFrame({
-                'paragraph': paragraphs,
-                'length': [len(p) for p in paragraphs]
-            })
-            
-            output_path = format_dir / f"{filename}.csv"
-            df.to_csv(output_path, index=False, encoding='utf-8')
-            
-        elif format == "jsonld":
-            # JSON-LD 변환
-            jsonld = {
-                "@context": "https://schema.org",
-                "@type": "Document",
-                "name": data['metadata']['title'],
-                "author": {
-                    "@type": "Person",
-                    "name": data['metadata']['author']
-                },
-                "dateCreated": data['metadata']['date'],
-                "text": data['content']
-            }
-            
-            output_path = format_dir / f"{filename}.jsonld"
-            with output_path.open("w", encoding="utf-8") as f:
-                json.dump(jsonld, f, ensure_ascii=False, indent=2)
+        output_path = await run_in_threadpool(render_conversion, filename, format, force)
         
         return {
             "status": "success",
             "message": f"파일이 {format} 형식으로 변환되었습니다.",
             "path": str(output_path)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/convert/{filename}/stream")
+async def stream_conversion(
+    filename: str,
+    format: str = Query(..., description="변환할 형식 (markdown, latex, csv, jsonld, html)")
+):
+    """변환 결과를 디스크에 쓰지 않고 바로 응답으로 스트리밍합니다."""
+    if format not in FORMAT_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다: {format}")
+    
+    if not await run_in_threadpool(DOCUMENT_STORE.exists, filename):
+        raise HTTPException(status_code=404, detail="파싱된 파일을 찾을 수 없습니다.")
+    
+    # 본문은 페이지 단위로 읽으면서 바로 내보내고, 표와 수식은 같은 읽기에서 모아 본문 뒤에 내보냄.
+    # 헤더는 스레드에서 읽고, 본문 제너레이터는 StreamingResponse가 스레드에서 돌림
+    data = await run_in_threadpool(conversion_source, filename)
+    
+    return StreamingResponse(
+        (chunk.encode("utf-8") for chunk in iter_document(data, format)),
+        media_type=FORMAT_MEDIA_TYPES[format]
+    )
+
 @app.get("/download/{filename}")
-async def download_file(filename: str, format: str):
-    """변환된 파일을 다운로드합니다."""
-    format_dir = CONVERTED_DIR / format
-    file_path = format_dir / f"{filename}.{format}"
+async def download_file(request: Request, filename: str, format: str):
+    """변환된 파일을 다운로드합니다. ETag와 Range 요청을 지원합니다."""
+    if format not in FORMAT_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다: {format}")
     
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="변환된 파일을 찾을 수 없습니다.")
+    # 캐시가 신선하면 stat만으로 끝나고, 오래되었으면 다시 변환
+    try:
+        file_path = await run_in_threadpool(render_conversion, filename, format)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
     
-    return {
-        "filename": f"{filename}.{format}",
-        "content": file_path.read_text(encoding="utf-8")
-    }
+    content_hash = await run_in_threadpool(CONVERSION_CACHE.content_hash, file_path)
+    return ranged_file_response(
+        request, file_path, FORMAT_MEDIA_TYPES[format], file_path.name, content_hash=content_hash
+    )
 
 @app.get("/documents/{filename}")
-async def get_document(filename: str):
-    """파싱된 문서 데이터를 반환합니다."""
-    file_path = PARSED_DIR / f"{filename}.json"
-    if not file_path.exists():
+async def get_document(
+    filename: str,
+    fields: Optional[List[str]] = Query(None, description="반환할 필드 (metadata, tags, content, tables, equations)"),
+    start_page: Optional[int] = Query(None, ge=1, description="시작 페이지 (포함)"),
+    end_page: Optional[int] = Query(None, ge=1, description="끝 페이지 (포함)"),
+    offset: Optional[int] = Query(None, ge=0, description="본문 문자 구간 시작 위치"),
+    limit: Optional[int] = Query(None, ge=0, description="본문 문자 구간 길이")
+):
+    """파싱된 문서 데이터를 반환합니다.
+    
+    매개변수가 없으면 문서 전체를, 있으면 요청한 필드와 범위만 페이지 색인으로 찾아 읽어
+    range 정보(실제 반환된 페이지와 문자 구간, 전체 길이)와 함께 반환합니다.
+    """
+    if not DOCUMENT_STORE.exists(filename):
         raise HTTPException(status_code=404, detail="파싱된 문서를 찾을 수 없습니다.")
     
+    unknown_fields = [field for field in fields or [] if field not in DOCUMENT_FIELDS]
+    if unknown_fields:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 필드입니다: {unknown_fields}")
+    if start_page and end_page and start_page > end_page:
+        raise HTTPException(status_code=400, detail="start_page는 end_page보다 클 수 없습니다.")
+    
     try:
-        with file_path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        if fields is None and start_page is None and end_page is None and offset is None and limit is None:
+            return DOCUMENT_STORE.load(filename)
+        return DOCUMENT_STORE.read(filename, fields, start_page, end_page, offset, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/search/")
-async def search_documents(query: str):
-    """문서를 검색합니다."""
+@app.get("/documents/{filename}/pages/{page}")
+async def get_document_page(filename: str, page: int):
+    """한 페이지의 구조화된 블록(제목, 문단, 표, 수식)만 읽어 반환합니다."""
+    if not DOCUMENT_STORE.exists(filename):
+        raise HTTPException(status_code=404, detail="파싱된 문서를 찾을 수 없습니다.")
+    
+    try:
+        found = next(DOCUMENT_STORE.iter_pages(filename, [page]), None)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if found is None:
+        raise HTTPException(status_code=404, detail="페이지를 찾을 수 없습니다.")
+    
+    return {
+        "page": found["page"],
+        "start": found["start"],
+        "end": found["end"],
+        "blocks": page_blocks(found)
+    }
+
+def _keyword_results(query: str, top_k: int, candidates: Optional[set] = None) -> List[dict]:
+    """BM25 점수 상위 top_k개 문서만 본문을 읽어 질의 위치 중심의 발췌문을 붙입니다."""
+    sync_search_indexes()
     results = []
-    for file in PARSED_DIR.glob("*.json"):
+    for score, name in KEYWORD_INDEX.search(query, top_k, candidates):
         try:
-            with file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                if query.lower() in data["content"].lower() or \
-                   query.lower() in data["metadata"]["title"].lower() or \
-                   query.lower() in data["metadata"]["author"].lower():
-                    results.append({
-                        "filename": file.stem,
-                        "title": data["metadata"]["title"],
-                        "author": data["metadata"]["author"],
-                        "date": data["metadata"]["date"],
-                        "snippet": data["content"][:200] + "..."
-                    })
+            data = DOCUMENT_STORE.load(name)
         except Exception:
             continue
+        results.append({
+            "filename": name,
+            "title": data["metadata"]["title"],
+            "author": data["metadata"]["author"],
+            "date": data["metadata"]["date"],
+            "score": round(score, 4),
+            "tags": data.get("tags", []),
+            **make_snippet(data["content"], query)
+        })
     return results
 
+@app.get("/search/")
+async def search_documents(query: str, top_k: int = Query(20, ge=1, le=100)):
+    """문서를 검색합니다. BM25 점수가 높은 순서로 top_k개를 반환합니다."""
+    try:
+        return await run_in_threadpool(_keyword_results, query, top_k)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _semantic_search(query: str, top_k: int, alpha: float) -> List[dict]:
+    """의미 유사도와 BM25 점수(후보 중 최고점으로 정규화)를 합친 점수로 문서를 고릅니다.
+    
+    문서마다 가장 유사한 청크를 대표로 씁니다.
+    """
+    sync_search_indexes()
+    
+    hits = SEMANTIC_INDEX.search(query, top_k * 5)
+    
+    # 후보 청크가 있는 페이지만 읽음
+    pages_by_document = {}
+    for _, name, page, _, _ in hits:
+        pages_by_document.setdefault(name, set()).add(page)
+    keyword_scores = KEYWORD_INDEX.scores(query, set(pages_by_document))
+    max_keyword_score = max(keyword_scores.values(), default=0.0) or 1.0
+    page_texts = {}
+    for name, pages in pages_by_document.items():
+        for page in DOCUMENT_STORE.iter_pages(name, pages):
+            page_texts[(name, page["page"])] = (page["start"], page["text"])
+    
+    best = {}
+    for similarity, name, page, start, end in hits:
+        page_start, page_text = page_texts[(name, page)]
+        keyword_score = keyword_scores.get(name, 0.0) / max_keyword_score
+        score = alpha * similarity + (1 - alpha) * keyword_score
+        if name not in best or score > best[name]["score"]:
+            best[name] = {
+                "filename": name,
+                "score": round(score, 4),
+                "semantic_score": round(similarity, 4),
+                "keyword_score": round(keyword_score, 4),
+                "page": page,
+                "chunk": page_text[start - page_start:end - page_start]
+            }
+    
+    results = sorted(best.values(), key=lambda hit: hit["score"], reverse=True)[:top_k]
+    for hit in results:
+        metadata = DOCUMENT_STORE.read_header(hit["filename"])["metadata"]
+        hit.update(title=metadata["title"], author=metadata["author"], date=metadata["date"])
+        hit.update(make_snippet(hit.pop("chunk"), query))
+    return results
+
+@app.get("/semantic-search/")
+async def semantic_search(
+    query: str,
+    top_k: int = Query(10, ge=1, le=100),
+    alpha: float = Query(0.7, ge=0.0, le=1.0, description="의미 유사도 가중치 (나머지는 BM25 점수)")
+):
+    """문서를 의미 기반으로 검색합니다."""
+    try:
+        return await run_in_threadpool(_semantic_search, query, top_k, alpha)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/advanced-search/")
 async def advanced_search(
     query: str = "",
     author: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    tags: Optional[List[str]] = Query(None)
+    tags: Optional[List[str]] = Query(None),
+    top_k: int = Query(20, ge=1, le=100)
 ):
-    """고급 검색 기능을 제공합니다."""
-    results = []
+    """고급 검색 기능을 제공합니다. 검색어가 있으면 필터를 통과한 문서를 BM25 점수 순으로 반환합니다."""
+    filtered = {}
     
-    for file in PARSED_DIR.glob("*.json"):
+    for name in DOCUMENT_STORE.list_documents():
         try:
-            with file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                
-                # 기본 검색어 매칭
-                content_match = not query or query.lower() in data["content"].lower()
-                
-                # 작성자 필터링
-                author_match = not author or (
-                    data["metadata"]["author"] and 
-                    author.lower() in data["metadata"]["author"].lower()
-                )
-                
-                # 날짜 범위 필터링
-                doc_date = datetime.strptime(data["metadata"]["date"], "%Y-%m-%d").date()
-                date_match = (
-                    (not start_date or doc_date >= start_date) and
-                    (not end_date or doc_date <= end_date)
-                )
-                
-                # 태그 필터링 (태그 기능은 나중에 구현)
-                tags_match = not tags or any(
-                    tag in data.get("tags", []) for tag in tags
-                )
-                
-                if content_match and author_match and date_match and tags_match:
-                    results.append({
-                        "filename": file.stem,
-                        "title": data["metadata"]["title"],
-                        "author": data["metadata"]["author"],
-                        "date": data["metadata"]["date"],
-                        "snippet": data["content"][:200] + "...",
-                        "tags": data.get("tags", [])
-                    })
+            # 메타데이터와 태그 필터는 헤더만으로 판단
+            header = DOCUMENT_STORE.read_header(name)
+            metadata = header["metadata"]
+            document_tags = header.get("tags", [])
+            
+            # 작성자 필터링
+            author_match = not author or (
+                metadata["author"] and 
+                author.lower() in metadata["author"].lower()
+            )
+            
+            # 날짜 범위 필터링
+            doc_date = datetime.strptime(metadata["date"], "%Y-%m-%d").date()
+            date_match = (
+                (not start_date or doc_date >= start_date) and
+                (not end_date or doc_date <= end_date)
+            )
+            
+            # 태그 필터링
+            tags_match = not tags or any(
+                tag in document_tags for tag in tags
+            )
+            
+            if author_match and date_match and tags_match:
+                filtered[name] = header
         except Exception:
             continue
+    
+    # 기본 검색어 매칭
+    if query:
+        try:
+            return await run_in_threadpool(_keyword_results, query, top_k, set(filtered))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    results = []
+    for name, header in list(filtered.items())[:top_k]:
+        # 발췌문에 필요한 앞부분만 읽음
+        content = DOCUMENT_STORE.read(name, ["content"], offset=0, limit=200)["content"]
+        results.append({
+            "filename": name,
+            "title": header["metadata"]["title"],
+            "author": header["metadata"]["author"],
+            "date": header["metadata"]["date"],
+            "snippet": content + "...",
+            "tags": header.get("tags", [])
+        })
             
     return results
 
@@ -406,23 +1001,26 @@ async def update_file_metadata(
     tags: Optional[List[str]] = None
 ):
     """파일의 메타데이터를 업데이트합니다."""
-    file_path = PARSED_DIR / f"{filename}.json"
-    if not file_path.exists():
+    if not DOCUMENT_STORE.exists(filename):
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
     
     try:
-        with file_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            
+        metadata = {}
         if title:
-            data["metadata"]["title"] = title
+            metadata["title"] = title
         if author:
-            data["metadata"]["author"] = author
-        if tags is not None:
-            data["tags"] = tags
-            
-        with file_path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            metadata["author"] = author
+        
+        # 헤더만 다시 쓰고 페이지 본문은 그대로 복사
+        DOCUMENT_STORE.update_metadata(filename, metadata, tags)
+        
+        # 제목과 작성자는 키워드 색인 대상이므로 다시 색인
+        if metadata:
+            index_keywords(filename)
+        
+        # 그래프에는 바뀐 트리플만 반영
+        emit_rdf(filename)
+        CHANGE_JOURNAL.append("metadata", filename)
             
         return {"message": "메타데이터가 업데이트되었습니다."}
     except Exception as e:
@@ -436,21 +1034,30 @@ async def rename_file(filename: str, new_filename: str):
         
     old_file = UPLOAD_DIR / filename
     new_file = UPLOAD_DIR / new_filename
-    old_json = PARSED_DIR / f"{filename}.json"
-    new_json = PARSED_DIR / f"{new_filename}.json"
     
-    if not old_file.exists():
+    if not BLOBS.exists(old_file):
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
-    if new_file.exists():
+    if BLOBS.exists(new_file):
         raise HTTPException(status_code=400, detail="이미 존재하는 파일 이름입니다.")
     
     try:
         # 원본 파일 이름 변경
-        old_file.rename(new_file)
+        BLOBS.move(old_file, new_file)
         
-        # 파싱된 JSON 파일이 있다면 이름 변경
-        if old_json.exists():
-            old_json.rename(new_json)
+        # 파싱된 문서가 있다면 이름 변경
+        DOCUMENT_STORE.rename(filename, new_filename)
+        
+        # 이전 이름으로 변환된 결과 삭제
+        CONVERSION_CACHE.invalidate(filename)
+        KEYWORD_INDEX.rename_document(filename, new_filename)
+        SEMANTIC_INDEX.rename_document(filename, new_filename)
+        DUPLICATE_INDEX.rename_document(filename, new_filename)
+        KNOWLEDGE_GRAPH.remove(filename)
+        for path in KNOWLEDGE_GRAPH.paths(filename):
+            BLOBS.remove(path)
+        if DOCUMENT_STORE.exists(new_filename):
+            emit_rdf(new_filename)
+        CHANGE_JOURNAL.append("rename", filename, new_filename)
             
         return {"message": "파일 이름이 변경되었습니다."}
     except Exception as e:
@@ -460,7 +1067,7 @@ async def rename_file(filename: str, new_filename: str):
 async def get_file_versions(filename: str):
     """파일의 버전 기록을 반환합니다."""
     file_path = UPLOAD_DIR / filename
-    if not file_path.exists():
+    if not BLOBS.exists(file_path):
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
     
     # 버전 디렉토리 생성
@@ -469,20 +1076,78 @@ async def get_file_versions(filename: str):
     
     # 버전 목록 반환
     versions = []
-    for version in versions_dir.glob("*.pdf"):
+    for info in BLOBS.list(versions_dir):
+        if not info.key.endswith(".pdf"):
+            continue
         versions.append({
-            "version": version.stem.split('_v')[-1],
-            "created_at": version.stat().st_mtime,
-            "size": version.stat().st_size
+            "version": Path(info.key).stem.split('_v')[-1],
+            "created_at": info.modified,
+            "size": info.size
         })
     
     return sorted(versions, key=lambda x: x["version"], reverse=True)
 
+def _version_file(filename: str, version: int) -> Path:
+    return UPLOAD_DIR / "versions" / filename.replace('.pdf', '') / f"{filename.replace('.pdf', '')}_v{version}.pdf"
+
+def version_hashes(filename: str, version: int) -> Optional[List[str]]:
+    """버전의 페이지 해시. 버전 메타데이터에 없으면(이전에 만든 버전) 버전 PDF에서 계산합니다."""
+    version_file = _version_file(filename, version)
+    metadata_file = version_file.with_suffix('.json')
+    if BLOBS.fetch(metadata_file):
+        hashes = COMPRESSOR.read_json(metadata_file).get("page_hashes")
+        if hashes is not None:
+            return hashes
+    if not BLOBS.fetch(version_file):
+        return None
+    return page_hashes(version_file)
+
+def parsed_page_hashes(filename: str, sha256: str) -> Optional[List[str]]:
+    """파싱할 때 계산해 문서 헤더에 남긴 페이지 해시. 파싱한 내용이 sha256과 다르거나 해시가 없으면 None."""
+    try:
+        header = DOCUMENT_STORE.read_header(filename)
+    except Exception:
+        return None
+    if header["metadata"].get("sha256") != sha256:
+        return None
+    hashes = [entry.get("hash") for entry in header["pages"]]
+    return hashes if all(hashes) else None
+
+def snapshot_version(filename: str, version: int, note: str = "") -> dict:
+    """현재 원본을 버전 파일로 복사하고 페이지 해시와 이전 버전 대비 페이지 변경 내역을 함께 저장합니다.
+
+    원본을 마지막으로 파싱한 결과가 있으면 그때 계산한 페이지 해시를 쓰고 PDF를 다시 열지 않습니다.
+    """
+    file_path = UPLOAD_DIR / filename
+    version_file = _version_file(filename, version)
+    version_file.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(file_path, version_file)
+    
+    hashes = parsed_page_hashes(filename, file_sha256(version_file)) or page_hashes(version_file)
+    base = version_hashes(filename, version - 1) if version > 1 else None
+    metadata = {
+        "version": version,
+        "created_at": datetime.now().isoformat(),
+        "note": note,
+        "page_hashes": hashes,
+        "diff": dict(page_diff(base, hashes), base=version - 1) if base is not None else None
+    }
+    
+    # 버전 메타데이터 저장
+    metadata_file = version_file.with_suffix('.json')
+    COMPRESSOR.write_json(metadata_file, metadata)
+    BLOBS.push(version_file)
+    BLOBS.push(metadata_file)
+    return metadata
+
 @app.post("/files/{filename}/version")
-async def create_version(filename: str, version_note: str = ""):
-    """파일의 새 버전을 생성합니다."""
+async def create_version(filename: str, version_note: str = "", file: Optional[UploadFile] = File(None)):
+    """파일의 새 버전을 생성합니다.
+
+    새 내용(file)을 함께 올리면 원본을 바꾸고, 파싱된 문서는 바뀐 페이지만 다시 추출, OCR, 분석합니다.
+    """
     file_path = UPLOAD_DIR / filename
-    if not file_path.exists():
+    if not await run_in_threadpool(BLOBS.fetch, file_path):
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
     
     # 버전 디렉토리 생성
@@ -490,80 +1155,128 @@ async def create_version(filename: str, version_note: str = ""):
     versions_dir.mkdir(parents=True, exist_ok=True)
     
     # 새 버전 번호 생성
-    existing_versions = [int(v.stem.split('_v')[-1]) for v in versions_dir.glob("*.pdf")]
+    existing_versions = [
+        int(Path(info.key).stem.split('_v')[-1]) for info in BLOBS.list(versions_dir) if info.key.endswith(".pdf")
+    ]
     new_version = max(existing_versions, default=0) + 1
     
-    # 새 버전 파일 생성
-    version_file = versions_dir / f"{filename.replace('.pdf', '')}_v{new_version}.pdf"
-    shutil.copy2(file_path, version_file)
+    reparse = None
+    if file is not None:
+        # 처음 올리는 새 내용이면 지금 원본을 먼저 1번 버전으로 남겨 비교 기준으로 삼음
+        if new_version == 1:
+            await run_in_threadpool(snapshot_version, filename, 1)
+            new_version = 2
+        with file_path.open("wb") as buffer:
+            shutil.copyfileobj(file.file, buffer)
+        await run_in_threadpool(BLOBS.push, file_path)
+        
+        if DOCUMENT_STORE.exists(filename):
+            try:
+                parsed_data = await run_in_threadpool(process_parse, filename)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logging.error(f"새 버전 파싱 중 오류 발생: {filename}: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"PDF 파싱 중 오류 발생: {str(e)}")
+            reused = parsed_data.get("reused_pages", [])
+            reparse = {
+                "reused_pages": reused,
+                "parsed_pages": sorted(set(range(1, parsed_data["metadata"].get("pages", 0) + 1)) - set(reused))
+            }
     
-    # 버전 메타데이터 저장
-    metadata_file = version_file.with_suffix('.json')
-    with metadata_file.open('w', encoding='utf-8') as f:
-        json.dump({
-            "version": new_version,
-            "created_at": datetime.now().isoformat(),
-            "note": version_note
-        }, f, ensure_ascii=False, indent=2)
+    metadata = await run_in_threadpool(snapshot_version, filename, new_version, version_note)
     
     return {
         "message": "새 버전이 생성되었습니다.",
-        "version": new_version
+        "version": new_version,
+        "diff": metadata["diff"]["summary"] if metadata["diff"] else None,
+        "reparse": reparse
     }
 
+@app.get("/files/{filename}/versions/{version}/diff")
+async def get_version_diff(
+    filename: str,
+    version: int,
+    base: Optional[int] = Query(None, description="비교할 이전 버전 (기본: 바로 앞 버전)")
+):
+    """두 버전 사이에 바뀐/추가된/삭제된 페이지를 반환합니다."""
+    base = version - 1 if base is None else base
+    hashes = await run_in_threadpool(version_hashes, filename, version)
+    if hashes is None:
+        raise HTTPException(status_code=404, detail="버전을 찾을 수 없습니다.")
+    base_hashes = await run_in_threadpool(version_hashes, filename, base) if base > 0 else None
+    if base_hashes is None:
+        raise HTTPException(status_code=404, detail="비교할 버전을 찾을 수 없습니다.")
+    
+    return dict(page_diff(base_hashes, hashes), version=version, base=base)
+
 @app.get("/tags/")
 async def get_all_tags():
     """모든 태그 목록을 반환합니다."""
     tags = set()
-    for file in PARSED_DIR.glob("*.json"):
+    for name in DOCUMENT_STORE.list_documents():
         try:
-            with file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                if "tags" in data:
-                    tags.update(data["tags"])
+            tags.update(DOCUMENT_STORE.read_header(name).get("tags", []))
         except Exception:
             continue
     
     return sorted(list(tags))
 
-def extract_keywords(text: str, top_n: int = 10) -> List[dict]:
-    """텍스트에서 주요 키워드를 추출합니다."""
-    okt = Okt()
-    
-    # 명사 추출
-    nouns = okt.nouns(text)
-    
-    # 2글자 이상의 명사만 선택
-    nouns = [noun for noun in nouns if len(noun) > 1]
-    
-    # 빈도수 계산
-    counter = Counter(nouns)
-    
-    # 상위 N개 키워드 반환
-    keywords = [
-        {"word": word, "count": count}
-        for word, count in counter.most_common(top_n)
-    ]
-    
-    return keywords
+def page_features(text: str) -> dict:
+    """페이지 하나의 문장별 명사와 (spaCy가 있으면) 개체를 계산합니다.
 
-def summarize_text(text: str, sentences: int = 3) -> str:
-    """텍스트를 요약합니다."""
-    # Okt 초기화
-    okt = Okt()
+    페이지 본문 해시로 캐시하므로 새 버전에서는 바뀐 페이지만 다시 분석하고 나머지는 이전 결과를 씁니다.
+    """
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    features = ANALYSIS_CACHE.peek("page_features", key)
+    if features is not None and (nlp is None or "entities" in features):
+        return features
     
     # 문장 분리
     sentence_list = re.split('[.!?]', text)
     sentence_list = [s.strip() for s in sentence_list if s.strip()]
     
+    # 명사 추출 (문서 키워드와 요약 문장 점수에 함께 씀)
+    with stage_timer("morphological_analysis"):
+        okt = Okt()
+        features = {"sentences": [[sentence, okt.nouns(sentence)] for sentence in sentence_list]}
+    if nlp is not None:
+        with stage_timer("entity_recognition"):
+            features["entities"] = [[ent.text, ent.label_] for ent in nlp(text).ents]
+    ANALYSIS_CACHE.put("page_features", key, features)
+    return features
+
+def document_features(filename: str) -> List[dict]:
+    return [page_features(page["text"]) for page in DOCUMENT_STORE.iter_pages(filename)]
+
+def extract_keywords(features: List[dict], top_n: int = 10) -> List[dict]:
+    """페이지별 명사에서 주요 키워드를 추출합니다."""
+    with stage_timer("keyword_scoring"):
+        # 2글자 이상의 명사만 선택하여 빈도수 계산
+        counter = collections.Counter(
+            noun for page in features for _, nouns in page["sentences"] for noun in nouns if len(noun) > 1
+        )
+        
+        # 상위 N개 키워드 반환
+        keywords = [
+            {"word": word, "count": count}
+            for word, count in counter.most_common(top_n)
+        ]
+    
+    return keywords
+
+def summarize_text(features: List[dict], sentences: int = 3) -> str:
+    """키워드를 많이 포함한 문장을 골라 요약합니다."""
     # 각 문장의 중요도 계산 (단순히 키워드 포함 개수로 계산)
-    keywords = extract_keywords(text, top_n=20)
+    keywords = extract_keywords(features, top_n=20)
     keyword_set = {kw["word"] for kw in keywords}
     
-    sentence_scores = []
-    for sentence in sentence_list:
-        score = sum(1 for word in okt.nouns(sentence) if word in keyword_set)
-        sentence_scores.append((sentence, score))
+    with stage_timer("keyword_scoring"):
+        sentence_scores = [
+            (sentence, sum(1 for word in nouns if word in keyword_set))
+            for page in features
+            for sentence, nouns in page["sentences"]
+        ]
     
     # 점수가 높은 순으로 정렬하여 상위 N개 문장 선택
     sorted_sentences = sorted(sentence_scores, key=lambda x: x[1], reverse=True)
@@ -571,33 +1284,80 @@ def summarize_text(text: str, sentences: int = 3) -> str:
     
     # 원래 순서대로 재정렬
     original_order = []
-    for sentence in sentence_list:
+    for sentence, _ in sentence_scores:
         if sentence in summary_sentences:
             original_order.append(sentence)
     
     return '. '.join(original_order) + '.'
 
+def analyze_text(filename: str) -> dict:
+    features = document_features(filename)
+    
+    # 분석 수행
+    keywords = extract_keywords(features)
+    summary = summarize_text(features)
+    
+    return {
+        "keywords": keywords,
+        "summary": summary
+    }
+
+def summarize_document(filename: str) -> dict:
+    # 텍스트 요약
+    if summarizer is None:
+        # 기본 요약 기능 사용
+        summary = summarize_text(document_features(filename))
+    else:
+        data = DOCUMENT_STORE.load(filename)
+        summary = summarizer(data["content"], max_length=130, min_length=30, do_sample=False)
+        summary = summary[0]["summary_text"]
+    
+    return {
+        "summary": summary
+    }
+
+def recognize_entities(filename: str) -> dict:
+    features = document_features(filename)
+    
+    # 개체 추출 (spaCy가 없으면 키워드만)
+    entities = {
+        "organizations": [],
+        "dates": [],
+        "locations": [],
+        "persons": [],
+        "keywords": extract_keywords(features)
+    }
+    
+    for page in features:
+        for text, label in page.get("entities", []):
+            if label == "ORG":
+                entities["organizations"].append(text)
+            elif label == "DATE":
+                entities["dates"].append(text)
+            elif label == "GPE" or label == "LOC":
+                entities["locations"].append(text)
+            elif label == "PERSON":
+                entities["persons"].append(text)
+    return entities
+
+# 분석 종류별 계산 함수 (결과는 cached_analysis로 본문 해시 기준 캐시)
+ANALYZERS = {
+    "analysis": analyze_text,
+    "summary": summarize_document,
+    "entities": recognize_entities
+}
+
 @app.get("/files/{filename}/analysis")
 async def analyze_document(filename: str):
     """문서를 분석하여 요약과 키워드를 추출합니다."""
-    file_path = PARSED_DIR / f"{filename}.json"
-    if not file_path.exists():
+    if not DOCUMENT_STORE.exists(filename):
         raise HTTPException(status_code=404, detail="파싱된 문서를 찾을 수 없습니다.")
     
     try:
-        with file_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            
-        text = data["content"]
-        
-        # 분석 수행
-        keywords = extract_keywords(text)
-        summary = summarize_text(text)
-        
-        return {
-            "keywords": keywords,
-            "summary": summary
-        }
+        # 형태소 분석은 CPU를 오래 쓰므로 이벤트 루프 밖에서 실행 (가벼운 요청이 기다리지 않도록)
+        result = await run_in_threadpool(cached_analysis, "analysis", filename, partial(analyze_text, filename))
+        await run_in_threadpool(emit_rdf, filename)
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -605,94 +1365,81 @@ async def analyze_document(filename: str):
 async def get_summary(filename: str):
     """문서의 요약본을 생성합니다."""
     try:
-        file_path = PARSED_DIR / f"{filename}.json"
-        if not file_path.exists():
+        if not DOCUMENT_STORE.exists(filename):
             raise HTTPException(status_code=404, detail="파싱된 문서를 찾을 수 없습니다.")
         
-        with file_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            
-        # 텍스트 요약
-        if summarizer is None:
-            # 기본 요약 기능 사용
-            summary = summarize_text(data["content"])
-        else:
-            summary = summarizer(data["content"], max_length=130, min_length=30, do_sample=False)
-            summary = summary[0]["summary_text"]
-        
-        return {
-            "summary": summary
-        }
+        return await run_in_threadpool(cached_analysis, "summary", filename, partial(summarize_document, filename))
     except Exception as e:
-        print(f"Summary error: {str(e)}")  # 에러 로깅
+        logging.error(f"요약 생성 중 오류 발생: {filename}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/files/{filename}/entities")
 async def extract_entities(filename: str):
     """문서에서 개체를 추출합니다."""
     try:
-        print(f"Processing entities for file: {filename}")  # 파일명 로깅
-        file_path = PARSED_DIR / f"{filename}.json"
-        if not file_path.exists():
-            print(f"File not found: {file_path}")  # 파일 존재 여부 로깅
+        if not DOCUMENT_STORE.exists(filename):
             raise HTTPException(status_code=404, detail="파싱된 문서를 찾을 수 없습니다.")
         
-        with file_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            print(f"Successfully loaded JSON data for: {filename}")  # JSON 로드 성공 로깅
-            
-        # 개체 추출
-        if nlp is None:
-            print("Using default entity extraction")  # 기본 추출 사용 로깅
-            # 기본 개체 추출 기능 사용
-            entities = {
-                "organizations": [],
-                "dates": [],
-                "locations": [],
-                "persons": [],
-                "keywords": extract_keywords(data["content"])
-            }
-        else:
-            print("Using spaCy for entity extraction")  # spaCy 사용 로깅
-            # spaCy로 개체 추출
-            doc = nlp(data["content"])
-            
-            entities = {
-                "organizations": [],
-                "dates": [],
-                "locations": [],
-                "persons": [],
-                "keywords": extract_keywords(data["content"])
-            }
-            
-            for ent in doc.ents:
-                if ent.label_ == "ORG":
-                    entities["organizations"].append(ent.text)
-                elif ent.label_ == "DATE":
-                    entities["dates"].append(ent.text)
-                elif ent.label_ == "GPE" or ent.label_ == "LOC":
-                    entities["locations"].append(ent.text)
-                elif ent.label_ == "PERSON":
-                    entities["persons"].append(ent.text)
-        
-        print(f"Successfully extracted entities for: {filename}")  # 추출 성공 로깅
+        entities = await run_in_threadpool(cached_analysis, "entities", filename, partial(recognize_entities, filename))
+        await run_in_threadpool(emit_rdf, filename)
         return entities
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"개체 추출 중 오류 발생: {filename}: {type(e).__name__}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/files/{filename}/duplicates")
+async def get_duplicates(
+    filename: str,
+    threshold: float = Query(DUPLICATE_THRESHOLD, ge=0.0, le=1.0, description="추정 Jaccard 유사도 하한")
+):
+    """문서와 거의 같은 문서(다시 내보낸 사본, 조금 고친 판)를 찾습니다."""
+    if not DOCUMENT_STORE.exists(filename):
+        raise HTTPException(status_code=404, detail="파싱된 문서를 찾을 수 없습니다.")
+    
+    try:
+        if filename not in DUPLICATE_INDEX.documents():
+            index_duplicates(filename)
+        return {
+            "filename": filename,
+            "threshold": threshold,
+            "duplicates": DUPLICATE_INDEX.near_duplicates(filename, threshold)
+        }
     except Exception as e:
-        print(f"Entities error for {filename}: {str(e)}")  # 에러 로깅
-        print(f"Error type: {type(e)}")  # 에러 타입 로깅
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/duplicates/cluster")
+async def cluster_duplicates(
+    threshold: float = Query(DUPLICATE_THRESHOLD, ge=0.0, le=1.0, description="추정 Jaccard 유사도 하한")
+):
+    """전체 문서를 유사 문서 묶음으로 나누고 결과를 저장합니다."""
+    def run():
+        sync_duplicate_index()
+        return DUPLICATE_INDEX.cluster(threshold)
+    
+    try:
+        return await run_in_threadpool(run)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/duplicates/clusters")
+async def get_duplicate_clusters():
+    """마지막으로 실행한 유사 문서 묶음 결과를 반환합니다."""
+    report = DUPLICATE_INDEX.last_clusters()
+    if report is None:
+        raise HTTPException(status_code=404, detail="유사 문서 묶음 결과가 없습니다. POST /duplicates/cluster로 먼저 실행하세요.")
+    return report
+
 @app.post("/files/{filename}/convert-all")
 async def convert_all_formats(filename: str):
     """파일을 모든 형식으로 변환합니다."""
     try:
-        print(f"Converting file: {filename}")  # 파일명 로깅
-        formats = ["markdown", "latex", "csv", "jsonld"]
+        formats = list(FORMAT_EXTENSIONS)
         converted_files = []
         
         for format in formats:
             try:
-                print(f"Converting to {format}")  # 변환 형식 로깅
                 # 각 형식으로 변환
                 response = await convert_file(filename, format)
                 converted_files.append({
@@ -700,7 +1447,7 @@ async def convert_all_formats(filename: str):
                     "path": response["path"]
                 })
             except Exception as e:
-                print(f"Error converting to {format}: {str(e)}")  # 변환 에러 로깅
+                logging.error(f"{filename}을(를) {format} 형식으로 변환하지 못했습니다: {str(e)}")
                 continue
         
         # ZIP 파일 생성
@@ -709,64 +1456,358 @@ async def convert_all_formats(filename: str):
             for file_info in converted_files:
                 file_path = Path(file_info["path"])
                 if file_path.exists():
-                    zip_file.write(file_path, f"{filename}.{file_info['format']}")
+                    add_to_archive(zip_file, file_path, f"{filename}.{file_info['format']}")
         
-        print(f"Successfully converted {filename}")  # 변환 성공 로깅
-        return {
-            "filename": f"{filename}_converted.zip",
-            "content": zip_buffer.getvalue()
-        }
+        # ZIP 바이트는 JSON으로 직렬화할 수 없으므로 파일로 내려줌
+        return Response(
+            zip_buffer.getvalue(),
+            media_type="application/zip",
+            headers={"Content-Disposition": f"attachment; filename*=utf-8''{quote(filename + '_converted.zip')}"}
+        )
     except Exception as e:
-        print(f"Convert-all error for {filename}: {str(e)}")  # 에러 로깅
-        print(f"Error type: {type(e)}")  # 에러 타입 로깅
+        logging.error(f"일괄 변환 중 오류 발생: {filename}: {type(e).__name__}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class BatchExportRequest(BaseModel):
+    """일괄 내보내기 요청 (filenames를 지정하면 나머지 필터와 함께 적용됩니다)"""
+    filenames: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    author: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    formats: List[str] = ["markdown", "latex", "csv", "jsonld"]
+    archive: str = "zip"
+
+def _select_export_documents(request: BatchExportRequest) -> List[str]:
+    """내보내기 필터에 맞는 파싱된 문서 이름 목록을 반환합니다."""
+    if request.filenames is not None:
+        candidates = [name for name in request.filenames if DOCUMENT_STORE.exists(name)]
+    else:
+        candidates = DOCUMENT_STORE.list_documents()
+    
+    selected = []
+    for name in candidates:
+        try:
+            # 필터에는 메타데이터와 태그만 필요하므로 헤더만 읽음
+            header = DOCUMENT_STORE.read_header(name)
+        except Exception:
+            continue
+        
+        metadata = header.get("metadata", {})
+        
+        # 작성자 필터링
+        if request.author and not (
+            metadata.get("author") and
+            request.author.lower() in metadata["author"].lower()
+        ):
+            continue
+        
+        # 날짜 범위 필터링
+        if request.start_date or request.end_date:
+            try:
+                doc_date = datetime.strptime(metadata["date"], "%Y-%m-%d").date()
+            except (KeyError, ValueError):
+                continue
+            if request.start_date and doc_date < request.start_date:
+                continue
+            if request.end_date and doc_date > request.end_date:
+                continue
+        
+        # 태그 필터링
+        if request.tags and not any(tag in header.get("tags", []) for tag in request.tags):
+            continue
+        
+        selected.append(name)
+    
+    return selected
+
+@app.post("/export/batch")
+async def batch_export(request: BatchExportRequest):
+    """필터에 맞는 여러 문서를 변환하여 하나의 ZIP 또는 tar.gz 아카이브로 내려받습니다."""
+    if request.archive not in ("zip", "tar.gz"):
+        raise HTTPException(status_code=400, detail="archive는 zip 또는 tar.gz만 지원합니다.")
+    unknown_formats = [f for f in request.formats if f not in FORMAT_EXTENSIONS]
+    if unknown_formats or not request.formats:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다: {unknown_formats}")
+    
+    filenames = _select_export_documents(request)
+    if not filenames:
+        raise HTTPException(status_code=404, detail="조건에 맞는 문서가 없습니다.")
+    
+    suffix = ".zip" if request.archive == "zip" else ".tar.gz"
+    
+    def write_archive(pipe: ArchivePipe):
+        # 작업자 풀에서 변환하고, 끝나는 순서대로 아카이브에 추가 (탐색할 수 없는 출력이므로 ZIP은 데이터 기술자, tar는 스트림 모드)
+        failed = []
+        if request.archive == "zip":
+            archive = zipfile.ZipFile(pipe, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            archive = tarfile.open(fileobj=pipe, mode="w|gz")
+        
+        executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS)
+        try:
+            with archive:
+                futures = {
+                    executor.submit(render_conversion, filename, format): (filename, format)
+                    for filename in filenames
+                    for format in request.formats
+                }
+                for future in as_completed(futures):
+                    filename, format = futures[future]
+                    try:
+                        output_path = future.result()
+                    except Exception as e:
+                        logging.error(f"{filename} {format} 변환 실패: {str(e)}")
+                        failed.append({"filename": filename, "format": format, "error": str(e)})
+                        continue
+                    add_to_archive(archive, output_path, f"{format}/{output_path.name}")
+                    # 작은 결과도 끝나는 대로 클라이언트에 보냄
+                    pipe.flush()
+                if failed:
+                    add_bytes_to_archive(
+                        archive, EXPORT_ERRORS_NAME, json.dumps(failed, ensure_ascii=False, indent=2).encode("utf-8")
+                    )
+        finally:
+            # 클라이언트가 연결을 끊었으면 아직 시작하지 않은 변환은 취소
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return StreamingResponse(
+        stream_archive(write_archive),
+        media_type="application/zip" if request.archive == "zip" else "application/gzip",
+        headers={
+            "Content-Disposition": f'attachment; filename="export_{timestamp}{suffix}"',
+            "X-Export-Documents": str(len(filenames))
+        }
+    )
+
+# 작업 대기열 (작업자는 `python -m tasks.worker`로 따로 실행하며 다른 호스트에서도 실행 가능)
+TASK_BROKER = create_broker()
+# 파싱/OCR이 끝난 뒤 이어서 넣을 수 있는 작업
+FOLLOWUP_KINDS = ("analysis", "summary", "entities", "convert")
+TASK_KINDS = ("parse", "ocr") + FOLLOWUP_KINDS
+
+register_queue("tasks", lambda: TASK_BROKER.stats()["queued"])
+
+def submit_task(kind: str, payload: dict, priority: str = INTERACTIVE) -> str:
+    return TASK_BROKER.enqueue(kind, payload, priority)
+
+def _task_step(function, *args):
+    """HTTPException을 작업 오류로 바꿉니다. 4xx(파일 없음, 잘못된 형식)는 다시 시도해도 같으므로 재시도하지 않습니다."""
+    try:
+        return function(*args)
+    except HTTPException as e:
+        if e.status_code < 500:
+            raise PermanentTaskError(e.detail)
+        raise RuntimeError(e.detail)
+
+def _submit_followups(filename: str, payload: dict) -> dict:
+    followups = {}
+    for kind in payload.get("then") or []:
+        options = {"formats": payload.get("formats")} if kind == "convert" else {}
+        followups[kind] = submit_task(kind, {"filename": filename, **options}, BATCH)
+    return followups
+
+def run_parse_task(payload: dict) -> dict:
+    """OCR 없이 먼저 파싱해 텍스트를 바로 검색할 수 있게 하고, 스캔 페이지가 있으면 OCR 작업을 따로 넣습니다."""
+    filename = payload["filename"]
+    result = _task_step(process_parse, filename, payload.get("ocr") == "inline", True, not payload.get("full"))
+    pending = result.get("ocr_pending") or []
+    if pending:
+        # 이어서 할 작업은 OCR이 끝난 본문으로 하도록 OCR 작업에 넘김
+        followups = {"ocr": submit_task("ocr", {**payload, "filename": filename}, BATCH)}
+    else:
+        followups = _submit_followups(filename, payload)
+    return {
+        "filename": filename,
+        "metadata": result["metadata"],
+        "reused_pages": result["reused_pages"],
+        "ocr_pending": pending,
+        "followups": followups
+    }
+
+def run_ocr_task(payload: dict) -> dict:
+    filename = payload["filename"]
+    result = _task_step(process_parse, filename, True)
+    return {
+        "filename": filename,
+        "metadata": result["metadata"],
+        "reused_pages": result["reused_pages"],
+        "followups": _submit_followups(filename, payload)
+    }
+
+def run_analysis_task(kind: str, payload: dict) -> dict:
+    filename = payload["filename"]
+    if not DOCUMENT_STORE.exists(filename):
+        raise PermanentTaskError("파싱된 문서를 찾을 수 없습니다.")
+    result = cached_analysis(kind, filename, partial(ANALYZERS[kind], filename))
+    if kind != "summary":
+        emit_rdf(filename)
+    return result
+
+def run_convert_task(payload: dict) -> dict:
+    filename = payload["filename"]
+    paths = {}
+    for format in payload.get("formats") or list(FORMAT_EXTENSIONS):
+        paths[format] = str(_task_step(render_conversion, filename, format, payload.get("force", False)))
+    return {"filename": filename, "paths": paths}
+
+# 작업 종류별 처리 함수 (tasks.worker가 불러 씀)
+TASK_HANDLERS = {
+    "parse": run_parse_task,
+    "ocr": run_ocr_task,
+    "analysis": partial(run_analysis_task, "analysis"),
+    "summary": partial(run_analysis_task, "summary"),
+    "entities": partial(run_analysis_task, "entities"),
+    "convert": run_convert_task
+}
+
+class TaskRequest(BaseModel):
+    """작업 요청 (then은 parse/ocr가 끝난 뒤 넣을 작업, formats는 convert 형식)"""
+    kind: str
+    filename: str
+    then: Optional[List[str]] = None
+    formats: Optional[List[str]] = None
+    force: bool = False
+    priority: str = INTERACTIVE
+
+def _task_response(task: dict) -> dict:
+    # 임대 토큰은 작업자만 씀
+    return {key: value for key, value in task.items() if key != "token"}
+
+@app.post("/tasks", status_code=202)
+async def create_task(request: TaskRequest):
+    """작업을 대기열에 넣습니다. 처리는 작업자 프로세스가 하며 결과는 /tasks/{task_id}로 확인합니다."""
+    if request.kind not in TASK_KINDS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 작업입니다: {request.kind}")
+    unknown = [kind for kind in request.then or [] if kind not in FOLLOWUP_KINDS]
+    unknown += [format for format in request.formats or [] if format not in FORMAT_EXTENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 작업 또는 형식입니다: {unknown}")
+    
+    if request.kind in ("parse", "ocr"):
+        exists = await run_in_threadpool(BLOBS.exists, UPLOAD_DIR / request.filename)
+    else:
+        exists = await run_in_threadpool(DOCUMENT_STORE.exists, request.filename)
+    if not exists:
+        raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
+    
+    payload = {"filename": request.filename, "then": request.then or [], "formats": request.formats}
+    if request.kind == "convert":
+        payload["force"] = request.force
+    priority = BATCH if request.priority == BATCH else INTERACTIVE
+    task_id = await run_in_threadpool(submit_task, request.kind, payload, priority)
+    return {"status": "queued", "task_id": task_id}
+
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: str):
+    """작업 상태(queued, running, done, dead)와 결과를 반환합니다."""
+    task = await run_in_threadpool(TASK_BROKER.get, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return _task_response(task)
+
+@app.get("/admin/tasks")
+async def list_tasks(
+    status: Optional[str] = Query(None, description="queued, running, done, dead"),
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    username: str = Depends(get_admin_credentials)
+):
+    """대기열 통계와 작업 목록 (status=dead로 더는 시도하지 않는 작업을 확인)"""
+    stats = await run_in_threadpool(TASK_BROKER.stats)
+    tasks = await run_in_threadpool(TASK_BROKER.list, status, kind, limit)
+    return {"stats": stats, "tasks": [_task_response(task) for task in tasks]}
+
+@app.post("/admin/tasks/{task_id}/retry")
+async def retry_task(task_id: str, username: str = Depends(get_admin_credentials)):
+    """실패로 끝난 작업을 다시 대기열에 넣습니다."""
+    if not await run_in_threadpool(TASK_BROKER.retry, task_id):
+        raise HTTPException(status_code=404, detail="다시 시도할 수 있는 실패 작업이 없습니다.")
+    return {"status": "queued", "task_id": task_id}
+
+def _sparql_csv_value(value: str) -> str:
+    if any(char in value for char in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def iter_sparql_results(response: dict, format: str):
+    """SPARQL 결과를 JSON 또는 CSV 조각으로 나누어 내보냅니다."""
+    if "boolean" in response:
+        if format == "csv":
+            yield "true\r\n" if response["boolean"] else "false\r\n"
+        else:
+            yield json.dumps(response, ensure_ascii=False)
+        return
+    variables = response["head"]["vars"]
+    bindings = response["results"]["bindings"]
+    if format == "csv":
+        yield ",".join(variables) + "\r\n"
+        for binding in bindings:
+            yield ",".join(_sparql_csv_value(binding.get(var, "")) for var in variables) + "\r\n"
+        return
+    yield '{"head": ' + json.dumps(response["head"], ensure_ascii=False) + ', "results": {"bindings": ['
+    for i, binding in enumerate(bindings):
+        yield ("," if i else "") + json.dumps(binding, ensure_ascii=False)
+    yield "]}}"
+
 # SPARQL 엔드포인트 수정
 @app.post("/sparql")
-async def sparql_query(query: str):
+async def sparql_query(
+    query: str,
+    format: str = Query("json", pattern="^(json|csv)$", description="결과 형식 (json, csv)")
+):
     try:
         start_time = datetime.now()
         
-        # RDF 그래프 생성
-        g = Graph()
-        
-        # JSON-LD 파일들을 RDF로 변환
-        for filename in os.listdir(JSON_STORE):
-            if filename.endswith('.json'):
-                file_path = os.path.join(JSON_STORE, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    json_data = json.load(f)
-                    # JSON-LD를 RDF로 변환
-                    g.parse(data=json.dumps(json_data), format='json-ld')
-        
-        # SPARQL 쿼리 실행
-        results = g.query(query)
-        
-        # 결과를 JSON 형식으로 변환
-        bindings = []
-        for row in results:
-            binding = {}
-            for var in results.vars:
-                value = row[var]
-                if value:
-                    binding[str(var)] = str(value)
-            bindings.append(binding)
-        
-        response = {
-            "head": {"vars": [str(var) for var in results.vars]},
-            "results": {"bindings": bindings}
-        }
+        # 같은 쿼리를 같은 그래프 버전에서 실행한 결과가 있으면 재사용
+        version = KNOWLEDGE_GRAPH.version
+        response = SPARQL_CACHE.get(query, version)
+        cached = response is not None
+        if not cached:
+            # 메모리에 유지되는 그래프에서 전용 워커로 실행 (이벤트 루프와 공용 스레드 풀을 막지 않음).
+            # 대기열에서 기다리는 시간까지 포함해 벽시계 시간으로 제한 (아직 시작하지 않은 쿼리는 취소됨)
+            with stage_timer("sparql_query"):
+                response = await asyncio.wait_for(
+                    asyncio.wrap_future(submit_sparql(query)),
+                    SPARQL_TIMEOUT + SPARQL_TIMEOUT_GRACE
+                )
+            SPARQL_CACHE.put(query, version, response)
+        SPARQL_QUERIES.inc(result="hit" if cached else "miss")
+        if response.get("truncated"):
+            SPARQL_TRUNCATED.inc()
         
         # 실행 시간 계산 및 로그 저장
         execution_time = (datetime.now() - start_time).total_seconds()
-        log_sparql_query(query, response, execution_time)
+        await run_in_threadpool(log_sparql_query, query, response, execution_time, cached)
         
-        return response
+        headers = {
+            "X-SPARQL-Result-Count": str(len(response["results"]["bindings"]) if "results" in response else 1),
+            "X-SPARQL-Cache": "hit" if cached else "miss"
+        }
+        if response.get("truncated"):
+            headers["X-SPARQL-Truncated"] = str(SPARQL_MAX_ROWS)
+        return StreamingResponse(
+            (chunk.encode("utf-8") for chunk in iter_sparql_results(response, format)),
+            media_type="text/csv; charset=utf-8" if format == "csv" else "application/sparql-results+json",
+            headers=headers
+        )
+    except UnsupportedQuery as e:
+        await run_in_threadpool(log_sparql_query, query, {"error": str(e)}, 0)
+        SPARQL_QUERIES.inc(result="error")
+        raise HTTPException(status_code=400, detail=str(e))
+    except (QueryTimeout, asyncio.TimeoutError):
+        error_msg = f"SPARQL 쿼리가 제한 시간({SPARQL_TIMEOUT:g}초)을 넘어 중단되었습니다."
+        logging.error(error_msg)
+        await run_in_threadpool(log_sparql_query, query, {"error": error_msg}, SPARQL_TIMEOUT)
+        SPARQL_QUERIES.inc(result="timeout")
+        raise HTTPException(status_code=504, detail=error_msg)
     except Exception as e:
         error_msg = f"SPARQL 쿼리 실행 중 오류 발생: {str(e)}"
         logging.error(error_msg)
         # 에러도 로그에 저장
-        log_sparql_query(query, {"error": error_msg}, 0)
+        await run_in_threadpool(log_sparql_query, query, {"error": error_msg}, 0)
+        SPARQL_QUERIES.inc(result="error")
         raise HTTPException(status_code=500, detail=error_msg)
 
 # 쿼리 로그 조회 엔드포인트 추가
@@ -779,13 +1820,8 @@ async def get_sparql_logs(
 ):
     """SPARQL 쿼리 로그를 조회합니다."""
     try:
-        all_logs = []
-        
         # 모든 로그 파일 읽기
-        for log_file in SPARQL_LOG_DIR.glob("sparql_log_*.json"):
-            with log_file.open("r", encoding="utf-8") as f:
-                logs = json.load(f)
-                all_logs.extend(logs)
+        all_logs = await run_in_threadpool(read_sparql_logs)
         
         # 날짜 필터링
         if start_date or end_date:
@@ -818,13 +1854,8 @@ async def get_sparql_stats(
 ):
     """SPARQL 쿼리 통계를 반환합니다."""
     try:
-        all_logs = []
-        
         # 모든 로그 파일 읽기
-        for log_file in SPARQL_LOG_DIR.glob("sparql_log_*.json"):
-            with log_file.open("r", encoding="utf-8") as f:
-                logs = json.load(f)
-                all_logs.extend(logs)
+        all_logs = await run_in_threadpool(read_sparql_logs)
         
         # 날짜 필터링
         if start_date or end_date:
@@ -891,7 +1922,9 @@ async def get_sparql_stats(
             "date_range": {
                 "start": start_date.isoformat() if start_date else None,
                 "end": end_date.isoformat() if end_date else None
-            }
+            },
+            "cached_queries": sum(1 for log in all_logs if log.get("cached")),
+            "cache": SPARQL_CACHE.stats()
         }
     except Exception as e:
         logging.error(f"통계 조회 중 오류 발생: {str(e)}")
@@ -907,13 +1940,8 @@ async def search_sparql_logs(
 ):
     """SPARQL 쿼리 로그를 검색합니다."""
     try:
-        all_logs = []
-        
         # 모든 로그 파일 읽기
-        for log_file in SPARQL_LOG_DIR.glob("sparql_log_*.json"):
-            with log_file.open("r", encoding="utf-8") as f:
-                logs = json.load(f)
-                all_logs.extend(logs)
+        all_logs = await run_in_threadpool(read_sparql_logs)
         
         # 날짜 필터링
         if start_date or end_date:
@@ -961,6 +1989,209 @@ async def search_sparql_logs(
         logging.error(f"쿼리 로그 검색 중 오류 발생: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 텍스트 형식의 지표(라우트별 지연 시간, 단계별 시간, 캐시 적중률, 대기열, 메모리)를 반환합니다."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _compression_samples(limit: int):
+    """종류별 압축 사전 학습 표본 (압축을 푼 페이지 청크, JSON-LD, N-Triples)"""
+    samples = {"pages": [], "jsonld": [], "nt": []}
+    for name in DOCUMENT_STORE.list_documents():
+        if len(samples["pages"]) >= limit:
+            break
+        samples["pages"].extend(DOCUMENT_STORE.iter_page_chunks(name))
+    for kind, paths in (("jsonld", JSON_STORE.glob("*.json")), ("nt", Path(RDF_STORE).glob("*.nt"))):
+        for path in paths:
+            if len(samples[kind]) >= limit:
+                break
+            samples[kind].append(COMPRESSOR.read_bytes(path))
+    return samples
+
+@app.get("/admin/compression")
+async def get_compression_stats(username: str = Depends(get_admin_credentials)):
+    """압축 형식, 사용 중인 사전과 저장소별 디스크 사용량을 반환합니다."""
+    def usage(paths):
+        sizes = [path.stat().st_size for path in paths if path.is_file()]
+        return {"files": len(sizes), "stored_bytes": sum(sizes)}
+    
+    return {
+        **COMPRESSOR.stats(),
+        "parsed": usage(PARSED_DIR.glob("*")),
+        "converted": usage(CONVERTED_DIR.glob("*/*")),
+        "json_store": usage(JSON_STORE.glob("*.json")),
+        "rdf_store": usage(Path(RDF_STORE).glob("*.nt")),
+        "sparql_logs": usage(sparql_log_files())
+    }
+
+@app.post("/admin/compression/train")
+async def train_compression(
+    samples: int = Query(2000, ge=8, le=100000, description="종류별 최대 표본 수"),
+    recompress: bool = Query(False, description="학습한 사전으로 기존 파일을 다시 압축"),
+    username: str = Depends(get_admin_credentials)
+):
+    """저장된 문서로 종류별 zstd 사전을 학습합니다. 작은 페이지 청크와 JSON-LD의 압축률이 높아집니다."""
+    def train():
+        results = {}
+        for kind, kind_samples in _compression_samples(samples).items():
+            results[kind] = COMPRESSOR.train(kind, kind_samples)
+        if recompress:
+            for name in DOCUMENT_STORE.list_documents():
+                DOCUMENT_STORE.recompress(name)
+            for kind, paths in (("jsonld", JSON_STORE.glob("*.json")), ("nt", Path(RDF_STORE).glob("*.nt"))):
+                for path in list(paths):
+                    COMPRESSOR.write_bytes(path, COMPRESSOR.read_bytes(path), kind)
+        return results
+    
+    try:
+        return {"codec": COMPRESSOR.codec, "dictionaries": await run_in_threadpool(train)}
+    except Exception as e:
+        logging.error(f"압축 사전 학습 중 오류 발생: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 관리자용 프로파일 저장소와 느린 요청 기록
+PROFILE_STORE = ProfileStore()
+SLOW_REQUESTS = SlowRequestLog()
+_window_profiler: Optional[SamplingProfiler] = None
+
+@app.get("/admin/slow-requests")
+async def get_slow_requests(
+    limit: int = Query(20, ge=1, le=1000),
+    username: str = Depends(get_admin_credentials)
+):
+    """최근 느린 요청을 처리 시간 순으로 단계별 시간과 함께 반환합니다."""
+    return {
+        "threshold_ms": SLOW_REQUESTS.threshold * 1000,
+        "requests": SLOW_REQUESTS.slowest(limit)
+    }
+
+@app.post("/admin/profile")
+async def start_window_profile(
+    seconds: float = Query(30, gt=0, le=300, description="프로파일링할 시간(초)"),
+    username: str = Depends(get_admin_credentials)
+):
+    """지정한 시간 동안 전체 프로세스를 표본 프로파일링하고 끝나면 저장합니다."""
+    global _window_profiler
+    if _window_profiler is not None and _window_profiler.running:
+        raise HTTPException(status_code=409, detail="이미 프로파일링 중입니다.")
+    profiler = SamplingProfiler(max_seconds=seconds).start()
+    _window_profiler = profiler
+    
+    def finish():
+        profile_id = PROFILE_STORE.save(profiler.wait(), {"mode": "window", "requested_by": username})
+        logging.info(f"구간 프로파일 저장: {profile_id}")
+    
+    threading.Thread(target=finish, name="profile-window", daemon=True).start()
+    return {"status": "started", "seconds": seconds}
+
+@app.get("/admin/profiles")
+async def list_profiles(username: str = Depends(get_admin_credentials)):
+    """저장된 프로파일 목록을 최신 순으로 반환합니다."""
+    return PROFILE_STORE.list()
+
+@app.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, username: str = Depends(get_admin_credentials)):
+    """접힌 스택 형식(flamegraph.pl, speedscope에서 열 수 있음)의 프로파일을 내려받습니다."""
+    path = PROFILE_STORE.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다.")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=path.name)
+
+# 무거운 엔드포인트의 동시 실행 수 제한 (가벼운 요청은 대기열을 거치지 않음)
+ADMISSION = AdmissionController({
+    "/files/{filename}/analysis": "analysis",
+    "/files/{filename}/summary": "analysis",
+    "/files/{filename}/entities": "entities",
+    "/sparql": "sparql"
+})
+ADMISSION_REJECTED = MetricCounter("admission_rejected", "대기열에서 거절된 요청 수 (reason=queue_full|client_limit|timeout)", ("pool", "reason"))
+ADMISSION_WAIT_SECONDS = MetricHistogram("admission_wait_seconds", "차례를 기다린 시간(초)", ("pool", "priority"))
+for _name, _pool in ADMISSION.pools.items():
+    register_queue(f"admission_{_name}", lambda pool=_pool: pool.waiting)
+
+def _admission_client(request: Request) -> str:
+    """공정한 순서를 위한 클라이언트 구분 (ADMISSION_TRUSTED_PROXIES의 프록시를 거친 요청만 X-Forwarded-For를 씀)"""
+    return client_address(request.client.host if request.client else None, request.headers.get("X-Forwarded-For"))
+
+@app.get("/admin/admission")
+async def get_admission_stats(username: str = Depends(get_admin_credentials)):
+    """풀별 동시 실행 수, 대기 중인 요청 수와 거절 수를 반환합니다."""
+    return ADMISSION.stats()
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    # 라우팅 전이므로 직접 라우트를 찾아 경로 템플릿으로 풀을 고름
+    route = next((route for route in app.router.routes if route.matches(request.scope)[0] == Match.FULL), None)
+    pool = ADMISSION.pool_for(route.path) if route is not None else None
+    if pool is None:
+        return await call_next(request)
+    
+    # X-Priority: batch 또는 ?priority=batch로 보낸 요청은 대화형 요청 뒤로 밀림
+    requested = request.headers.get("X-Priority") or request.query_params.get("priority") or ""
+    priority = BATCH if requested.lower() == BATCH else INTERACTIVE
+    try:
+        async with pool.slot(_admission_client(request), priority) as waited:
+            ADMISSION_WAIT_SECONDS.observe(waited, pool=pool.name, priority=priority)
+            return await call_next(request)
+    except Rejected as e:
+        ADMISSION_REJECTED.inc(pool=pool.name, reason=e.reason)
+        # 거절된 요청도 라우트별 지표에 잡히도록 라우트를 남김
+        request.scope["route"] = route
+        detail = "요청이 너무 많습니다. 잠시 후 다시 시도하세요." if e.status_code == 429 else "서버가 혼잡합니다. 잠시 후 다시 시도하세요."
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"detail": detail, "reason": e.reason},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    # 다른 작업자의 변경을 먼저 반영하여 오래된 그래프나 캐시로 응답하지 않도록 함.
+    # 루프에서는 파일 크기만 확인하고, 반영(그래프 갱신, 색인 등)은 스레드에서 함.
+    # 백그라운드 스레드가 이미 반영하는 중이면 기다리지 않음
+    if CHANGE_JOURNAL.pending():
+        await run_in_threadpool(CHANGE_JOURNAL.poll, False)
+    
+    # 관리자가 X-Profile 헤더나 ?profile=1로 요청하면 이 요청 동안 표본 프로파일링
+    profiler = None
+    if request.headers.get("X-Profile") or request.query_params.get("profile"):
+        try:
+            get_admin_credentials(await security(request))
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=e.headers)
+        profiler = SamplingProfiler().start()
+    
+    stages = begin_stages()
+    start = time.perf_counter()
+    status_code = 500
+    response = None
+    REQUESTS_IN_PROGRESS.inc()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_PROGRESS.dec()
+        duration = time.perf_counter() - start
+        # 라우트 경로 템플릿(/files/{filename}/analysis)으로 묶어 라벨 수가 늘지 않도록 함
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        REQUEST_SECONDS.observe(duration, method=request.method, route=route_path, status=str(status_code))
+        
+        profile_id = None
+        if profiler is not None:
+            profile_id = PROFILE_STORE.save(profiler.stop(), {
+                "mode": "request",
+                "method": request.method,
+                "path": request.url.path,
+                "route": route_path,
+                "status": status_code,
+                "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()}
+            })
+            if response is not None:
+                response.headers["X-Profile-Id"] = profile_id
+        SLOW_REQUESTS.record(request.method, request.url.path, route_path, status_code, duration, stages, profile_id)
+
 @app.middleware("http")
 async def protect_log_files(request: Request, call_next):
     # 로그 파일 직접 접근 차단
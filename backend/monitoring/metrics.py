@@ -0,0 +1,242 @@
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 초 단위 히스토그램 기본 구간 (5ms ~ 60s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+class Metric:
+    """라벨 값 조합별로 값을 보관하는 지표. Prometheus 텍스트 형식으로 내보냅니다."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """(이름 접미사, 라벨 문자열, 값)을 차례로 반환합니다."""
+        return iter(())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        self._values: Dict[LabelValues, float] = {}
+        super().__init__(*args, **kwargs)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield "_total", _format_labels(self.labelnames, key), value
+
+class Gauge(Metric):
+    """값을 직접 넣거나, 내보낼 때마다 호출할 함수를 등록하는 지표."""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+        super().__init__(*args, **kwargs)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+            functions = list(self._functions.items())
+        for key, function in functions:
+            try:
+                values[key] = float(function())
+            except Exception:
+                continue
+        for key, value in values.items():
+            yield "", _format_labels(self.labelnames, key), value
+
+class Histogram(Metric):
+    """구간별 누적 개수, 합계, 개수를 보관합니다. observe는 이분 탐색 한 번과 덧셈뿐입니다."""
+
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, List[float]] = {}
+        super().__init__(*args, **kwargs)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # 구간별 개수 + 합계 + 개수
+                state = self._values[key] = [0.0] * (len(self.buckets) + 3)
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {key: list(state) for key, state in self._values.items()}
+        names = self.labelnames + ("le",)
+        for key, state in values.items():
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-2]):
+                cumulative += count
+                yield "_bucket", _format_labels(names, key + (_format_value(bound),)), cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield "_sum", labels, state[-2]
+            yield "_count", labels, state[-1]
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 지표입니다: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "라우트별 요청 처리 시간(초)", ("method", "route", "status")
+)
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "처리 중인 요청 수")
+STAGE_SECONDS = Histogram(
+    "pipeline_stage_duration_seconds", "파이프라인 단계별 처리 시간(초)", ("stage",)
+)
+CACHE_REQUESTS = Gauge("cache_requests", "캐시 조회 수 (result=hit|miss)", ("cache", "result"))
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "캐시 적중률", ("cache",))
+CACHE_ENTRIES = Gauge("cache_entries", "캐시 항목 수", ("cache",))
+QUEUE_DEPTH = Gauge("queue_depth", "작업자 풀에서 대기 중인 작업 수", ("queue",))
+PROCESS_MEMORY = Gauge("process_resident_memory_bytes", "작업자 프로세스 상주 메모리(바이트)", ("pid",))
+PROCESS_MAX_MEMORY = Gauge("process_max_resident_memory_bytes", "작업자 프로세스 최대 상주 메모리(바이트)", ("pid",))
+
+# 요청 하나 동안 단계별 누적 시간 (없으면 기록하지 않음)
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stages", default=None)
+
+def begin_stages() -> Dict[str, float]:
+    """현재 요청의 단계별 시간 기록을 시작합니다. 같은 컨텍스트의 스레드 풀 작업도 같은 사전에 기록됩니다."""
+    stages: Dict[str, float] = {}
+    _request_stages.set(stages)
+    return stages
+
+def current_stages() -> Optional[Dict[str, float]]:
+    return _request_stages.get()
+
+@contextmanager
+def stage_timer(stage: str):
+    """블록 실행 시간을 단계 히스토그램과 현재 요청의 단계별 기록에 더합니다."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages[stage] = stages.get(stage, 0.0) + elapsed
+
+def register_cache(name: str, stats: Callable[[], Dict]):
+    """hits/misses(와 entries)를 가진 stats()를 캐시 지표로 등록합니다."""
+    CACHE_REQUESTS.set_function(lambda: stats()["hits"], cache=name, result="hit")
+    CACHE_REQUESTS.set_function(lambda: stats()["misses"], cache=name, result="miss")
+
+    def ratio() -> float:
+        current = stats()
+        total = current["hits"] + current["misses"]
+        return current["hits"] / total if total else 0.0
+
+    CACHE_HIT_RATIO.set_function(ratio, cache=name)
+    CACHE_ENTRIES.set_function(lambda: stats().get("entries", 0), cache=name)
+
+def register_queue(name: str, depth: Callable[[], int]):
+    QUEUE_DEPTH.set_function(depth, queue=name)
+
+def _resident_memory() -> float:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return _max_resident_memory()
+
+def _max_resident_memory() -> float:
+    if resource is None:
+        return 0.0
+    # Linux는 KB, macOS는 바이트 단위
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if os.uname().sysname == "Darwin" else usage * 1024
+
+PROCESS_MEMORY.set_function(_resident_memory, pid=str(os.getpid()))
+PROCESS_MAX_MEMORY.set_function(_max_resident_memory, pid=str(os.getpid()))
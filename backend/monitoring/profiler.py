@@ -0,0 +1,166 @@
+from typing import Dict, List, Optional
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", 5)) / 1000
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 300))
+# 저장해 둘 프로파일 수 (오래된 것부터 지움)
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 50))
+# 이 시간(초) 이상 걸린 요청만 느린 요청 기록에 남김
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", 1.0))
+SLOW_REQUEST_BUFFER = int(os.getenv("SLOW_REQUEST_BUFFER", 100))
+
+# 쉬고 있는 작업자 스레드의 대기 스택은 표본에서 뺌
+IDLE_FRAMES = {("threading.py", "wait"), ("queue.py", "get"), ("thread.py", "_worker")}
+
+class SamplingProfiler:
+    """별도 스레드에서 interval마다 모든 스레드의 호출 스택을 표본으로 모읍니다.
+
+    결과는 flamegraph.pl, speedscope 등이 읽는 접힌 스택 형식("스레드;함수 (파일:줄);... 개수")입니다.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL, max_seconds: float = PROFILE_MAX_SECONDS):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        return self
+
+    def wait(self) -> "SamplingProfiler":
+        """max_seconds가 지나 표본 수집이 끝날 때까지 기다립니다."""
+        self._thread.join()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.stopped_at or time.perf_counter()) - self.started_at
+
+    def _run(self):
+        own = threading.get_ident()
+        deadline = self.started_at + self.max_seconds
+        while not self._stop.wait(self.interval) and time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+        self.stopped_at = time.perf_counter()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+class ProfileStore:
+    """프로파일을 PROFILE_DIR/{id}.folded와 {id}.json(요약 정보)으로 저장합니다."""
+
+    def __init__(self, root: Path = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.root = Path(root)
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def save(self, profiler: SamplingProfiler, info: Dict) -> str:
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        summary = {
+            "id": profile_id,
+            "created_at": datetime.now().isoformat(),
+            "duration_s": round(profiler.duration, 4),
+            "interval_ms": profiler.interval * 1000,
+            "samples": profiler.sample_count,
+            "stacks": len(profiler.samples),
+            **info
+        }
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            (self.root / f"{profile_id}.folded").write_text(profiler.folded(), encoding="utf-8")
+            with (self.root / f"{profile_id}.json").open("w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            for old in self._summaries()[self.keep:]:
+                (self.root / f"{old}.folded").unlink(missing_ok=True)
+                (self.root / f"{old}.json").unlink(missing_ok=True)
+        return profile_id
+
+    def _summaries(self) -> List[str]:
+        return sorted((path.stem for path in self.root.glob("*.json")), reverse=True)
+
+    def list(self) -> List[Dict]:
+        profiles = []
+        for profile_id in self._summaries():
+            try:
+                with (self.root / f"{profile_id}.json").open("r", encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        path = self.root / f"{Path(profile_id).name}.folded"
+        return path if path.exists() else None
+
+class SlowRequestLog:
+    """SLOW_REQUEST_SECONDS 이상 걸린 최근 요청을 단계별 시간과 함께 고정 크기 링 버퍼에 보관합니다."""
+
+    def __init__(self, threshold: float = SLOW_REQUEST_SECONDS, size: int = SLOW_REQUEST_BUFFER):
+        self.threshold = threshold
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, method: str, path: str, route: str, status: int, duration: float,
+               stages: Optional[Dict[str, float]], profile_id: Optional[str] = None):
+        if duration < self.threshold and profile_id is None:
+            return
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "method": method,
+            "path": path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration * 1000, 3),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in sorted(
+                (stages or {}).items(), key=lambda item: item[1], reverse=True
+            )},
+            "profile_id": profile_id
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    def slowest(self, limit: int = 20) -> List[Dict]:
+        with self._lock:
+            entries = list(self._entries)
+        return sorted(entries, key=lambda entry: entry["duration_ms"], reverse=True)[:limit]
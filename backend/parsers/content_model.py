@@ -0,0 +1,92 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+import re
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+TERMINAL_PUNCTUATION = tuple(".!?,;:。")
+# 1. / 1.2 / 제1장 / II. / 가. 형식의 번호 붙은 제목
+NUMBERED_HEADING = re.compile(r"^(?:(\d+(?:\.\d+)*)\.?|제\s*\d+\s*[장절조항]|[IVX]+\.|[가-하]\.)\s+\S")
+MAX_HEADING_LENGTH = 60
+
+def _iter_paragraph_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """빈 줄로 구분된 문단의 (시작, 끝) 오프셋을 앞뒤 공백을 제외하고 반환합니다."""
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        yield from _trim_span(text, start, match.start())
+        start = match.end()
+    yield from _trim_span(text, start, len(text))
+
+def _trim_span(text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if start < end:
+        yield start, end
+
+def heading_level(paragraph: str) -> Optional[int]:
+    """문단이 제목처럼 보이면 수준(1부터)을, 아니면 None을 반환합니다."""
+    if "\n" in paragraph or len(paragraph) > MAX_HEADING_LENGTH:
+        return None
+    if paragraph.endswith(TERMINAL_PUNCTUATION):
+        return None
+    match = NUMBERED_HEADING.match(paragraph)
+    if match:
+        return match.group(1).count(".") + 1 if match.group(1) else 1
+    return None
+
+def build_pages(pages: List[Dict], tables: List[Dict], equations: List[Dict]) -> List[Dict]:
+    """페이지 텍스트와 표, 수식을 페이지/블록 구조로 묶습니다.
+
+    각 블록의 start/end는 모든 페이지 텍스트를 이어 붙인 문서 전체 content 기준의 문자 오프셋입니다.
+    """
+    # 범위를 벗어난 페이지 번호는 가장 가까운 페이지에 붙임
+    last_page = pages[-1]["page"] if pages else 1
+    tables_by_page: Dict[int, List[Dict]] = {}
+    for table in tables:
+        tables_by_page.setdefault(min(max(table.get("page") or 1, 1), last_page), []).append(table)
+    equations_by_page: Dict[int, List[Dict]] = {}
+    for equation in equations:
+        equations_by_page.setdefault(min(max(equation.get("page") or 1, 1), last_page), []).append(equation)
+
+    structured = []
+    offset = 0
+    for page in pages:
+        text = page.get("text") or ""
+        blocks = []
+        for start, end in _iter_paragraph_spans(text):
+            paragraph = text[start:end]
+            level = heading_level(paragraph)
+            block = {
+                "type": "heading" if level else "paragraph",
+                "start": offset + start,
+                "end": offset + end
+            }
+            if level:
+                block["level"] = level
+            blocks.append(block)
+
+        structured.append({
+            "page": page["page"],
+            "hash": page.get("hash"),
+            "start": offset,
+            "end": offset + len(text),
+            "text": text,
+            "blocks": blocks,
+            "tables": tables_by_page.get(page["page"], []),
+            "equations": equations_by_page.get(page["page"], [])
+        })
+        offset += len(text)
+    return structured
+
+def page_blocks(page: Dict) -> List[Dict]:
+    """저장된 페이지에서 텍스트가 채워진 블록 목록(표와 수식 포함)을 만듭니다."""
+    blocks = []
+    for block in page["blocks"]:
+        start = block["start"] - page["start"]
+        end = block["end"] - page["start"]
+        blocks.append(dict(block, page=page["page"], text=page["text"][start:end]))
+    for table in page["tables"]:
+        blocks.append(dict(table, type="table", page=page["page"]))
+    for equation in page["equations"]:
+        blocks.append(dict(equation, type="equation", page=page["page"]))
+    return blocks
@@ -0,0 +1,252 @@
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests
+from requests.adapters import HTTPAdapter
+
+# 기본 설정 파일은 저장소 루트의 grobid_config.json
+GROBID_CONFIG_PATH = os.getenv(
+    "GROBID_CONFIG",
+    str(Path(__file__).resolve().parents[2] / "grobid_config.json")
+)
+GROBID_CACHE_DIR = Path(os.getenv("GROBID_CACHE_DIR", "grobid_cache"))
+TEI_NS = {"tei": "http://www.tei-c.org/ns/1.0"}
+# 서버 응답 여부(isalive)를 기억하는 시간(초). 서버가 없을 때 문서마다 연결을 시도하지 않도록
+GROBID_ALIVE_TTL = float(os.getenv("GROBID_ALIVE_TTL", 60))
+# 요청 본문을 보낼 때 한 번에 읽는 크기
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+PDFSource = Union[str, Path, bytes, mmap.mmap]
+
+class MultipartBody:
+    """multipart/form-data 요청 본문을 PDF 내용을 복사하지 않고 조금씩 읽어 보내는 파일 객체.
+
+    requests는 길이(__len__)와 read()가 있는 본문을 Content-Length를 붙여 블록 단위로 보냅니다.
+    """
+
+    def __init__(self, fields: List[Tuple[str, str]], name: str, filename: str, content: Union[bytes, mmap.mmap]):
+        self.boundary = uuid.uuid4().hex
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode("utf-8")
+            for key, value in fields
+        )
+        head += (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: application/pdf\r\n\r\n"
+        ).encode("utf-8")
+        self._parts = [head, content, f"\r\n--{self.boundary}--\r\n".encode("utf-8")]
+        self._length = sum(len(part) for part in self._parts)
+        self._index = 0
+        self._offset = 0
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length
+        chunks = []
+        while size > 0 and self._index < len(self._parts):
+            part = self._parts[self._index]
+            # bytes와 mmap 모두 잘라 읽으면 그 구간만 복사됨
+            chunk = part[self._offset:self._offset + size]
+            chunks.append(chunk)
+            size -= len(chunk)
+            self._offset += len(chunk)
+            if self._offset >= len(part):
+                self._index += 1
+                self._offset = 0
+        return b"".join(chunks)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+@contextmanager
+def _pdf_content(pdf: PDFSource) -> Iterator[Union[bytes, mmap.mmap]]:
+    """경로면 메모리 매핑해서, 버퍼면 그대로 넘깁니다 (파일 전체를 바이트로 복사하지 않음)."""
+    if not isinstance(pdf, (str, Path)):
+        yield pdf
+        return
+    with open(pdf, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            yield content
+
+def pdf_sha256(pdf: PDFSource) -> str:
+    """PDF 내용의 SHA-256 (경로는 메모리 매핑해서 계산)"""
+    with _pdf_content(pdf) as content:
+        return hashlib.sha256(content).hexdigest()
+
+class SharedGrobidClient:
+    """연결 풀을 공유하고 여러 PDF를 동시에 제출하는 GROBID 클라이언트입니다."""
+
+    def __init__(
+        self,
+        config_path: str = GROBID_CONFIG_PATH,
+        server: Optional[str] = None,
+        cache_dir: Path = GROBID_CACHE_DIR,
+        session: Optional[requests.Session] = None
+    ):
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f).get("grobid", {})
+
+        self.server = (server or os.getenv("GROBID_SERVER") or config.get("server", "http://localhost:8070")).rstrip("/")
+        self.timeout = config.get("timeout", 60)
+        self.concurrency = max(int(config.get("concurrency", 10)), 1)
+        self.batch_size = max(int(config.get("batch_size", 100)), 1)
+        self.max_retries = int(config.get("max_retries", 3))
+        self.sleep_time = float(config.get("sleep_time", 5))
+        self.coordinates = config.get("coordinates", ["formula"])
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # 동시 요청 수만큼 커넥션을 유지하는 세션 (session을 주면 그 세션을 그대로 씀)
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+        self._semaphore = threading.BoundedSemaphore(self.concurrency)
+        self._alive: Optional[Tuple[bool, float]] = None
+
+    def is_alive(self) -> bool:
+        """서버가 요청을 받을 수 있는지 확인합니다. 결과는 GROBID_ALIVE_TTL초 동안 다시 묻지 않습니다."""
+        if self._alive is not None and time.monotonic() - self._alive[1] < GROBID_ALIVE_TTL:
+            return self._alive[0]
+        try:
+            alive = self.session.get(f"{self.server}/api/isalive", timeout=min(self.timeout, 5)).ok
+        except requests.RequestException:
+            alive = False
+        if not alive and (self._alive is None or self._alive[0]):
+            logging.warning(f"GROBID 서버에 연결할 수 없어 수식 추출을 건너뜁니다: {self.server}")
+        self._alive = (alive, time.monotonic())
+        return alive
+
+    def extract_formulas(self, pdf: PDFSource, pdf_hash: Optional[str] = None) -> List[Dict]:
+        """PDF 하나(경로 또는 매핑된 버퍼)에서 수식을 추출합니다. 같은 내용의 PDF는 캐시된 결과를 사용합니다."""
+        return self._extract_formulas(pdf, pdf_hash or pdf_sha256(pdf))
+
+    def _load_cached(self, pdf_hash: str) -> Optional[List[Dict]]:
+        cache_path = self.cache_dir / f"{pdf_hash}.json"
+        if not cache_path.exists():
+            return None
+        with cache_path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _extract_formulas(self, pdf: PDFSource, pdf_hash: str) -> List[Dict]:
+        cached = self._load_cached(pdf_hash)
+        if cached is not None:
+            return cached
+
+        cache_path = self.cache_dir / f"{pdf_hash}.json"
+        with _pdf_content(pdf) as content:
+            formulas = self._parse_formulas(self._process_fulltext(content))
+
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(formulas, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+        return formulas
+
+    def extract_formulas_batch(self, pdf_paths: List[Union[str, Path]]) -> Dict[str, List[Dict]]:
+        """여러 PDF를 batch_size 단위로 나누어 concurrency 만큼 동시에 처리합니다."""
+        results: Dict[str, List[Dict]] = {}
+
+        def process(path: Union[str, Path], pdf_hash: str) -> List[Dict]:
+            try:
+                return self._extract_formulas(path, pdf_hash)
+            except Exception as e:
+                logging.error(f"GROBID 수식 추출 실패: {path}: {str(e)}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for start in range(0, len(pdf_paths), self.batch_size):
+                # 파일마다 해시를 계산하는 즉시 제출하고 (내용은 보낼 때 파일에서 읽음), 같은 내용의 PDF는 한 번만 제출
+                hashes = {}
+                futures = {}
+                for path in pdf_paths[start:start + self.batch_size]:
+                    pdf_hash = pdf_sha256(path)
+                    hashes[str(path)] = pdf_hash
+                    if pdf_hash not in futures:
+                        futures[pdf_hash] = executor.submit(process, path, pdf_hash)
+                for path, pdf_hash in hashes.items():
+                    results[path] = futures[pdf_hash].result()
+        return results
+
+    def _process_fulltext(self, content: Union[bytes, mmap.mmap]) -> str:
+        """processFulltextDocument를 호출하여 TEI XML을 받습니다. 서버가 바쁘면(503) 재시도합니다."""
+        url = f"{self.server}/api/processFulltextDocument"
+        fields = [("teiCoordinates", coordinate) for coordinate in self.coordinates]
+        fields += [("consolidateHeader", "0"), ("consolidateCitations", "0")]
+        for attempt in range(self.max_retries + 1):
+            body = MultipartBody(fields, "input", "document.pdf", content)
+            with self._semaphore:
+                response = self.session.post(
+                    url,
+                    data=body,
+                    headers={"Content-Type": body.content_type},
+                    timeout=self.timeout
+                )
+            if response.status_code == 503 and attempt < self.max_retries:
+                time.sleep(self.sleep_time)
+                continue
+            response.raise_for_status()
+            return response.text
+        raise RuntimeError("GROBID 서버가 요청을 처리하지 못했습니다.")
+
+    @staticmethod
+    def _parse_formulas(tei: str) -> List[Dict]:
+        """TEI XML에서 수식과 페이지, 바로 앞 문단을 문맥으로 추출합니다."""
+        root = ET.fromstring(tei)
+        formulas = []
+        for parent in root.iter():
+            previous_text = ""
+            for element in parent:
+                if element.tag == f"{{{TEI_NS['tei']}}}formula":
+                    label = element.find("tei:label", TEI_NS)
+                    label_text = "".join(label.itertext()).strip() if label is not None else ""
+                    text = "".join(element.itertext()).strip()
+                    if label_text and text.endswith(label_text):
+                        text = text[:-len(label_text)].strip()
+                    coords = element.get("coords", "")
+                    page = int(coords.split(",", 1)[0]) if coords else 1
+                    formulas.append({
+                        "page": page,
+                        "latex": text,
+                        "label": label_text,
+                        "context": previous_text[-200:]
+                    })
+                elif element.tag == f"{{{TEI_NS['tei']}}}p":
+                    previous_text = " ".join("".join(element.itertext()).split())
+        return sorted(formulas, key=lambda formula: formula["page"])
+
+_client: Optional[SharedGrobidClient] = None
+_client_lock = threading.Lock()
+
+def get_grobid_client() -> SharedGrobidClient:
+    """프로세스 전체에서 공유하는 GROBID 클라이언트를 반환합니다."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SharedGrobidClient()
+        return _client
@@ -0,0 +1,291 @@
+from typing import Dict, Iterator, List, Optional, Set
+import difflib
+import hashlib
+import io
+import logging
+import mmap
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument as MinerDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser as MinerParser
+from pdfminer.pdftypes import PDFStream, resolve1
+from pdfminer.psparser import PSLiteral
+from pdfminer.utils import decode_text
+from extractors.ocr import OCRStage, needs_ocr
+from extractors.page_images import PageImages
+from extractors.tables import TableExtractor
+from parsers.grobid_pool import get_grobid_client
+from monitoring.metrics import stage_timer
+
+# 파이프라인 단계 기본 설정 (표 추출은 페이지를 렌더링하고 셀마다 OCR하므로 켠 경우에만)
+EXTRACT_TABLES = os.getenv("PARSE_EXTRACT_TABLES", "false").lower() == "true"
+# 수식 추출은 GROBID 서버가 있어야 하므로 켠 경우에만 (켜도 서버가 응답하지 않으면 건너뜀)
+EXTRACT_EQUATIONS = os.getenv("PARSE_EXTRACT_EQUATIONS", "false").lower() == "true"
+# 선/사각형 그리기 연산이 이보다 적은 텍스트 페이지는 표가 없다고 보고 렌더링하지 않음
+TABLE_MIN_RULINGS = int(os.getenv("TABLE_MIN_RULINGS", 6))
+
+# 콘텐츠 스트림의 사각형(re)과 직선(l) 그리기 연산자
+_RULING_OPERATOR = re.compile(rb"\s(?:re|l)(?=\s)")
+
+def _stream_bytes(stream: PDFStream) -> bytes:
+    """스트림의 원본 바이트를 반환합니다."""
+    data = stream.get_rawdata()
+    return data if data is not None else stream.get_data()
+
+def page_hash(page: PDFPage) -> str:
+    """페이지 콘텐츠 스트림과 이미지 XObject로 페이지 내용 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    for stream in page.contents:
+        stream = resolve1(stream)
+        if isinstance(stream, PDFStream):
+            digest.update(_stream_bytes(stream))
+
+    # 스캔 페이지는 콘텐츠 스트림이 거의 같으므로 이미지 데이터까지 포함
+    xobjects = resolve1((page.resources or {}).get("XObject")) or {}
+    for name in sorted(xobjects):
+        xobject = resolve1(xobjects[name])
+        if isinstance(xobject, PDFStream):
+            digest.update(name.encode("utf-8") if isinstance(name, str) else bytes(name))
+            digest.update(_stream_bytes(xobject))
+    return digest.hexdigest()
+
+def ruling_count(page: PDFPage) -> int:
+    """페이지에서 선과 사각형을 그리는 연산 수. 격자선이 있는 표 후보를 렌더링 없이 고르는 데 씁니다."""
+    count = 0
+    for stream in page.contents:
+        stream = resolve1(stream)
+        if isinstance(stream, PDFStream):
+            count += len(_RULING_OPERATOR.findall(stream.get_data()))
+    return count
+
+def _decode_info_value(value) -> str:
+    """PDF 정보 사전의 문자열 값을 디코딩합니다."""
+    value = resolve1(value)
+    if isinstance(value, bytes):
+        return decode_text(value).strip("\x00").strip()
+    if isinstance(value, PSLiteral):
+        return str(value.name)
+    return str(value).strip() if value is not None else ""
+
+def _parse_pdf_date(value: str) -> Optional[str]:
+    """D:YYYYMMDDHHmmSS 형식의 PDF 날짜를 YYYY-MM-DD로 변환합니다."""
+    if value.startswith("D:"):
+        value = value[2:]
+    try:
+        return datetime.strptime(value[:8], "%Y%m%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+class PDFDocument:
+    """PDF 파일을 한 번만 메모리 매핑하여 메타데이터, 페이지 텍스트, 원본 바이트를 함께 제공합니다."""
+
+    def __init__(self, file_path: Path):
+        self.file_path = Path(file_path)
+        self._file = open(self.file_path, "rb")
+        try:
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.document = MinerDocument(MinerParser(self.buffer))
+        except Exception:
+            self._file.close()
+            raise
+        self._sha256: Optional[str] = None
+
+    def __enter__(self) -> "PDFDocument":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """메모리 매핑과 파일을 닫습니다."""
+        self.buffer.close()
+        self._file.close()
+
+    @property
+    def sha256(self) -> str:
+        """매핑된 버퍼의 SHA-256 해시입니다."""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.buffer).hexdigest()
+        return self._sha256
+
+    @property
+    def page_count(self) -> int:
+        pages = resolve1(self.document.catalog.get("Pages")) or {}
+        return int(resolve1(pages.get("Count", 0)) or 0)
+
+    def metadata(self) -> Dict:
+        """정보 사전에서 제목, 작성자, 작성일을 읽습니다. 값이 없으면 기본값을 사용합니다."""
+        info = {}
+        for entry in self.document.info:
+            info.update(entry)
+
+        title = _decode_info_value(info.get("Title"))
+        author = _decode_info_value(info.get("Author"))
+        created = _parse_pdf_date(_decode_info_value(info.get("CreationDate")))
+        return {
+            "title": title or "제목 없음",
+            "author": author or "작성자 불명",
+            "date": created or datetime.now().strftime("%Y-%m-%d"),
+            "pages": self.page_count
+        }
+
+    def page_hashes(self) -> List[str]:
+        """텍스트를 추출하지 않고 페이지 내용 해시만 계산합니다 (버전 비교용)."""
+        return [page_hash(page) for page in PDFPage.create_pages(self.document)]
+
+    def iter_pages(self, reuse: Optional[Dict[str, str]] = None) -> Iterator[Dict]:
+        """페이지별 {'page', 'text', 'hash', 'rulings'}를 같은 문서 객체에서 차례로 반환합니다.
+
+        reuse(페이지 해시 -> 텍스트)에 있는 페이지는 텍스트를 다시 추출하지 않고 reused=True로 반환합니다.
+        """
+        rsrcmgr = PDFResourceManager(caching=True)
+        output = io.StringIO()
+        device = TextConverter(rsrcmgr, output, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        try:
+            for page_number, page in enumerate(PDFPage.create_pages(self.document), 1):
+                digest = page_hash(page)
+                if reuse and digest in reuse:
+                    yield {
+                        "page": page_number,
+                        "text": reuse[digest],
+                        "hash": digest,
+                        "reused": True
+                    }
+                    continue
+                interpreter.process_page(page)
+                text = output.getvalue()
+                output.seek(0)
+                output.truncate()
+                yield {
+                    "page": page_number,
+                    "text": text,
+                    "hash": digest,
+                    "rulings": ruling_count(page)
+                }
+        finally:
+            device.close()
+
+def page_hashes(file_path: Path) -> List[str]:
+    with PDFDocument(file_path) as pdf:
+        return pdf.page_hashes()
+
+def file_sha256(file_path: Path) -> str:
+    """PDF를 파싱하지 않고 파일 내용의 SHA-256만 계산합니다 (PDFDocument.sha256과 같은 값)."""
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return hashlib.sha256(buffer).hexdigest()
+
+def page_diff(base: List[str], hashes: List[str]) -> Dict:
+    """두 버전의 페이지 해시 목록을 비교해 바뀐/추가된/삭제된 페이지 구간을 돌려줍니다 (페이지 번호는 1부터)."""
+    changes = []
+    summary = {"base_pages": len(base), "pages": len(hashes), "unchanged": 0, "changed": 0, "added": 0, "removed": 0}
+    matcher = difflib.SequenceMatcher(None, base, hashes, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            summary["unchanged"] += i2 - i1
+            continue
+        op = {"replace": "changed", "insert": "added", "delete": "removed"}[op]
+        # 길이가 다른 교체는 겹치는 부분만 변경, 나머지는 추가/삭제로 셈
+        if op == "changed":
+            summary["changed"] += min(i2 - i1, j2 - j1)
+            summary["added"] += max(0, (j2 - j1) - (i2 - i1))
+            summary["removed"] += max(0, (i2 - i1) - (j2 - j1))
+        else:
+            summary[op] += (i2 - i1) + (j2 - j1)
+        changes.append({
+            "op": op,
+            "base_pages": [i1 + 1, i2] if i2 > i1 else None,
+            "pages": [j1 + 1, j2] if j2 > j1 else None
+        })
+    return {"summary": summary, "changes": changes}
+
+def _reused_tables(pages: List[Dict], reused: Set[int], previous: Dict[str, Dict]) -> List[Dict]:
+    """다시 추출하지 않은 페이지의 이전 표를 새 페이지 번호로 옮깁니다."""
+    tables = []
+    for page in pages:
+        if page["page"] in reused:
+            tables.extend(dict(table, page=page["page"]) for table in previous[page["hash"]].get("tables", []))
+    return tables
+
+def parse_document(
+    file_path: Path,
+    extract_tables: bool = EXTRACT_TABLES,
+    extract_equations: bool = EXTRACT_EQUATIONS,
+    ocr: bool = True,
+    previous: Optional[List[Dict]] = None
+) -> Dict:
+    """PDF를 한 번 열어 메타데이터, 페이지 텍스트, OCR, 표, 수식을 모두 추출합니다.
+
+    수식 단계(GROBID)에는 매핑된 버퍼를 그대로 넘기고, OCR과 표 단계는 페이지 이미지를 공유합니다.
+
+    previous(이전에 파싱한 같은 문서의 페이지 {'hash', 'text', 'tables', 'ocr'})를 주면 해시가 같은 페이지는
+    텍스트 추출, OCR, 표 추출을 건너뛰고 이전 결과를 씁니다. 수식(GROBID)은 문서 단위라 항상 전체를 처리합니다.
+    """
+    previous_pages = {page["hash"]: page for page in previous or [] if page.get("hash")}
+    with stage_timer("pdf_decode"):
+        pdf = PDFDocument(file_path)
+    with pdf:
+        with stage_timer("pdf_decode"):
+            metadata = pdf.metadata()
+            # 페이지 이미지 캐시 등 내용 해시로 저장한 결과를 문서와 연결하는 데 씀
+            metadata["sha256"] = pdf.sha256
+        with stage_timer("text_extraction"):
+            pages = list(pdf.iter_pages({digest: page["text"] for digest, page in previous_pages.items()}))
+        reused = [page["page"] for page in pages if page.pop("reused", False)]
+        reused_set = set(reused)
+        changed = [page for page in pages if page["page"] not in reused_set]
+        rulings = {page["page"]: page.pop("rulings") for page in changed}
+        scanned = [page["page"] for page in changed if needs_ocr(page["text"])]
+        # 표 후보: 스캔 페이지와 선 그리기가 충분한 페이지만 렌더링
+        candidates = sorted(
+            set(scanned) | {page for page, count in rulings.items() if count >= TABLE_MIN_RULINGS}
+        ) if extract_tables else []
+
+        # 렌더링한 페이지 이미지는 OCR과 표 추출이 함께 씀 (페이지마다 한 번만 래스터화).
+        # pdftoppm은 파일만 읽을 수 있어 렌더링만 경로로 하고, 해시는 매핑된 버퍼에서 한 번 계산한 값을 씀
+        images = PageImages(pdf.file_path, pdf.sha256) if (ocr and scanned) or candidates else None
+
+        # 텍스트 레이어가 없는 스캔 페이지만 OCR (이전 결과를 쓴 페이지는 이미 OCR된 텍스트)
+        with stage_timer("ocr"):
+            ocr_pages = OCRStage().run(changed, images) if ocr and scanned else []
+        metadata["ocr_pages"] = sorted(ocr_pages + [
+            page["page"] for page in pages if page["page"] in reused_set and previous_pages[page["hash"]].get("ocr")
+        ])
+
+        tables = []
+        if extract_tables:
+            try:
+                with stage_timer("table_extraction"):
+                    tables = _reused_tables(pages, reused_set, previous_pages)
+                    if candidates:
+                        tables += TableExtractor().extract(images, candidates)
+                    tables.sort(key=lambda table: table["page"])
+                    for i, table in enumerate(tables, 1):
+                        table["caption"] = f"Table {i}"
+            except Exception as e:
+                logging.error(f"표 추출 중 오류 발생: {str(e)}")
+
+        equations = []
+        if extract_equations:
+            try:
+                client = get_grobid_client()
+                if client.is_alive():
+                    # 매핑된 버퍼를 그대로 넘김 (캐시에 없으면 복사하지 않고 조금씩 읽어 전송)
+                    with stage_timer("equation_extraction"):
+                        equations = client.extract_formulas(pdf.buffer, pdf_hash=pdf.sha256)
+            except Exception as e:
+                logging.error(f"수식 추출 중 오류 발생: {str(e)}")
+
+    return {
+        "metadata": metadata,
+        "pages": pages,
+        "tables": tables,
+        "equations": equations,
+        "reused_pages": reused
+    }
@@ -0,0 +1,231 @@
+from typing import Deque, Dict, List, Optional, Union
+import asyncio
+import ipaddress
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+# 풀별 동시 실행 수 ("이름=개수,..."). 작업자(gunicorn worker)마다 따로 적용됨
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "analysis=2,entities=2,sparql=4")
+# 풀마다 기다릴 수 있는 요청 수와 클라이언트 하나가 한 풀에서 기다릴 수 있는 요청 수
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", 32))
+ADMISSION_CLIENT_QUEUE_SIZE = int(os.getenv("ADMISSION_CLIENT_QUEUE_SIZE", 4))
+# 이 시간(초) 안에 차례가 오지 않으면 503으로 돌려보냄
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", 10))
+# X-Forwarded-For를 믿을 프록시 주소/대역 (쉼표로 구분, 예: "127.0.0.1,10.0.0.0/8"). 비어 있으면 헤더를 무시
+ADMISSION_TRUSTED_PROXIES = os.getenv("ADMISSION_TRUSTED_PROXIES", "")
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+def parse_networks(value: str) -> List[Network]:
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+TRUSTED_PROXIES = parse_networks(ADMISSION_TRUSTED_PROXIES)
+
+def _trusted(address: str, proxies: List[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in proxies)
+
+def client_address(peer: Optional[str], forwarded: Optional[str], proxies: List[Network] = TRUSTED_PROXIES) -> str:
+    """공정한 순서와 클라이언트별 대기열 몫에 쓸 클라이언트 주소.
+
+    X-Forwarded-For는 믿을 수 있는 프록시가 보낸 요청에서만 씁니다. 오른쪽(가까운 프록시)부터 믿을 수 있는
+    프록시 주소를 건너뛰고 처음 나오는 주소를 클라이언트로 보므로, 클라이언트가 헤더 앞쪽에 넣은 값은 쓰이지 않습니다.
+    """
+    peer = peer or "unknown"
+    if not forwarded or not _trusted(peer, proxies):
+        return peer
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _trusted(hop, proxies):
+            return hop
+    return hops[0] if hops else peer
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+def parse_limits(value: str) -> Dict[str, int]:
+    limits = {}
+    for item in value.split(","):
+        name, _, limit = item.partition("=")
+        if name.strip() and limit.strip():
+            limits[name.strip()] = max(1, int(limit))
+    return limits
+
+class Rejected(Exception):
+    """대기열이 가득 찼거나(503), 클라이언트 몫을 넘었거나(429), 너무 오래 기다린(503) 요청."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionPool:
+    """무거운 엔드포인트 하나의 동시 실행 수를 제한하고 남는 요청을 우선순위/클라이언트별로 줄 세웁니다.
+
+    대화형 요청이 일괄(batch) 요청보다 먼저 차례를 받고, 일괄 요청은 limit - 1개까지만 실행되어
+    대화형 요청을 위한 자리가 하나는 남습니다. 같은 우선순위 안에서는 클라이언트를 돌아가며 하나씩 꺼내므로
+    요청을 많이 보낸 클라이언트가 다른 클라이언트를 밀어내지 못합니다. 이벤트 루프에서만 호출됩니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int = ADMISSION_QUEUE_SIZE,
+        max_per_client: int = ADMISSION_CLIENT_QUEUE_SIZE,
+        max_wait: float = ADMISSION_MAX_WAIT
+    ):
+        self.name = name
+        self.limit = limit
+        self.batch_limit = max(1, limit - 1)
+        self.max_queue = max_queue
+        self.max_per_client = max_per_client
+        self.max_wait = max_wait
+        self.running = {priority: 0 for priority in PRIORITIES}
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+        # 우선순위별 클라이언트 -> 대기 중인 Future (클라이언트 순서가 곧 돌아가며 꺼낼 순서)
+        self._waiters: Dict[str, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+        self._waiting = 0
+        # 요청 하나를 처리하는 평균 시간(초, 지수 이동 평균). Retry-After 추정에 사용
+        self._service_time = 1.0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def _can_run(self, priority: str) -> bool:
+        if sum(self.running.values()) >= self.limit:
+            return False
+        return priority == INTERACTIVE or self.running[BATCH] < self.batch_limit
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._service_time * (self._waiting + 1) / self.limit))
+
+    def _reject(self, status_code: int, reason: str):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        raise Rejected(status_code, reason, self._retry_after())
+
+    def _client_waiting(self, client: str) -> int:
+        return sum(len(self._waiters[priority].get(client, ())) for priority in PRIORITIES)
+
+    def _remove(self, priority: str, client: str, future: asyncio.Future):
+        queue = self._waiters[priority].get(client)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        self._waiting -= 1
+        if not queue:
+            del self._waiters[priority][client]
+
+    def _dispatch(self):
+        """자리가 나는 만큼 대기 중인 요청에 차례를 넘깁니다."""
+        for priority in PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters and self._can_run(priority):
+                client, queue = next(iter(waiters.items()))
+                future = queue.popleft()
+                self._waiting -= 1
+                if queue:
+                    waiters.move_to_end(client)
+                else:
+                    del waiters[client]
+                if future.done():
+                    continue
+                self.running[priority] += 1
+                future.set_result(None)
+
+    def _release(self, priority: str, elapsed: Optional[float] = None):
+        self.running[priority] -= 1
+        if elapsed is not None:
+            self._service_time = self._service_time * 0.8 + elapsed * 0.2
+        self._dispatch()
+
+    async def acquire(self, client: str, priority: str = INTERACTIVE) -> float:
+        """차례가 올 때까지 기다리고 기다린 시간(초)을 반환합니다. 받아들일 수 없으면 Rejected를 던집니다."""
+        if priority not in self.running:
+            priority = INTERACTIVE
+        # 같은 우선순위 이상의 대기 요청이 없을 때만 바로 실행 (새치기 방지)
+        ahead = self._waiters[INTERACTIVE] if priority == INTERACTIVE else (
+            self._waiters[INTERACTIVE] or self._waiters[BATCH]
+        )
+        if not ahead and self._can_run(priority):
+            self.running[priority] += 1
+            self.admitted += 1
+            return 0.0
+        if self._waiting >= self.max_queue:
+            self._reject(503, "queue_full")
+        if self._client_waiting(client) >= self.max_per_client:
+            self._reject(429, "client_limit")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[priority].setdefault(client, deque()).append(future)
+        self._waiting += 1
+        start = time.perf_counter()
+        try:
+            # wait_for는 차례를 받는 순간과 겹친 취소를 삼키고 결과를 돌려주므로(끊긴 요청이 계속 실행됨)
+            # future를 취소하지도, 태스크 취소를 삼키지도 않는 wait로 기다림
+            await asyncio.wait((future,), timeout=self.max_wait)
+        except BaseException:
+            # 클라이언트가 연결을 끊는 등으로 취소됨: 이미 받은 자리는 돌려줌
+            self._remove(priority, client, future)
+            if future.done() and not future.cancelled():
+                self._release(priority)
+            else:
+                future.cancel()
+            raise
+        if not future.done():
+            self._remove(priority, client, future)
+            future.cancel()
+            self._reject(503, "timeout")
+        self.admitted += 1
+        return time.perf_counter() - start
+
+    @asynccontextmanager
+    async def slot(self, client: str, priority: str = INTERACTIVE):
+        """with 블록 동안 자리 하나를 차지하고 기다린 시간(초)을 넘깁니다. 블록을 벗어나면 다음 대기 요청에 넘깁니다."""
+        if priority not in self.running:
+            priority = INTERACTIVE
+        waited = await self.acquire(client, priority)
+        start = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self._release(priority, time.perf_counter() - start)
+
+    def stats(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "batch_limit": self.batch_limit,
+            "running": dict(self.running),
+            "waiting": {priority: sum(map(len, self._waiters[priority].values())) for priority in PRIORITIES},
+            "waiting_clients": len(set().union(*(self._waiters[priority] for priority in PRIORITIES))),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avg_service_s": round(self._service_time, 4)
+        }
+
+class AdmissionController:
+    """라우트 경로 템플릿을 풀에 연결합니다. 연결되지 않은 라우트는 제한 없이 바로 실행됩니다."""
+
+    def __init__(self, routes: Dict[str, str], limits: Optional[Dict[str, int]] = None):
+        limits = limits if limits is not None else parse_limits(ADMISSION_LIMITS)
+        self.pools = {name: AdmissionPool(name, limit) for name, limit in limits.items()}
+        self.routes = {path: name for path, name in routes.items() if name in self.pools}
+
+    def pool_for(self, route_path: str) -> Optional[AdmissionPool]:
+        name = self.routes.get(route_path)
+        return self.pools.get(name) if name else None
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: pool.stats() for name, pool in self.pools.items()}
@@ -0,0 +1,181 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import heapq
+import html
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+SEARCH_INDEX_PATH = Path(os.getenv("SEARCH_INDEX_PATH", "search_index/bm25.sqlite3"))
+BM25_K1 = float(os.getenv("BM25_K1", 1.5))
+BM25_B = float(os.getenv("BM25_B", 0.75))
+SNIPPET_CHARS = 200
+
+WORD_PATTERN = re.compile(r"\w+")
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+def tokenize(text: str) -> Iterator[str]:
+    """단어를 소문자로 반환합니다. 한글 단어는 조사가 붙어도 찾을 수 있도록 글자 2-gram도 함께 반환합니다."""
+    for word in WORD_PATTERN.findall(text.lower()):
+        yield word
+        if len(word) > 2 and HANGUL_PATTERN.search(word):
+            for i in range(len(word) - 1):
+                yield word[i:i + 2]
+
+class BM25Index:
+    """문서별 길이와 (단어, 문서, 빈도) 역색인을 SQLite에 저장하고 BM25로 점수를 매깁니다.
+
+    검색 시 질의 단어의 포스팅만 읽으므로 전체 문서를 열지 않습니다.
+    """
+
+    def __init__(self, path: Path = SEARCH_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                name TEXT PRIMARY KEY,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                name TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, name)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_name ON postings (name);
+        """)
+        self._conn.commit()
+
+    def documents(self) -> Set[str]:
+        with self._lock:
+            return {name for (name,) in self._conn.execute("SELECT name FROM documents")}
+
+    def index_document(self, name: str, text: str):
+        """문서의 단어 빈도를 저장합니다. 이미 색인된 문서는 교체합니다."""
+        counts = Counter(tokenize(text))
+        with self._lock, self._conn:
+            self._delete(name)
+            self._conn.execute(
+                "INSERT INTO documents (name, length) VALUES (?, ?)",
+                (name, sum(counts.values()))
+            )
+            self._conn.executemany(
+                "INSERT INTO postings (term, name, tf) VALUES (?, ?, ?)",
+                ((term, name, tf) for term, tf in counts.items())
+            )
+
+    def remove_document(self, name: str):
+        with self._lock, self._conn:
+            self._delete(name)
+
+    def rename_document(self, name: str, new_name: str):
+        with self._lock, self._conn:
+            self._delete(new_name)
+            self._conn.execute("UPDATE documents SET name = ? WHERE name = ?", (new_name, name))
+            self._conn.execute("UPDATE postings SET name = ? WHERE name = ?", (new_name, name))
+
+    def _delete(self, name: str):
+        self._conn.execute("DELETE FROM postings WHERE name = ?", (name,))
+        self._conn.execute("DELETE FROM documents WHERE name = ?", (name,))
+
+    def scores(self, query: str, candidates: Optional[Set[str]] = None) -> Dict[str, float]:
+        """질의 단어가 하나라도 있는 문서의 BM25 점수를 반환합니다."""
+        terms = set(tokenize(query))
+        if not terms:
+            return {}
+        with self._lock:
+            count, total_length = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents"
+            ).fetchone()
+            if not count:
+                return {}
+            average_length = total_length / count or 1.0
+
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._conn.execute(
+                    "SELECT p.name, p.tf, d.length FROM postings p JOIN documents d ON d.name = p.name WHERE p.term = ?",
+                    (term,)
+                ).fetchall()
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for name, tf, length in postings:
+                    if candidates is not None and name not in candidates:
+                        continue
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    scores[name] = scores.get(name, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+            return scores
+
+    def search(self, query: str, top_k: int = 20, candidates: Optional[Set[str]] = None) -> List[Tuple[float, str]]:
+        """점수가 높은 top_k개 (점수, 문서)만 힙으로 골라 반환합니다."""
+        scores = self.scores(query, candidates)
+        return heapq.nlargest(top_k, ((score, name) for name, score in scores.items()))
+
+def _match_pattern(query: str) -> Optional[re.Pattern]:
+    words = sorted(set(WORD_PATTERN.findall(query.lower())), key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+
+def make_snippet(content: str, query: str, width: int = SNIPPET_CHARS) -> Dict:
+    """질의 단어가 가장 많이 모인 위치를 중심으로 발췌하고, 발췌문 안의 일치 구간 오프셋을 반환합니다.
+
+    반환값: {'snippet', 'highlights': [[시작, 끝], ...], 'highlighted': <mark>로 감싼 HTML}
+    """
+    pattern = _match_pattern(query)
+    matches = [match.span() for match in pattern.finditer(content)] if pattern else []
+
+    if matches:
+        # 창 안에 들어오는 서로 다른 질의 단어 수(같으면 일치 수)가 가장 많은 구간을 가운데 정렬
+        words = [content[start:end].lower() for start, end in matches]
+        best = (0, 0, 0, 0)
+        window = Counter()
+        right = 0
+        for left, (start, _) in enumerate(matches):
+            while right < len(matches) and matches[right][1] - start <= width:
+                window[words[right]] += 1
+                right += 1
+            if right > left:
+                best = max(best, (len(window), right - left, -left, right))
+                window[words[left]] -= 1
+                if not window[words[left]]:
+                    del window[words[left]]
+            else:
+                right = left + 1
+        first = -best[2]
+        last = max(best[3] - 1, first)
+        window_start = max(0, (matches[first][0] + matches[last][1]) // 2 - width // 2)
+    else:
+        window_start = 0
+    window_start = max(0, min(window_start, len(content) - width))
+    window_end = min(len(content), window_start + width)
+
+    prefix = "..." if window_start > 0 else ""
+    suffix = "..." if window_end < len(content) else ""
+    snippet = prefix + content[window_start:window_end] + suffix
+
+    highlights = []
+    for start, end in matches:
+        if start >= window_start and end <= window_end:
+            highlights.append([start - window_start + len(prefix), end - window_start + len(prefix)])
+
+    parts = []
+    position = 0
+    for start, end in highlights:
+        parts.append(html.escape(snippet[position:start]))
+        parts.append(f"<mark>{html.escape(snippet[start:end])}</mark>")
+        position = end
+    parts.append(html.escape(snippet[position:]))
+
+    return {
+        "snippet": snippet,
+        "highlights": highlights,
+        "highlighted": "".join(parts)
+    }
@@ -0,0 +1,230 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+DUPLICATE_INDEX_PATH = Path(os.getenv("DUPLICATE_INDEX_PATH", "dedup_index/minhash.sqlite3"))
+MINHASH_PERMUTATIONS = int(os.getenv("MINHASH_PERMUTATIONS", 128))
+# 밴드 수 32 x 행 4 → 유사도 약 0.42 이상에서 후보가 되기 시작
+MINHASH_BANDS = int(os.getenv("MINHASH_BANDS", 32))
+SHINGLE_WORDS = int(os.getenv("MINHASH_SHINGLE_WORDS", 3))
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", 0.8))
+
+MERSENNE_PRIME = (1 << 31) - 1
+WORD_PATTERN = re.compile(r"\w+")
+SHINGLE_BLOCK = 8192
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> Set[str]:
+    """소문자로 바꾼 단어를 size개씩 이어 붙인 shingle 집합을 만듭니다."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class MinHasher:
+    """(a * h + b) mod p 형태의 해시 함수 num_perm개로 MinHash 서명을 계산합니다."""
+
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: Set[str]) -> Optional[np.ndarray]:
+        if not items:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=4).digest(), "little") for item in items),
+            dtype=np.uint64,
+            count=len(items)
+        ) % MERSENNE_PRIME
+        signature = np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        # a, h < 2^31 이므로 a * h + b는 uint64 범위 안에 있음
+        for start in range(0, len(hashes), SHINGLE_BLOCK):
+            block = hashes[start:start + SHINGLE_BLOCK]
+            permuted = (self.a[:, None] * block[None, :] + self.b[:, None]) % MERSENNE_PRIME
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """두 서명이 같은 위치의 비율로 Jaccard 유사도를 추정합니다."""
+    return float(np.mean(first == second))
+
+class DuplicateIndex:
+    """문서별 MinHash 서명과 LSH 밴드 버킷을 SQLite에 저장합니다.
+
+    같은 밴드 값을 가진 문서만 후보로 비교하므로 전체 문서를 서로 비교하지 않습니다.
+    """
+
+    def __init__(self, path: Path = DUPLICATE_INDEX_PATH, bands: int = MINHASH_BANDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hasher = MinHasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError("MINHASH_PERMUTATIONS는 MINHASH_BANDS의 배수여야 합니다.")
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.clusters_path = self.path.parent / "clusters.json"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                name TEXT PRIMARY KEY,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                key INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                PRIMARY KEY (band, key, name)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS buckets_name ON buckets (name);
+        """)
+        self._conn.commit()
+
+    def _band_keys(self, signature: np.ndarray) -> Iterator[Tuple[int, int]]:
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            yield band, int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True)
+
+    def documents(self) -> Set[str]:
+        with self._lock:
+            return {name for (name,) in self._conn.execute("SELECT name FROM signatures")}
+
+    def add_document(self, name: str, text: str):
+        """문서의 서명을 계산하여 색인합니다. 본문이 없는 문서는 색인하지 않습니다."""
+        signature = self.hasher.signature(shingles(text))
+        with self._lock, self._conn:
+            self._delete(name)
+            if signature is None:
+                return
+            self._conn.execute(
+                "INSERT INTO signatures (name, signature) VALUES (?, ?)",
+                (name, signature.tobytes())
+            )
+            self._conn.executemany(
+                "INSERT INTO buckets (band, key, name) VALUES (?, ?, ?)",
+                ((band, key, name) for band, key in self._band_keys(signature))
+            )
+
+    def remove_document(self, name: str):
+        with self._lock, self._conn:
+            self._delete(name)
+
+    def rename_document(self, name: str, new_name: str):
+        with self._lock, self._conn:
+            self._delete(new_name)
+            self._conn.execute("UPDATE signatures SET name = ? WHERE name = ?", (new_name, name))
+            self._conn.execute("UPDATE buckets SET name = ? WHERE name = ?", (new_name, name))
+
+    def _delete(self, name: str):
+        self._conn.execute("DELETE FROM buckets WHERE name = ?", (name,))
+        self._conn.execute("DELETE FROM signatures WHERE name = ?", (name,))
+
+    def _signature(self, name: str) -> Optional[np.ndarray]:
+        row = self._conn.execute("SELECT signature FROM signatures WHERE name = ?", (name,)).fetchone()
+        return np.frombuffer(row[0], dtype=np.uint32) if row else None
+
+    def near_duplicates(self, name: str, threshold: float = DUPLICATE_THRESHOLD) -> List[Dict]:
+        """추정 유사도가 threshold 이상인 문서를 유사도 순으로 반환합니다."""
+        with self._lock:
+            signature = self._signature(name)
+            if signature is None:
+                return []
+            candidates = set()
+            for band, key in self._band_keys(signature):
+                candidates.update(
+                    candidate for (candidate,) in self._conn.execute(
+                        "SELECT name FROM buckets WHERE band = ? AND key = ?", (band, key)
+                    )
+                )
+            candidates.discard(name)
+
+            duplicates = []
+            for candidate in candidates:
+                score = similarity(signature, self._signature(candidate))
+                if score >= threshold:
+                    duplicates.append({"filename": candidate, "similarity": round(score, 4)})
+        return sorted(duplicates, key=lambda duplicate: (-duplicate["similarity"], duplicate["filename"]))
+
+    def cluster(self, threshold: float = DUPLICATE_THRESHOLD) -> Dict:
+        """같은 버킷에 든 문서 쌍만 비교해 유사도가 threshold 이상이면 묶습니다(union-find).
+
+        결과는 clusters.json에 저장되어 다시 조회할 수 있습니다.
+        """
+        parent: Dict[str, str] = {}
+
+        def find(name: str) -> str:
+            parent.setdefault(name, name)
+            while parent[name] != name:
+                parent[name] = parent[parent[name]]
+                name = parent[name]
+            return name
+
+        with self._lock:
+            signatures = {
+                name: np.frombuffer(blob, dtype=np.uint32)
+                for name, blob in self._conn.execute("SELECT name, signature FROM signatures")
+            }
+            groups = self._conn.execute(
+                "SELECT GROUP_CONCAT(name, char(0)) FROM buckets GROUP BY band, key HAVING COUNT(*) > 1"
+            ).fetchall()
+
+        compared = set()
+        for (members,) in groups:
+            members = sorted(members.split("\0"))
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if (first, second) in compared:
+                        continue
+                    compared.add((first, second))
+                    if similarity(signatures[first], signatures[second]) >= threshold:
+                        parent[find(second)] = find(first)
+
+        clusters: Dict[str, List[str]] = {}
+        for name in parent:
+            clusters.setdefault(find(name), []).append(name)
+
+        result = []
+        for members in clusters.values():
+            if len(members) < 2:
+                continue
+            members.sort()
+            representative = members[0]
+            result.append({
+                "representative": representative,
+                "members": [
+                    {
+                        "filename": member,
+                        "similarity": round(similarity(signatures[representative], signatures[member]), 4)
+                    }
+                    for member in members
+                ]
+            })
+        result.sort(key=lambda cluster: (-len(cluster["members"]), cluster["representative"]))
+
+        report = {
+            "created_at": datetime.now().isoformat(),
+            "threshold": threshold,
+            "documents": len(signatures),
+            "compared_pairs": len(compared),
+            "clusters": result
+        }
+        tmp_path = self.clusters_path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.clusters_path)
+        return report
+
+    def last_clusters(self) -> Optional[Dict]:
+        if not self.clusters_path.exists():
+            return None
+        with self.clusters_path.open("r", encoding="utf-8") as f:
+            return json.load(f)
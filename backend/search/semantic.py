@@ -0,0 +1,327 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 임베딩/색인 기본 설정
+SEMANTIC_INDEX_DIR = Path(os.getenv("SEMANTIC_INDEX_DIR", "semantic_index"))
+SEMANTIC_MODEL = os.getenv("SEMANTIC_MODEL", "hashing")
+SEMANTIC_DIM = int(os.getenv("SEMANTIC_DIM", 1024))
+CHUNK_CHARS = int(os.getenv("SEMANTIC_CHUNK_CHARS", 800))
+LSH_TABLES = int(os.getenv("SEMANTIC_LSH_TABLES", 8))
+LSH_BITS = int(os.getenv("SEMANTIC_LSH_BITS", 12))
+# 이 행 수 이하이면 근사 색인 대신 전체를 정확히 비교
+EXACT_SEARCH_ROWS = int(os.getenv("SEMANTIC_EXACT_ROWS", 20000))
+SCAN_BLOCK_ROWS = 4096
+
+TOKEN_PATTERN = re.compile(r"\w+")
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+class HashingEmbedder:
+    """단어와 글자 n-gram을 부호 있는 해싱으로 고정 차원 벡터에 투영합니다.
+
+    모델 없이 결정적으로 동작하므로 테스트와 모델을 설치하지 않은 환경에서 사용합니다.
+    한국어는 조사가 붙어 단어 형태가 자주 바뀌므로 글자 2-gram으로 보완합니다.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = SEMANTIC_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> Iterator[Tuple[str, float]]:
+        for word in TOKEN_PATTERN.findall(text.lower()):
+            yield word, 1.0
+            # 한글은 음절 하나가 정보량이 많으므로 2-gram, 나머지는 경계 표시를 붙인 3-gram
+            size = 2 if HANGUL_PATTERN.search(word) else 3
+            padded = word if size == 2 else f"#{word}#"
+            for i in range(len(padded) - size + 1):
+                yield padded[i:i + size], 0.5
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                sign = 1.0 if digest >> 63 else -1.0
+                vectors[row, digest % self.dim] += sign * weight
+        return _normalize(vectors)
+
+class SentenceTransformerEmbedder:
+    """sentence-transformers 모델을 CPU에서 실행하는 임베더입니다."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = model_name
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False)
+        return _normalize(vectors.astype(np.float32))
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def get_embedder(model_name: str = SEMANTIC_MODEL):
+    """설정된 임베더를 반환합니다. 모델을 불러올 수 없으면 해싱 임베더를 사용합니다."""
+    if model_name == "hashing":
+        return HashingEmbedder()
+    try:
+        return SentenceTransformerEmbedder(model_name)
+    except Exception as e:
+        logging.error(f"임베딩 모델 로드 실패, 해싱 임베더를 사용합니다: {str(e)}")
+        return HashingEmbedder()
+
+def iter_chunks(pages: Iterable[Dict], chunk_chars: int = CHUNK_CHARS) -> Iterator[Dict]:
+    """저장된 페이지의 블록(제목, 문단)을 페이지 안에서 chunk_chars 이하 조각으로 묶습니다."""
+    for page in pages:
+        start = end = None
+        for block in page["blocks"]:
+            if start is not None and block["end"] - start > chunk_chars:
+                yield _chunk(page, start, end)
+                start = None
+            if start is None:
+                start = block["start"]
+            end = block["end"]
+            # 한 블록이 너무 길면 잘라서 내보냄
+            while end - start > chunk_chars:
+                yield _chunk(page, start, start + chunk_chars)
+                start += chunk_chars
+        if start is not None and end > start:
+            yield _chunk(page, start, end)
+
+def _chunk(page: Dict, start: int, end: int) -> Dict:
+    return {
+        "page": page["page"],
+        "start": start,
+        "end": end,
+        "text": page["text"][start - page["start"]:end - page["start"]]
+    }
+
+class SemanticIndex:
+    """청크 임베딩을 메모리 매핑된 float32 행렬에 저장하고 랜덤 초평면 LSH로 근사 검색합니다.
+
+    - vectors.f32: 청크 벡터를 행 단위로 덧붙여 쓰는 파일 (np.memmap으로 읽기)
+    - index.json: 행별 (문서, 페이지, 시작, 끝)과 삭제 표시
+    - index.lock: 여러 작업자 프로세스가 벡터를 덧붙이고 index.json을 쓰는 동안 잡는 잠금 파일
+    LSH 버킷은 시작할 때 벡터 파일을 블록 단위로 읽어 다시 만들며, 벡터 자체는 메모리에 올리지 않습니다.
+    """
+
+    def __init__(self, root: Path = SEMANTIC_INDEX_DIR, embedder=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.embedder = embedder or get_embedder()
+        self.dim = self.embedder.dim
+        self.vectors_path = self.root / "vectors.f32"
+        self.meta_path = self.root / "index.json"
+        self.lock_path = self.root / "index.lock"
+        self._lock = threading.RLock()
+        self._planes = np.random.default_rng(20250421).standard_normal(
+            (LSH_TABLES * LSH_BITS, self.dim)
+        ).astype(np.float32)
+        self._bit_weights = (1 << np.arange(LSH_BITS, dtype=np.int64))
+        self._meta_stamp = None
+        # 시작할 때 남은 행을 잘라내는 동안 다른 작업자가 덧붙이지 않도록
+        with self._file_lock():
+            self._load()
+
+    def _load(self, repair: bool = True):
+        rows: List[Optional[List]] = []
+        if self.meta_path.exists():
+            with self.meta_path.open("r", encoding="utf-8") as f:
+                meta = json.load(f)
+            # 모델이나 차원이 바뀌면 색인을 새로 만듦
+            if meta.get("model") == self.embedder.name and meta.get("dim") == self.dim:
+                rows = meta["rows"]
+        # 다시 읽을 때(repair=False)는 다른 작업자가 쓰는 중일 수 있으므로 파일을 건드리지 않음
+        if repair and not rows:
+            self.vectors_path.unlink(missing_ok=True)
+        elif repair and self.vectors_path.stat().st_size > len(rows) * self.dim * 4:
+            # 벡터를 쓰고 index.json을 저장하기 전에 중단된 경우 남은 행을 잘라냄
+            os.truncate(self.vectors_path, len(rows) * self.dim * 4)
+        self.rows = rows
+        self._by_document: Dict[str, List[int]] = {}
+        for row_id, row in enumerate(self.rows):
+            if row is not None:
+                self._by_document.setdefault(row[0], []).append(row_id)
+
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(LSH_TABLES)]
+        vectors = self._vectors()
+        for block_start in range(0, len(self.rows), SCAN_BLOCK_ROWS):
+            block = np.asarray(vectors[block_start:block_start + SCAN_BLOCK_ROWS])
+            self._add_to_buckets(block_start, block)
+        self._meta_stamp = self._stamp()
+
+    def _stamp(self):
+        try:
+            stat = self.meta_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self):
+        """다른 작업자가 index.json을 바꿨으면 다시 읽습니다 (stat 한 번으로 확인)."""
+        if self._stamp() != self._meta_stamp:
+            self._load(repair=False)
+
+    def _vectors(self) -> np.ndarray:
+        if not self.rows:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.rows), self.dim))
+
+    def _signatures(self, vectors: np.ndarray) -> np.ndarray:
+        """(행 수, 테이블 수) 크기의 LSH 버킷 키를 계산합니다."""
+        bits = (vectors @ self._planes.T > 0).reshape(len(vectors), LSH_TABLES, LSH_BITS)
+        return bits.astype(np.int64) @ self._bit_weights
+
+    def _add_to_buckets(self, first_row: int, vectors: np.ndarray):
+        if not len(vectors):
+            return
+        for offset, keys in enumerate(self._signatures(vectors)):
+            row_id = first_row + offset
+            if self.rows[row_id] is None:
+                continue
+            for table, key in enumerate(keys):
+                self._buckets[table].setdefault(int(key), []).append(row_id)
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _exclusive(self):
+        """벡터 파일과 index.json을 바꾸는 동안 다른 작업자 프로세스가 끼어들지 않도록 잠금 파일을 잡습니다.
+
+        잠금을 잡은 뒤 index.json을 다시 읽으므로, 다른 작업자가 덧붙인 행 위에 이어 씁니다.
+        """
+        with self._lock, self._file_lock():
+            self._refresh()
+            yield
+
+    def _save_meta(self):
+        tmp_path = self.meta_path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump({"model": self.embedder.name, "dim": self.dim, "rows": self.rows}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+        self._meta_stamp = self._stamp()
+
+    def documents(self) -> Set[str]:
+        with self._lock:
+            self._refresh()
+            return set(self._by_document)
+
+    def index_document(self, filename: str, pages: Iterable[Dict]):
+        """문서의 청크를 임베딩하여 색인합니다. 이미 색인된 문서는 교체합니다."""
+        chunks = list(iter_chunks(pages))
+        vectors = self.embedder.embed([chunk["text"] for chunk in chunks]) if chunks else None
+        with self._exclusive():
+            self._remove(filename)
+            if chunks:
+                first_row = len(self.rows)
+                # 다른 작업자가 벡터만 쓰고 index.json을 저장하지 못한 채 중단됐으면 남은 행을 잘라내고 이어 씀
+                if self.vectors_path.exists() and self.vectors_path.stat().st_size > first_row * self.dim * 4:
+                    os.truncate(self.vectors_path, first_row * self.dim * 4)
+                with self.vectors_path.open("ab") as f:
+                    f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                for chunk in chunks:
+                    self.rows.append([filename, chunk["page"], chunk["start"], chunk["end"]])
+                self._add_to_buckets(first_row, vectors)
+            # 본문이 없는 문서도 색인된 것으로 기록하여 다시 시도하지 않음
+            self._by_document[filename] = list(range(len(self.rows) - len(chunks), len(self.rows)))
+            self._compact_if_needed()
+            self._save_meta()
+
+    def remove_document(self, filename: str):
+        with self._exclusive():
+            if self._remove(filename):
+                self._compact_if_needed()
+                self._save_meta()
+
+    def rename_document(self, filename: str, new_filename: str):
+        with self._exclusive():
+            row_ids = self._by_document.pop(filename, [])
+            for row_id in row_ids:
+                self.rows[row_id][0] = new_filename
+            if row_ids:
+                self._by_document[new_filename] = row_ids
+                self._save_meta()
+
+    def _remove(self, filename: str) -> bool:
+        """행에 삭제 표시만 하고, 버킷에서는 검색 시 걸러냅니다."""
+        row_ids = self._by_document.pop(filename, [])
+        for row_id in row_ids:
+            self.rows[row_id] = None
+        return bool(row_ids)
+
+    def _compact_if_needed(self):
+        """삭제된 행이 절반을 넘으면 벡터 파일을 다시 써서 공간을 회수합니다."""
+        live = [row_id for row_id, row in enumerate(self.rows) if row is not None]
+        if len(live) * 2 >= len(self.rows):
+            return
+        vectors = self._vectors()
+        tmp_path = self.vectors_path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("wb") as f:
+            for block_start in range(0, len(live), SCAN_BLOCK_ROWS):
+                f.write(np.ascontiguousarray(vectors[live[block_start:block_start + SCAN_BLOCK_ROWS]]).tobytes())
+        del vectors
+        os.replace(tmp_path, self.vectors_path)
+        self.rows = [self.rows[row_id] for row_id in live]
+        self._save_meta()
+        self._load()
+
+    def search(self, query: str, top_k: int = 50) -> List[Tuple[float, str, int, int, int]]:
+        """(코사인 유사도, 문서, 페이지, 시작, 끝) 목록을 유사도 순으로 반환합니다."""
+        query_vector = self.embedder.embed([query])[0]
+        with self._lock:
+            self._refresh()
+            vectors = self._vectors()
+            live_rows = sum(len(row_ids) for row_ids in self._by_document.values())
+            candidates = None
+            if live_rows > EXACT_SEARCH_ROWS:
+                keys = self._signatures(query_vector[None, :])[0]
+                candidates = set()
+                for table, key in enumerate(keys):
+                    candidates.update(self._buckets[table].get(int(key), []))
+                candidates = sorted(row_id for row_id in candidates if self.rows[row_id] is not None)
+                if len(candidates) < top_k:
+                    candidates = None
+
+            if candidates is not None:
+                scores = np.asarray(vectors[candidates]) @ query_vector
+                scored = zip(scores.tolist(), candidates)
+            else:
+                # 블록 단위로 읽어 전체 비교 (메모리 사용은 블록 크기로 제한)
+                scored = self._scan(vectors, query_vector)
+
+            best = heapq.nlargest(top_k, scored)
+            return [(score, *self.rows[row_id]) for score, row_id in best]
+
+    def _scan(self, vectors: np.ndarray, query_vector: np.ndarray) -> Iterator[Tuple[float, int]]:
+        for block_start in range(0, len(vectors), SCAN_BLOCK_ROWS):
+            scores = np.asarray(vectors[block_start:block_start + SCAN_BLOCK_ROWS]) @ query_vector
+            for offset, score in enumerate(scores.tolist()):
+                row_id = block_start + offset
+                if self.rows[row_id] is not None:
+                    yield score, row_id
@@ -0,0 +1,55 @@
+from typing import Dict, Optional
+import json
+import os
+import threading
+from pathlib import Path
+
+ANALYSIS_CACHE_DIR = Path(os.getenv("ANALYSIS_CACHE_DIR", "analysis_cache"))
+
+class AnalysisCache:
+    """키워드/요약/개체 추출 결과를 문서 본문 해시 기준으로 저장합니다.
+
+    본문이 같으면 파일 이름이나 메타데이터가 달라도 같은 결과를 사용합니다.
+    """
+
+    def __init__(self, cache_dir: Path = ANALYSIS_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, kind: str, content_hash: str) -> Path:
+        return self.cache_dir / kind / f"{content_hash}.json"
+
+    def get(self, kind: str, content_hash: str) -> Optional[Dict]:
+        path = self._path(kind, content_hash)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def peek(self, kind: str, content_hash: str) -> Optional[Dict]:
+        """적중/실패 통계에 넣지 않고 캐시된 결과를 읽습니다."""
+        try:
+            with self._path(kind, content_hash).open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, kind: str, content_hash: str, result: Dict):
+        path = self._path(kind, content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
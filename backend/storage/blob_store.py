@@ -0,0 +1,474 @@
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import io
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:  # S3 백엔드를 쓸 때만 필요
+    boto3 = None
+
+    class ClientError(Exception):
+        """botocore가 없을 때 S3 호환 클라이언트(테스트용 대역 등)가 던지는 오류"""
+
+        def __init__(self, error_response: Dict, operation_name: str):
+            super().__init__(f"{operation_name}: {error_response}")
+            self.response = error_response
+
+# local | s3
+BLOB_BACKEND = os.getenv("BLOB_BACKEND", "local")
+# 작업 디렉토리 (uploads/, parsed/ 등의 상위). local 백엔드는 여기에 그대로 저장하고, s3는 읽기 캐시로 씀
+BLOB_ROOT = Path(os.getenv("BLOB_ROOT", "."))
+# local 백엔드의 저장 위치 (기본은 BLOB_ROOT. 여러 노드가 공유하는 NFS 경로를 지정할 수 있음)
+BLOB_LOCAL_PATH = Path(os.getenv("BLOB_LOCAL_PATH", str(BLOB_ROOT)))
+# S3 호환 저장소 (MinIO 등은 S3_ENDPOINT_URL 지정, 인증 정보는 AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY)
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_REGION = os.getenv("S3_REGION") or None
+# 이 크기를 넘는 파일은 이 크기의 조각으로 나누어 멀티파트 업로드 (S3 최소 조각 크기는 5MB)
+BLOB_MULTIPART_BYTES = max(int(os.getenv("BLOB_MULTIPART_MB", 8)), 5) * 1024 * 1024
+# 원격 객체 정보를 다시 확인하지 않고 로컬 사본을 쓰는 시간(초)
+BLOB_CACHE_TTL = float(os.getenv("BLOB_CACHE_TTL", 5))
+# 원격에서 내려받은 로컬 사본의 최대 크기 (넘으면 오래 안 쓴 것부터 지움)
+BLOB_CACHE_MAX_BYTES = int(os.getenv("BLOB_CACHE_MAX_MB", 10240)) * 1024 * 1024
+# 부분 읽기(Range) 때 한 번에 가져오는 크기
+BLOB_RANGE_BUFFER = 256 * 1024
+
+class BlobInfo(NamedTuple):
+    key: str
+    size: int
+    modified: float
+
+class BlobStore:
+    """키(슬래시로 구분한 상대 경로)로 객체를 읽고 쓰는 저장소."""
+
+    def stat(self, key: str) -> Optional[BlobInfo]:
+        raise NotImplementedError
+
+    def put_file(self, key: str, path: Path) -> BlobInfo:
+        raise NotImplementedError
+
+    def get_file(self, key: str, path: Path) -> BlobInfo:
+        """객체를 path로 내려받습니다. 임시 파일에 받은 뒤 교체합니다."""
+        raise NotImplementedError
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        """[start, end] 바이트 구간을 읽습니다."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def copy(self, source: str, target: str):
+        raise NotImplementedError
+
+    def list(self, prefix: str) -> Iterator[BlobInfo]:
+        raise NotImplementedError
+
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+class LocalBlobStore(BlobStore):
+    """로컬(또는 NFS 등 공유) 디렉토리에 키 경로 그대로 저장합니다."""
+
+    def __init__(self, root: Path = BLOB_LOCAL_PATH):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def stat(self, key: str) -> Optional[BlobInfo]:
+        try:
+            stat = self._path(key).stat()
+        except FileNotFoundError:
+            return None
+        return BlobInfo(key, stat.st_size, stat.st_mtime)
+
+    def put_file(self, key: str, path: Path) -> BlobInfo:
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _tmp_path(target)
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+        return self.stat(key)
+
+    def get_file(self, key: str, path: Path) -> BlobInfo:
+        info = self.stat(key)
+        if info is None:
+            raise FileNotFoundError(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _tmp_path(path)
+        shutil.copyfile(self._path(key), tmp_path)
+        os.replace(tmp_path, path)
+        return info
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        with self._path(key).open("rb") as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def delete(self, key: str):
+        self._path(key).unlink(missing_ok=True)
+
+    def copy(self, source: str, target: str):
+        self._path(target).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self._path(source), self._path(target))
+
+    def list(self, prefix: str) -> Iterator[BlobInfo]:
+        directory = self._path(prefix)
+        if not directory.is_dir():
+            return
+        for path in sorted(directory.rglob("*")):
+            if path.is_file() and not path.name.endswith(".tmp"):
+                stat = path.stat()
+                yield BlobInfo(path.relative_to(self.root).as_posix(), stat.st_size, stat.st_mtime)
+
+class S3BlobStore(BlobStore):
+    """S3 호환 저장소(AWS S3, MinIO 등). 큰 파일은 멀티파트로 올리고 부분 읽기는 Range 요청을 씁니다."""
+
+    def __init__(
+        self,
+        bucket: str = S3_BUCKET,
+        prefix: str = S3_PREFIX,
+        endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+        region: Optional[str] = S3_REGION,
+        part_size: int = BLOB_MULTIPART_BYTES,
+        client=None
+    ):
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("S3 저장소를 쓰려면 boto3 패키지가 필요합니다.")
+            client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.part_size = part_size
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    @staticmethod
+    def _missing(error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def stat(self, key: str) -> Optional[BlobInfo]:
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if self._missing(e):
+                return None
+            raise
+        return BlobInfo(key, response["ContentLength"], response["LastModified"].timestamp())
+
+    def put_file(self, key: str, path: Path) -> BlobInfo:
+        size = Path(path).stat().st_size
+        with open(path, "rb") as f:
+            if size <= self.part_size:
+                self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=f)
+            else:
+                self._put_multipart(key, f)
+        return self.stat(key)
+
+    def _put_multipart(self, key: str, f):
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=self._key(key))["UploadId"]
+        parts = []
+        try:
+            for number, chunk in enumerate(iter(lambda: f.read(self.part_size), b""), start=1):
+                response = self.client.upload_part(
+                    Bucket=self.bucket, Key=self._key(key), UploadId=upload_id, PartNumber=number, Body=chunk
+                )
+                parts.append({"PartNumber": number, "ETag": response["ETag"]})
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=self._key(key), UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except Exception:
+            # 올리다 만 조각이 저장소에 남지 않도록 취소
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id)
+            raise
+
+    def get_file(self, key: str, path: Path) -> BlobInfo:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if self._missing(e):
+                raise FileNotFoundError(key)
+            raise
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _tmp_path(path)
+        try:
+            with tmp_path.open("wb") as f:
+                for chunk in response["Body"].iter_chunks(1024 * 1024):
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return BlobInfo(key, response["ContentLength"], response["LastModified"].timestamp())
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{end}")
+        except ClientError as e:
+            if self._missing(e):
+                raise FileNotFoundError(key)
+            raise
+        return response["Body"].read()
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def copy(self, source: str, target: str):
+        self.client.copy_object(
+            Bucket=self.bucket, Key=self._key(target), CopySource={"Bucket": self.bucket, "Key": self._key(source)}
+        )
+
+    def list(self, prefix: str) -> Iterator[BlobInfo]:
+        """한 번에 최대 1000개씩 페이지로 나누어 나열합니다."""
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            for item in page.get("Contents", []):
+                yield BlobInfo(item["Key"][len(self.prefix):], item["Size"], item["LastModified"].timestamp())
+
+class RangeReader(io.RawIOBase):
+    """원격 객체를 Range 요청으로 필요한 만큼만 읽는 파일 객체. io.BufferedReader로 감싸서 씁니다."""
+
+    def __init__(self, store: BlobStore, key: str, size: int):
+        self.store = store
+        self.key = key
+        self.size = size
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.size}[whence]
+        self.position = max(base + offset, 0)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        if self.position >= self.size or not len(buffer):
+            return 0
+        end = min(self.position + len(buffer), self.size) - 1
+        data = self.store.read_range(self.key, self.position, end)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+class BlobCache:
+    """작업 디렉토리(root)를 blob 저장소의 로컬 읽기 캐시로 씁니다.
+
+    쓰기는 로컬 파일에 한 뒤 push로 저장소에 올리고, 읽기 전에는 fetch/open이 저장소의 크기와 수정 시각을
+    로컬 사본과 비교하여 다르면 다시 내려받습니다. 내려받은 사본의 수정 시각을 저장소와 맞춰 두므로
+    같은 노드의 다른 작업자도 따로 확인 없이 최신 여부를 알 수 있습니다. 확인 결과는 ttl초 동안 재사용합니다.
+    local 백엔드가 root와 같은 디렉토리면 모든 동작이 로컬 파일에 바로 적용됩니다.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        root: Path = BLOB_ROOT,
+        ttl: float = BLOB_CACHE_TTL,
+        max_bytes: int = BLOB_CACHE_MAX_BYTES
+    ):
+        self.store = store
+        self.root = Path(root).resolve()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.passthrough = isinstance(store, LocalBlobStore) and store.root.resolve() == self.root
+        self.hits = 0
+        self.misses = 0
+        # 키 -> (확인 시각, 원격 정보 또는 None)
+        self._checked: Dict[str, Tuple[float, Optional[BlobInfo]]] = {}
+        # 내려받은 사본 (오래 안 쓴 순서), 키 -> 크기
+        self._downloaded: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, path: Path) -> str:
+        return Path(path).resolve().relative_to(self.root).as_posix()
+
+    def _remote(self, key: str) -> Optional[BlobInfo]:
+        with self._lock:
+            checked = self._checked.get(key)
+        if checked is not None and time.monotonic() - checked[0] < self.ttl:
+            return checked[1]
+        info = self.store.stat(key)
+        self._remember(key, info)
+        return info
+
+    def _remember(self, key: str, info: Optional[BlobInfo]):
+        with self._lock:
+            self._checked[key] = (time.monotonic(), info)
+
+    @staticmethod
+    def _matches(path: Path, info: BlobInfo) -> bool:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        return stat.st_size == info.size and abs(stat.st_mtime - info.modified) < 0.001
+
+    @staticmethod
+    def _align(path: Path, info: BlobInfo):
+        os.utime(path, (info.modified, info.modified))
+
+    def exists(self, path: Path) -> bool:
+        if self.passthrough:
+            return Path(path).exists()
+        return self._remote(self.key(path)) is not None
+
+    def fetch(self, path: Path) -> bool:
+        """로컬 사본을 저장소와 같게 맞춥니다. 저장소에 없으면 로컬 사본도 지우고 False를 반환합니다."""
+        path = Path(path)
+        if self.passthrough:
+            return path.exists()
+        key = self.key(path)
+        info = self._remote(key)
+        if info is None:
+            path.unlink(missing_ok=True)
+            return False
+        if self._matches(path, info):
+            with self._lock:
+                self.hits += 1
+            self._touch(key, info.size)
+            return True
+        with self._lock:
+            self.misses += 1
+        info = self.store.get_file(key, path)
+        self._align(path, info)
+        self._remember(key, info)
+        self._touch(key, info.size)
+        self._evict(keep=key)
+        return True
+
+    def open(self, path: Path, partial: bool = False):
+        """읽기용 바이너리 파일을 엽니다. partial이면 로컬 사본이 없을 때 내려받지 않고 필요한 구간만 읽습니다."""
+        path = Path(path)
+        if self.passthrough:
+            return path.open("rb")
+        key = self.key(path)
+        info = self._remote(key)
+        if info is None:
+            raise FileNotFoundError(str(path))
+        if partial and not self._matches(path, info):
+            return io.BufferedReader(RangeReader(self.store, key, info.size), BLOB_RANGE_BUFFER)
+        self.fetch(path)
+        return path.open("rb")
+
+    def push(self, path: Path):
+        """로컬 파일을 저장소에 올립니다."""
+        path = Path(path)
+        if self.passthrough:
+            return
+        key = self.key(path)
+        info = self.store.put_file(key, path)
+        self._align(path, info)
+        self._remember(key, info)
+
+    def remove(self, path: Path):
+        path = Path(path)
+        path.unlink(missing_ok=True)
+        if self.passthrough:
+            return
+        key = self.key(path)
+        self.store.delete(key)
+        self._remember(key, None)
+        with self._lock:
+            self._downloaded.pop(key, None)
+
+    def move(self, source: Path, target: Path):
+        source, target = Path(source), Path(target)
+        if self.passthrough:
+            if source.exists():
+                shutil.move(str(source), str(target))
+            return
+        source_key, target_key = self.key(source), self.key(target)
+        if self._remote(source_key) is None:
+            return
+        self.store.copy(source_key, target_key)
+        self.store.delete(source_key)
+        self._remember(source_key, None)
+        with self._lock:
+            self._checked.pop(target_key, None)
+        if source.exists():
+            shutil.move(str(source), str(target))
+        self.fetch(target)
+
+    def list(self, directory: Path) -> List[BlobInfo]:
+        """디렉토리 아래의 모든 객체를 한 번에 나열합니다. 키는 root 기준 상대 경로입니다."""
+        prefix = self.key(directory).rstrip("/") + "/"
+        infos = list(self.store.list(prefix))
+        if not self.passthrough:
+            now = time.monotonic()
+            with self._lock:
+                for info in infos:
+                    self._checked[info.key] = (now, info)
+        return infos
+
+    def pull(self, directory: Path) -> int:
+        """디렉토리 아래 객체를 모두 로컬로 맞추고 저장소에 없는 로컬 파일은 지웁니다. 받은 수를 반환합니다."""
+        if self.passthrough:
+            return 0
+        infos = self.list(directory)
+        keys = {info.key for info in infos}
+        for path in Path(directory).rglob("*"):
+            if path.is_file() and not path.name.startswith(".") and self.key(path) not in keys:
+                path.unlink()
+        fetched = 0
+        for info in infos:
+            path = self.root / info.key
+            if not self._matches(path, info):
+                self.fetch(path)
+                fetched += 1
+        return fetched
+
+    def _touch(self, key: str, size: int):
+        with self._lock:
+            self._downloaded[key] = size
+            self._downloaded.move_to_end(key)
+
+    def _evict(self, keep: str):
+        with self._lock:
+            total = sum(self._downloaded.values())
+            for key in list(self._downloaded):
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                total -= self._downloaded.pop(key)
+                # 저장소에 원본이 있으므로 로컬 사본만 지움 (열려 있는 파일은 닫힐 때까지 읽힘)
+                (self.root / key).unlink(missing_ok=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            cached = sum(self._downloaded.values())
+            entries = len(self._downloaded)
+            hits, misses = self.hits, self.misses
+        return {
+            "backend": type(self.store).__name__,
+            "passthrough": self.passthrough,
+            "entries": entries,
+            "cached_bytes": cached,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses
+        }
+
+def create_blob_store(backend: str = BLOB_BACKEND) -> BlobStore:
+    if backend == "s3":
+        return S3BlobStore()
+    if backend == "local":
+        return LocalBlobStore()
+    raise ValueError(f"지원하지 않는 blob 저장소입니다: {backend}")
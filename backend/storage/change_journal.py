@@ -0,0 +1,178 @@
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CHANGE_JOURNAL_PATH = Path(os.getenv("CHANGE_JOURNAL_PATH", "change_journal/journal.log"))
+# 이 크기를 넘으면 journal.log.1로 돌리고 새 파일에 이어 씀
+CHANGE_JOURNAL_MAX_BYTES = int(os.getenv("CHANGE_JOURNAL_MAX_BYTES", 16 * 1024 * 1024))
+# 요청이 없을 때도 다른 작업자의 변경을 반영하는 주기(초, 0이면 요청 때만 확인)
+CHANGE_JOURNAL_POLL_SECONDS = float(os.getenv("CHANGE_JOURNAL_POLL_SECONDS", 1.0))
+
+class ChangeJournal:
+    """문서 변경(파싱, 메타데이터 수정, 이름 변경, 삭제)을 덧붙여 쓰는 한 줄짜리 JSON 기록.
+
+    gunicorn 작업자마다 이 파일을 따라 읽으며(tail), 다른 작업자가 남긴 변경만 구독자에게 전달해
+    메모리에 둔 그래프와 캐시를 무효화하거나 갱신합니다. 자기 변경은 이미 반영했으므로 건너뜁니다.
+    """
+
+    def __init__(self, path: Path = CHANGE_JOURNAL_PATH, max_bytes: int = CHANGE_JOURNAL_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock_path = self.path.with_name(f"{self.path.name}.lock")
+        self.max_bytes = max_bytes
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.applied = 0
+        self._handlers: List[Callable[[Dict], None]] = []
+        # _lock은 읽는 위치만, _dispatch_lock은 기록 순서대로 구독자에게 전달하는 동안을 보호
+        self._lock = threading.Lock()
+        self._dispatch_lock = threading.Lock()
+        self._offset = 0
+        self._partial = b""
+        self._reader = None
+        self._inode: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self.path.touch(exist_ok=True)
+        # 시작할 때의 상태는 디스크에서 읽으므로 기존 기록은 건너뛰고 끝에서부터 따라 읽음
+        self._open_reader(seek_end=True)
+
+    def _open_reader(self, seek_end: bool):
+        self._reader = open(self.path, "rb")
+        self._inode = os.fstat(self._reader.fileno()).st_ino
+        self._partial = b""
+        if seek_end:
+            self._reader.seek(0, os.SEEK_END)
+        self._offset = self._reader.tell()
+
+    def is_local(self, event: Dict) -> bool:
+        """같은 호스트의 작업자가 남긴 변경인지 확인합니다 (호스트 안에서 파일로 공유하는 색인은 다시 만들 필요가 없음)."""
+        return event.get("origin", "").split(":", 1)[0] == socket.gethostname()
+
+    def subscribe(self, handler: Callable[[Dict], None]):
+        self._handlers.append(handler)
+
+    def append(self, op: str, *filenames: str):
+        """변경 하나를 기록합니다. 한 줄을 O_APPEND로 한 번에 써서 여러 작업자가 동시에 써도 섞이지 않습니다."""
+        event = {
+            "time": time.time(),
+            "origin": self.origin,
+            "op": op,
+            "files": list(filenames)
+        }
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            with self._exclusive():
+                if self.path.exists() and self.path.stat().st_size + len(line) > self.max_bytes:
+                    os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+        except OSError as e:
+            logging.error(f"변경 기록 저장 실패: {op} {filenames}: {str(e)}")
+
+    @contextmanager
+    def _exclusive(self):
+        """파일 돌리기와 쓰기가 작업자 사이에서 겹치지 않도록 잠금 파일을 잡습니다."""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def pending(self) -> bool:
+        """읽지 않은 변경이 있는지 파일 크기만 보고 확인합니다. 잠금을 잡지 않으므로 이벤트 루프에서 불러도 됩니다."""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return current.st_ino != self._inode or current.st_size > self._offset
+
+    def _read_new(self) -> List[Dict]:
+        with self._lock:
+            try:
+                current = os.stat(self.path)
+            except FileNotFoundError:
+                return []
+            if current.st_ino == self._inode and current.st_size <= self._offset:
+                return []
+
+            events = self._read_lines()
+            if current.st_ino != self._inode:
+                # 다른 작업자가 파일을 돌림: 이전 파일의 남은 줄까지 읽고 새 파일 처음부터 읽음
+                self._reader.close()
+                self._open_reader(seek_end=False)
+                events += self._read_lines()
+            self._offset = self._reader.tell()
+            return events
+
+    def poll(self, wait: bool = True) -> int:
+        """새로 기록된 변경을 읽어 다른 작업자의 것만 구독자에게 전달하고, 전달한 수를 반환합니다.
+
+        wait=False이면 다른 스레드가 이미 전달하는 중일 때 기다리지 않고 0을 반환합니다.
+        """
+        # 백그라운드 스레드와 요청이 동시에 확인해도 기록 순서대로 반영되도록 읽기와 전달을 한 곳에서만 함.
+        # 구독자(그래프 갱신, 색인 등)는 읽는 위치 잠금(_lock) 밖에서 불러 pending()과 읽기를 막지 않음
+        if not self._dispatch_lock.acquire(blocking=wait):
+            return 0
+        try:
+            applied = 0
+            for event in self._read_new():
+                if event.get("origin") == self.origin:
+                    continue
+                for handler in self._handlers:
+                    try:
+                        handler(event)
+                    except Exception as e:
+                        logging.error(f"변경 기록 반영 실패: {event}: {str(e)}")
+                applied += 1
+            self.applied += applied
+            return applied
+        finally:
+            self._dispatch_lock.release()
+
+    def _read_lines(self) -> List[Dict]:
+        data = self._partial + self._reader.read()
+        lines = data.split(b"\n")
+        # 아직 줄바꿈까지 쓰이지 않은 마지막 줄은 다음에 다시 읽음
+        self._partial = lines.pop()
+        events = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                logging.error(f"잘못된 변경 기록을 건너뜁니다: {line[:200]!r}")
+        return events
+
+    def start(self, interval: float = CHANGE_JOURNAL_POLL_SECONDS):
+        """interval초마다 변경 기록을 확인하는 백그라운드 스레드를 시작합니다."""
+        if interval <= 0 or self._thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.poll()
+                except Exception as e:
+                    logging.error(f"변경 기록 확인 실패: {str(e)}")
+
+        self._thread = threading.Thread(target=run, name="change-journal", daemon=True)
+        self._thread.start()
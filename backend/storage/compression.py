@@ -0,0 +1,289 @@
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+import gzip
+import io
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # zstandard가 없으면 gzip으로 압축
+    zstandard = None
+
+# zstd | gzip | none (none이어도 압축된 기존 파일은 읽을 수 있음)
+COMPRESSION_CODEC = os.getenv("COMPRESSION_CODEC", "zstd")
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 3))
+# 학습한 zstd 사전을 보관하는 디렉토리 ({종류}-{사전 ID}.dict)
+COMPRESSION_DICT_DIR = Path(os.getenv("COMPRESSION_DICT_DIR", "compression_dicts"))
+COMPRESSION_DICT_SIZE = int(os.getenv("COMPRESSION_DICT_SIZE", 112640))
+# 사전 학습에 쓸 최소 표본 수 (이보다 적으면 학습하지 않음)
+DICT_MIN_SAMPLES = 8
+CHUNK_SIZE = 64 * 1024
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+class Compressor:
+    """저장 파일을 zstd(없으면 gzip)로 압축하고 읽을 때 매직 바이트로 형식을 알아내 투명하게 풉니다.
+
+    파일 이름은 그대로 두므로 압축하기 전에 쓴 파일도 같은 경로로 읽힙니다. zstd는 종류(kind)별로
+    학습한 사전을 쓸 수 있으며, 프레임 헤더의 사전 ID로 어떤 사전으로 압축했는지 찾습니다.
+    """
+
+    def __init__(self, codec: str = COMPRESSION_CODEC, level: int = COMPRESSION_LEVEL, dict_dir: Path = COMPRESSION_DICT_DIR):
+        if codec == "zstd" and zstandard is None:
+            logging.info("zstandard 패키지가 없어 gzip으로 압축합니다.")
+            codec = "gzip"
+        self.codec = codec
+        self.level = level
+        self.dict_dir = Path(dict_dir)
+        self._dicts: Dict[int, Any] = {}
+        self._active: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # (경로, mtime, 크기) -> 압축을 푼 크기 (내용 크기가 헤더에 없는 스트림 압축 파일용)
+        self._sizes: "OrderedDict[Tuple[str, int, int], int]" = OrderedDict()
+        self._load_dicts()
+
+    def _load_dicts(self):
+        """사전 디렉토리를 읽어 종류별로 가장 최근에 학습한 사전을 새 압축에 씁니다."""
+        if zstandard is None or not self.dict_dir.exists():
+            return
+        with self._lock:
+            for path in sorted(self.dict_dir.glob("*.dict"), key=lambda path: path.stat().st_mtime_ns):
+                try:
+                    dictionary = zstandard.ZstdCompressionDict(path.read_bytes())
+                except Exception as e:
+                    logging.error(f"압축 사전 읽기 실패: {path}: {str(e)}")
+                    continue
+                self._dicts[dictionary.dict_id()] = dictionary
+                self._active[path.stem.rsplit("-", 1)[0]] = dictionary
+
+    def _dictionary(self, dict_id: int):
+        if not dict_id:
+            return None
+        if dict_id not in self._dicts:
+            # 다른 작업자가 새로 학습한 사전일 수 있으므로 다시 읽음
+            self._load_dicts()
+        if dict_id not in self._dicts:
+            raise ValueError(f"압축 사전을 찾을 수 없습니다: {dict_id}")
+        return self._dicts[dict_id]
+
+    def _compressor(self, kind: Optional[str]):
+        dictionary = self._active.get(kind) if kind else None
+        if dictionary is not None:
+            return zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+        return zstandard.ZstdCompressor(level=self.level)
+
+    def _decompressor(self, header: bytes):
+        return zstandard.ZstdDecompressor(dict_data=self._dictionary(zstandard.get_frame_parameters(header).dict_id))
+
+    @staticmethod
+    def codec_of(data: bytes) -> str:
+        if data.startswith(ZSTD_MAGIC):
+            return "zstd"
+        if data.startswith(GZIP_MAGIC):
+            return "gzip"
+        return "none"
+
+    def compress(self, data: bytes, kind: Optional[str] = None) -> bytes:
+        if self.codec == "zstd":
+            return self._compressor(kind).compress(data)
+        if self.codec == "gzip":
+            return gzip.compress(data, compresslevel=min(max(self.level, 1), 9), mtime=0)
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        """압축된 데이터면 풀고, 압축되지 않은 데이터는 그대로 반환합니다."""
+        codec = self.codec_of(data)
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstd로 압축된 파일을 읽으려면 zstandard 패키지가 필요합니다.")
+            with self._decompressor(data[:18]).stream_reader(io.BytesIO(data), read_across_frames=True) as reader:
+                return reader.read()
+        if codec == "gzip":
+            return gzip.decompress(data)
+        return data
+
+    @contextmanager
+    def open_reader(self, path: Path) -> Iterator[BinaryIO]:
+        """압축을 풀면서 읽는 바이너리 스트림을 엽니다. 파일 전체를 메모리에 올리지 않습니다."""
+        f = open(path, "rb")
+        try:
+            header = f.read(18)
+            f.seek(0)
+            codec = self.codec_of(header)
+            if codec == "zstd":
+                if zstandard is None:
+                    raise RuntimeError("zstd로 압축된 파일을 읽으려면 zstandard 패키지가 필요합니다.")
+                with self._decompressor(header).stream_reader(f, read_across_frames=True, closefd=False) as reader:
+                    yield reader
+            elif codec == "gzip":
+                with gzip.GzipFile(fileobj=f, mode="rb") as reader:
+                    yield reader
+            else:
+                yield f
+        finally:
+            f.close()
+
+    @contextmanager
+    def open_writer(self, path: Path, kind: Optional[str] = None) -> Iterator[BinaryIO]:
+        """압축하면서 쓰는 바이너리 스트림을 엽니다. 임시 파일에 쓴 뒤 블록이 끝나면 path로 교체합니다."""
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                if self.codec == "zstd":
+                    with self._compressor(kind).stream_writer(f, closefd=False) as writer:
+                        yield writer
+                elif self.codec == "gzip":
+                    with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=min(max(self.level, 1), 9), mtime=0) as writer:
+                        yield writer
+                else:
+                    yield f
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    @contextmanager
+    def open_text_writer(self, path: Path, kind: Optional[str] = None, newline: Optional[str] = None) -> Iterator[io.TextIOWrapper]:
+        with self.open_writer(path, kind) as binary:
+            text = io.TextIOWrapper(binary, encoding="utf-8", newline=newline, write_through=True)
+            try:
+                yield text
+                text.flush()
+            finally:
+                # 감싼 스트림이 먼저 닫히지 않도록 분리
+                text.detach()
+
+    def read_bytes(self, path: Path) -> bytes:
+        return self.decompress(Path(path).read_bytes())
+
+    def read_text(self, path: Path) -> str:
+        return self.read_bytes(path).decode("utf-8")
+
+    def read_json(self, path: Path) -> Any:
+        return json.loads(self.read_bytes(path))
+
+    def write_bytes(self, path: Path, data: bytes, kind: Optional[str] = None):
+        """압축하여 원자적으로 저장합니다."""
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            tmp_path.write_bytes(self.compress(data, kind))
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def write_text(self, path: Path, text: str, kind: Optional[str] = None):
+        self.write_bytes(path, text.encode("utf-8"), kind)
+
+    def write_json(self, path: Path, value: Any, kind: Optional[str] = None):
+        # 압축하므로 들여쓰기 없이 저장
+        self.write_bytes(path, json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), kind)
+
+    def append_bytes(self, path: Path, data: bytes):
+        """data를 독립된 압축 프레임(gzip은 멤버)으로 만들어 파일 끝에 덧붙입니다.
+
+        O_APPEND로 한 번에 쓰므로 여러 작업자가 같은 파일에 동시에 덧붙여도 섞이지 않고, 기존 내용을 다시 읽지 않습니다.
+        zstd 프레임과 gzip 멤버는 이어 붙여도 한 번에 풀리므로 read_bytes로 전체를 읽을 수 있습니다.
+        사전은 쓰지 않습니다 (파일 중간에 사전이 바뀌면 앞 프레임의 사전으로 뒤 프레임을 풀 수 없으므로).
+        """
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, self.compress(data))
+        finally:
+            os.close(fd)
+
+    def iter_chunks(self, path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """압축을 푼 내용의 [start, end] 구간을 청크 단위로 읽습니다."""
+        with self.open_reader(path) as reader:
+            position = 0
+            while end is None or position <= end:
+                chunk = reader.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunk_start, position = position, position + len(chunk)
+                if position <= start:
+                    continue
+                yield chunk[max(start - chunk_start, 0):(end - chunk_start + 1) if end is not None else None]
+
+    def is_compressed(self, path: Path) -> bool:
+        with open(path, "rb") as f:
+            return self.codec_of(f.read(4)) != "none"
+
+    def content_codec(self, path: Path) -> Optional[str]:
+        """브라우저가 그대로 풀 수 있는 형식(gzip, 사전 없는 zstd)이면 Content-Encoding 값을 반환합니다."""
+        with open(path, "rb") as f:
+            header = f.read(18)
+        codec = self.codec_of(header)
+        if codec == "gzip":
+            return "gzip"
+        if codec == "zstd" and zstandard is not None and not zstandard.get_frame_parameters(header).dict_id:
+            return "zstd"
+        return None
+
+    def raw_size(self, path: Path) -> int:
+        """압축을 푼 내용의 크기. 헤더에 없으면 한 번 풀어서 세고 기억해 둡니다."""
+        path = Path(path)
+        stat = path.stat()
+        with open(path, "rb") as f:
+            header = f.read(18)
+        codec = self.codec_of(header)
+        if codec == "none":
+            return stat.st_size
+        if codec == "zstd" and zstandard is not None:
+            size = zstandard.get_frame_parameters(header).content_size
+            if size > 0 and size != zstandard.CONTENTSIZE_UNKNOWN:
+                return size
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+                return self._sizes[key]
+        size = sum(len(chunk) for chunk in self.iter_chunks(path))
+        with self._lock:
+            self._sizes[key] = size
+            while len(self._sizes) > 1024:
+                self._sizes.popitem(last=False)
+        return size
+
+    def train(self, kind: str, samples: Iterable[bytes], size: int = COMPRESSION_DICT_SIZE) -> Optional[Dict]:
+        """표본으로 zstd 사전을 학습하여 저장하고, 이후 kind의 압축에 씁니다. 이미 쓴 파일은 그대로 읽힙니다."""
+        if zstandard is None:
+            return None
+        samples = [sample for sample in samples if sample]
+        if len(samples) < DICT_MIN_SAMPLES:
+            return None
+        dictionary = zstandard.train_dictionary(size, samples, level=self.level)
+        self.dict_dir.mkdir(parents=True, exist_ok=True)
+        path = self.dict_dir / f"{kind}-{dictionary.dict_id()}.dict"
+        path.write_bytes(dictionary.as_bytes())
+        with self._lock:
+            self._dicts[dictionary.dict_id()] = dictionary
+            self._active[kind] = dictionary
+        sample_bytes = sum(len(sample) for sample in samples)
+        compressed = sum(len(self._compressor(kind).compress(sample)) for sample in samples)
+        return {
+            "kind": kind,
+            "dict_id": dictionary.dict_id(),
+            "dict_bytes": len(dictionary.as_bytes()),
+            "samples": len(samples),
+            "sample_bytes": sample_bytes,
+            "ratio": round(sample_bytes / compressed, 3) if compressed else None
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "codec": self.codec,
+            "level": self.level,
+            "dictionaries": {kind: dictionary.dict_id() for kind, dictionary in self._active.items()}
+        }
+
+COMPRESSOR = Compressor()
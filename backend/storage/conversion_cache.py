@@ -0,0 +1,174 @@
+from typing import Dict, Iterator, Optional
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# 캐시 적중 때마다 쓰지 않도록, 마지막 사용 시각은 이 시간(초)보다 오래됐을 때만 갱신
+ACCESS_RESOLUTION = 60
+
+class ConversionCache:
+    """CONVERTED_DIR에 저장된 변환 결과의 신선도와 용량을 관리합니다.
+
+    항목 색인은 CONVERTED_DIR/.cache_index.sqlite3에 두어 여러 작업자 프로세스가 같은 색인을 읽고 쓰며,
+    저장과 삭제는 쓰기 잠금(BEGIN IMMEDIATE) 안에서 하므로 모든 작업자의 결과가 max_bytes에 함께 잡힙니다.
+    """
+
+    INDEX_NAME = ".cache_index.sqlite3"
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.index_path = self.cache_dir / self.INDEX_NAME
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                document TEXT NOT NULL,
+                source_mtime_ns INTEGER NOT NULL,
+                source_size INTEGER NOT NULL,
+                source_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                output_hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_document ON entries (document);
+            CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+        """)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _key(output_path: Path) -> str:
+        return f"{output_path.parent.name}/{output_path.name}"
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        """파일의 SHA-256 해시를 계산합니다."""
+        digest = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, source_path: Path, output_path: Path) -> Optional[Path]:
+        """원본이 바뀌지 않았다면 캐시된 변환 결과 경로를 반환합니다."""
+        key = self._key(output_path)
+        with self._lock:
+            entry = self._conn.execute("SELECT * FROM entries WHERE key = ?", (key,)).fetchone()
+        if entry is None or not output_path.exists():
+            self._count(False)
+            return None
+
+        source_stat = source_path.stat()
+        fresh = (
+            entry["source_mtime_ns"] == source_stat.st_mtime_ns and
+            entry["source_size"] == source_stat.st_size
+        )
+        if not fresh and entry["source_size"] == source_stat.st_size:
+            # mtime만 바뀐 경우 내용 해시로 다시 확인
+            fresh = entry["source_hash"] == self._file_hash(source_path)
+            if fresh:
+                with self._transaction() as conn:
+                    conn.execute(
+                        "UPDATE entries SET source_mtime_ns = ? WHERE key = ?", (source_stat.st_mtime_ns, key)
+                    )
+
+        if not fresh:
+            self._count(False)
+            return None
+
+        now = time.time()
+        if now - entry["last_access"] > ACCESS_RESOLUTION:
+            with self._transaction() as conn:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        self._count(True)
+        return output_path
+
+    def store(self, source_path: Path, output_path: Path, filename: str):
+        """filename 문서의 새 변환 결과를 등록하고 용량을 넘으면 오래된 항목을 제거합니다."""
+        source_stat = source_path.stat()
+        source_hash = self._file_hash(source_path)
+        size = output_path.stat().st_size
+        output_hash = self._file_hash(output_path)
+        key = self._key(output_path)
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, filename, source_stat.st_mtime_ns, source_stat.st_size, source_hash, size, time.time(), output_hash)
+            )
+            self._evict(conn, keep=key)
+
+    def content_hash(self, output_path: Path) -> Optional[str]:
+        """저장할 때 계산한 변환 결과 파일의 SHA-256. 강한 ETag로 씁니다. 기록이 없거나 파일이 바뀌었으면 None."""
+        with self._lock:
+            entry = self._conn.execute(
+                "SELECT size, output_hash FROM entries WHERE key = ?", (self._key(output_path),)
+            ).fetchone()
+        try:
+            if entry is None or entry["size"] != output_path.stat().st_size:
+                return None
+        except FileNotFoundError:
+            return None
+        return entry["output_hash"]
+
+    def _evict(self, conn: sqlite3.Connection, keep: str):
+        """최근에 사용되지 않은 항목부터 max_bytes 이하가 될 때까지 삭제합니다. 방금 저장한 항목은 남깁니다."""
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for entry in conn.execute("SELECT key, size FROM entries WHERE key != ? ORDER BY last_access", (keep,)):
+            if total <= self.max_bytes:
+                break
+            evicted.append(entry["key"])
+            total -= entry["size"]
+        conn.executemany("DELETE FROM entries WHERE key = ?", ((key,) for key in evicted))
+        for key in evicted:
+            (self.cache_dir / key).unlink(missing_ok=True)
+
+    def invalidate(self, filename: str):
+        """문서의 모든 형식 변환 결과를 삭제합니다."""
+        with self._transaction() as conn:
+            keys = [row["key"] for row in conn.execute("SELECT key FROM entries WHERE document = ?", (filename,))]
+            conn.executemany("DELETE FROM entries WHERE key = ?", ((key,) for key in keys))
+            for key in keys:
+                (self.cache_dir / key).unlink(missing_ok=True)
+
+    def stats(self) -> Dict:
+        """캐시 사용 통계를 반환합니다."""
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            hits, misses = self.hits, self.misses
+        return {
+            "entries": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses
+        }
@@ -0,0 +1,418 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+import hashlib
+import json
+import os
+import shutil
+import struct
+import threading
+from pathlib import Path
+from parsers.content_model import build_pages
+from storage.blob_store import BlobCache
+from storage.compression import COMPRESSOR, Compressor
+
+MAGIC = b"PDOC\x01"
+HEADER_LENGTH = struct.Struct("<I")
+BLOCK_TYPES = {"heading": "h", "paragraph": "p"}
+BLOCK_TYPE_NAMES = {code: name for name, code in BLOCK_TYPES.items()}
+# 부분 읽기(필드 선택)에서 요청할 수 있는 필드
+DOCUMENT_FIELDS = ("metadata", "tags", "content", "tables", "equations")
+
+def _page_json(page: Dict) -> bytes:
+    """페이지를 열 단위(columnar) JSON으로 직렬화합니다. 오프셋은 페이지 시작 기준입니다."""
+    blocks = page["blocks"]
+    chunk = {
+        "text": page["text"],
+        "hash": page.get("hash"),
+        "blocks": {
+            "type": [BLOCK_TYPES[block["type"]] for block in blocks],
+            "start": [block["start"] - page["start"] for block in blocks],
+            "end": [block["end"] - page["start"] for block in blocks],
+            "level": [block.get("level", 0) for block in blocks]
+        },
+        "tables": page["tables"],
+        "equations": page["equations"]
+    }
+    return json.dumps(chunk, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _decode_page(data: bytes, entry: Dict, compressor: Compressor) -> Dict:
+    """압축된 페이지를 블록 목록 형태로 복원합니다."""
+    chunk = json.loads(compressor.decompress(data))
+    columns = chunk["blocks"]
+    blocks = []
+    for block_type, start, end, level in zip(columns["type"], columns["start"], columns["end"], columns["level"]):
+        block = {
+            "type": BLOCK_TYPE_NAMES[block_type],
+            "start": entry["start"] + start,
+            "end": entry["start"] + end
+        }
+        if level:
+            block["level"] = level
+        blocks.append(block)
+    return {
+        "page": entry["page"],
+        "hash": chunk.get("hash"),
+        "start": entry["start"],
+        "end": entry["end"],
+        "text": chunk["text"],
+        "blocks": blocks,
+        "tables": chunk["tables"],
+        "equations": chunk["equations"]
+    }
+
+def _content_hash(structured: List[Dict]) -> str:
+    """본문 텍스트의 SHA-256 해시. 메타데이터가 바뀌어도 유지되어 분석 결과 캐시의 키로 쓰입니다."""
+    digest = hashlib.sha256()
+    for page in structured:
+        digest.update(page["text"].encode("utf-8"))
+    return digest.hexdigest()
+
+class DocumentStore:
+    """파싱된 문서를 작은 JSON 헤더와 페이지별 압축 블록으로 저장합니다.
+
+    파일 구조: MAGIC | 헤더 길이(uint32) | 헤더 JSON | 페이지 청크...
+    헤더에는 메타데이터, 태그, 페이지별 (오프셋, 길이, 문자 범위) 색인이 들어 있어
+    필요한 페이지만 읽을 수 있습니다. 페이지 청크는 compressor(zstd, "pages" 사전)로 압축하며
+    이전 형식의 {filename}.json도 읽을 수 있습니다.
+    blobs를 주면 .pdoc 파일을 blob 저장소에 올리고, 로컬 사본이 없거나 오래되었으면 헤더와 필요한 페이지만
+    Range 요청으로 읽거나 전체를 내려받습니다.
+    """
+
+    SUFFIX = ".pdoc"
+
+    def __init__(self, root: Path, compressor: Compressor = COMPRESSOR, blobs: Optional[BlobCache] = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compressor = compressor
+        self.blobs = blobs
+        self._lock = threading.Lock()
+
+    def _store_path(self, filename: str) -> Path:
+        return self.root / f"{filename}{self.SUFFIX}"
+
+    def _legacy_path(self, filename: str) -> Path:
+        return self.root / f"{filename}.json"
+
+    def _stored(self, filename: str) -> bool:
+        store_path = self._store_path(filename)
+        return self.blobs.exists(store_path) if self.blobs is not None else store_path.exists()
+
+    def _open(self, filename: str, partial: bool = False):
+        """저장된 문서를 엽니다. partial이면 blob 저장소에서 전체를 내려받지 않고 읽는 구간만 가져옵니다."""
+        store_path = self._store_path(filename)
+        if self.blobs is not None:
+            return self.blobs.open(store_path, partial)
+        return store_path.open("rb")
+
+    def path(self, filename: str) -> Path:
+        """문서가 저장된 파일 경로를 반환합니다. 변환 캐시의 신선도 기준으로 사용됩니다."""
+        store_path = self._store_path(filename)
+        if not self._stored(filename) and self._legacy_path(filename).exists():
+            return self._legacy_path(filename)
+        if self.blobs is not None:
+            self.blobs.fetch(store_path)
+        return store_path
+
+    def exists(self, filename: str) -> bool:
+        return self._stored(filename) or self._legacy_path(filename).exists()
+
+    def list_documents(self) -> List[str]:
+        """저장된 모든 문서 이름을 정렬하여 반환합니다."""
+        if self.blobs is not None:
+            names = {
+                Path(info.key).name[:-len(self.SUFFIX)]
+                for info in self.blobs.list(self.root) if info.key.endswith(self.SUFFIX)
+            }
+        else:
+            names = {path.name[:-len(self.SUFFIX)] for path in self.root.glob(f"*{self.SUFFIX}")}
+        names.update(path.stem for path in self.root.glob("*.json"))
+        return sorted(names)
+
+    def save(
+        self,
+        filename: str,
+        metadata: Dict,
+        pages: List[Dict],
+        tables: Optional[List[Dict]] = None,
+        equations: Optional[List[Dict]] = None,
+        tags: Optional[List[str]] = None
+    ):
+        """페이지 텍스트와 표, 수식으로 구조화된 문서를 만들어 저장합니다."""
+        structured = build_pages(pages, tables or [], equations or [])
+        self._write(filename, metadata, tags or [], structured)
+
+    def save_document(self, filename: str, document: Dict):
+        """{'content', 'metadata', 'tags', ...} 형식의 문서를 저장합니다. content가 문자열이면 한 페이지로 봅니다."""
+        pages = document.get("pages") or [{"page": 1, "text": document.get("content", "")}]
+        self.save(
+            filename,
+            document.get("metadata", {}),
+            pages,
+            document.get("tables"),
+            document.get("equations"),
+            document.get("tags")
+        )
+
+    def _write(self, filename: str, metadata: Dict, tags: List[str], structured: List[Dict]):
+        chunks = []
+        entries = []
+        offset = 0
+        for page in structured:
+            chunk = self.compressor.compress(_page_json(page), "pages")
+            entries.append({
+                "page": page["page"],
+                "hash": page.get("hash"),
+                "start": page["start"],
+                "end": page["end"],
+                "offset": offset,
+                "length": len(chunk),
+                "blocks": len(page["blocks"]),
+                "tables": len(page["tables"]),
+                "equations": len(page["equations"])
+            })
+            chunks.append(chunk)
+            offset += len(chunk)
+
+        header = {
+            "version": 1,
+            "codec": self.compressor.codec,
+            "metadata": metadata,
+            "tags": tags,
+            "text_length": structured[-1]["end"] if structured else 0,
+            "content_hash": _content_hash(structured),
+            "pages": entries
+        }
+        self._write_file(filename, header, chunks)
+
+    def _write_file(self, filename: str, header: Dict, chunks: Iterable[bytes]):
+        """헤더와 본문 청크를 임시 파일에 쓴 뒤 원자적으로 교체합니다."""
+        header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        store_path = self._store_path(filename)
+        tmp_path = store_path.with_name(f".{store_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open("wb") as f:
+            f.write(MAGIC)
+            f.write(HEADER_LENGTH.pack(len(header_bytes)))
+            f.write(header_bytes)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, store_path)
+        if self.blobs is not None:
+            self.blobs.push(store_path)
+        self._legacy_path(filename).unlink(missing_ok=True)
+
+    def _read_header(self, f) -> Dict:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("지원하지 않는 문서 저장 형식입니다.")
+        (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+        header = json.loads(f.read(length))
+        header["body_offset"] = len(MAGIC) + HEADER_LENGTH.size + length
+        return header
+
+    def _load_legacy(self, filename: str) -> Dict:
+        """이전 형식의 JSON 문서를 헤더와 페이지 구조로 변환합니다."""
+        data = self.compressor.read_json(self._legacy_path(filename))
+        pages = data.get("pages") or [{"page": 1, "text": data.get("content", "")}]
+        structured = build_pages(pages, data.get("tables") or [], data.get("equations") or [])
+        return {
+            "metadata": data.get("metadata", {}),
+            "tags": data.get("tags", []),
+            "text_length": structured[-1]["end"] if structured else 0,
+            "content_hash": _content_hash(structured),
+            "pages": [dict(page, offset=None, length=None) for page in structured],
+            "legacy_pages": structured
+        }
+
+    def read_header(self, filename: str) -> Dict:
+        """메타데이터, 태그, 페이지 색인만 읽습니다. 본문은 읽지 않습니다."""
+        if not self._stored(filename):
+            if self._legacy_path(filename).exists():
+                header = self._load_legacy(filename)
+                header.pop("legacy_pages")
+                return header
+            raise FileNotFoundError(filename)
+        with self._open(filename, partial=True) as f:
+            return self._read_header(f)
+
+    def content_hash(self, filename: str) -> str:
+        """본문 해시를 헤더에서 읽습니다. 해시가 없는 이전 파일은 본문을 읽어 계산합니다."""
+        content_hash = self.read_header(filename).get("content_hash")
+        if content_hash is None:
+            content_hash = _content_hash(list(self.iter_pages(filename)))
+        return content_hash
+
+    def iter_pages(self, filename: str, pages: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """요청한 페이지(없으면 전체)만 찾아 읽어 하나씩 반환합니다."""
+        wanted = set(pages) if pages is not None else None
+        if not self._stored(filename):
+            if not self._legacy_path(filename).exists():
+                raise FileNotFoundError(filename)
+            for page in self._load_legacy(filename)["legacy_pages"]:
+                if wanted is None or page["page"] in wanted:
+                    yield page
+            return
+
+        with self._open(filename, partial=wanted is not None) as f:
+            header = self._read_header(f)
+            for entry in header["pages"]:
+                if wanted is not None and entry["page"] not in wanted:
+                    continue
+                f.seek(header["body_offset"] + entry["offset"])
+                yield _decode_page(f.read(entry["length"]), entry, self.compressor)
+
+    def iter_page_chunks(self, filename: str) -> Iterator[bytes]:
+        """압축을 푼 페이지 청크(열 단위 JSON)를 반환합니다. 압축 사전 학습 표본으로 쓰입니다."""
+        if not self._stored(filename):
+            return
+        with self._open(filename) as f:
+            header = self._read_header(f)
+            for entry in header["pages"]:
+                f.seek(header["body_offset"] + entry["offset"])
+                yield self.compressor.decompress(f.read(entry["length"]))
+
+    def recompress(self, filename: str):
+        """페이지 청크를 현재 압축 형식과 사전으로 다시 압축합니다. 내용은 바뀌지 않습니다."""
+        with self._lock:
+            if not self._stored(filename):
+                return
+            with self._open(filename) as f:
+                header = self._read_header(f)
+                body_offset = header.pop("body_offset")
+                chunks = []
+                offset = 0
+                for entry in header["pages"]:
+                    f.seek(body_offset + entry["offset"])
+                    chunk = self.compressor.compress(self.compressor.decompress(f.read(entry["length"])), "pages")
+                    entry["offset"], entry["length"] = offset, len(chunk)
+                    offset += len(chunk)
+                    chunks.append(chunk)
+            header["codec"] = self.compressor.codec
+            self._write_file(filename, header, chunks)
+
+    def load(self, filename: str) -> Dict:
+        """문서 전체를 {'content', 'metadata', 'tags', 'tables', 'equations'} 형식으로 읽습니다."""
+        header = self.read_header(filename)
+        texts, tables, equations = [], [], []
+        for page in self.iter_pages(filename):
+            texts.append(page["text"])
+            tables.extend(page["tables"])
+            equations.extend(page["equations"])
+        return {
+            "content": "".join(texts),
+            "metadata": header["metadata"],
+            "tags": header.get("tags", []),
+            "tables": tables,
+            "equations": equations
+        }
+
+    def read(
+        self,
+        filename: str,
+        fields: Optional[Iterable[str]] = None,
+        start_page: Optional[int] = None,
+        end_page: Optional[int] = None,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Dict:
+        """요청한 필드와 범위만 읽습니다.
+
+        페이지 범위와 문자 구간(offset, limit)은 헤더의 페이지 색인으로 겹치는 페이지를 고른 뒤
+        해당 청크만 읽으며, metadata/tags만 요청하면 본문은 전혀 읽지 않습니다.
+        """
+        fields = set(fields) if fields is not None else set(DOCUMENT_FIELDS)
+        header = self.read_header(filename)
+        text_length = header.get("text_length", 0)
+        window_start = min(max(offset or 0, 0), text_length)
+        window_end = text_length if limit is None else min(window_start + max(limit, 0), text_length)
+
+        windowed = offset is not None or limit is not None
+
+        selected = [
+            entry for entry in header["pages"]
+            if (start_page is None or entry["page"] >= start_page)
+            and (end_page is None or entry["page"] <= end_page)
+        ]
+        if windowed:
+            selected = [
+                entry for entry in selected
+                if entry["start"] < window_end and entry["end"] > window_start
+            ]
+
+        result = {}
+        if "metadata" in fields:
+            result["metadata"] = header["metadata"]
+        if "tags" in fields:
+            result["tags"] = header.get("tags", [])
+
+        if fields & {"content", "tables", "equations"} and selected:
+            texts, tables, equations = [], [], []
+            for page in self.iter_pages(filename, [entry["page"] for entry in selected]):
+                texts.append(page["text"])
+                tables.extend(page["tables"])
+                equations.extend(page["equations"])
+            content_start = selected[0]["start"]
+            content_end = selected[-1]["end"]
+            if windowed:
+                content_start = max(content_start, window_start)
+                content_end = min(content_end, window_end)
+            content = "".join(texts)[content_start - selected[0]["start"]:content_end - selected[0]["start"]]
+        else:
+            tables, equations, content = [], [], ""
+            content_start = content_end = window_start
+
+        if "content" in fields:
+            result["content"] = content
+        if "tables" in fields:
+            result["tables"] = tables
+        if "equations" in fields:
+            result["equations"] = equations
+
+        result["range"] = {
+            "start_page": selected[0]["page"] if selected else None,
+            "end_page": selected[-1]["page"] if selected else None,
+            "offset": content_start,
+            "end": content_end,
+            "text_length": text_length,
+            "page_count": len(header["pages"])
+        }
+        return result
+
+    def update_metadata(self, filename: str, metadata: Optional[Dict] = None, tags: Optional[List[str]] = None):
+        """헤더만 바꿔 씁니다. 페이지 청크는 압축을 풀지 않고 그대로 복사합니다."""
+        with self._lock:
+            if not self._stored(filename):
+                # 이전 형식은 새 형식으로 옮기면서 갱신
+                header = self._load_legacy(filename)
+                structured = header["legacy_pages"]
+                self._write(
+                    filename,
+                    dict(header["metadata"], **(metadata or {})),
+                    tags if tags is not None else header["tags"],
+                    structured
+                )
+                return
+
+            with self._open(filename) as f:
+                header = self._read_header(f)
+                body_offset = header.pop("body_offset")
+                if metadata:
+                    header["metadata"].update(metadata)
+                if tags is not None:
+                    header["tags"] = tags
+                f.seek(body_offset)
+                body = iter(lambda: f.read(1024 * 1024), b"")
+                self._write_file(filename, header, body)
+
+    def rename(self, filename: str, new_filename: str):
+        if self.blobs is not None:
+            self.blobs.move(self._store_path(filename), self._store_path(new_filename))
+        for source, target in (
+            (self._store_path(filename), self._store_path(new_filename)),
+            (self._legacy_path(filename), self._legacy_path(new_filename))
+        ):
+            if source.exists():
+                shutil.move(str(source), str(target))
+
+    def delete(self, filename: str):
+        if self.blobs is not None:
+            self.blobs.remove(self._store_path(filename))
+        self._store_path(filename).unlink(missing_ok=True)
+        self._legacy_path(filename).unlink(missing_ok=True)
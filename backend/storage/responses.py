@@ -0,0 +1,124 @@
+from typing import Optional, Tuple
+import os
+import re
+from pathlib import Path
+from urllib.parse import quote
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from storage.compression import COMPRESSOR, Compressor
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+def file_etag(path: Path) -> str:
+    """파일의 mtime과 크기로 약한 ETag를 만듭니다."""
+    stat = path.stat()
+    return f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """단일 바이트 범위 헤더를 (시작, 끝) 튜플로 변환합니다. 해석할 수 없으면 None을 반환합니다."""
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # 마지막 N 바이트
+        length = int(end)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    return start, min(end, size - 1)
+
+def _iter_file_range(path: Path, start: int, end: int):
+    """파일의 지정된 구간을 청크 단위로 읽습니다."""
+    with path.open("rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def _accepts_encoding(request: Request, encoding: str) -> bool:
+    for item in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() == encoding and params.replace(" ", "") != "q=0":
+            return True
+    return False
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+def ranged_file_response(
+    request: Request,
+    path: Path,
+    media_type: str,
+    filename: str,
+    compressor: Compressor = COMPRESSOR,
+    content_hash: Optional[str] = None
+) -> Response:
+    """ETag, If-None-Match, Range, If-Range를 지원하는 파일 응답을 만듭니다.
+
+    압축해 저장한 파일은 클라이언트가 그 형식(gzip, zstd)을 받으면 압축된 그대로 보내고,
+    아니면 압축을 풀면서 보냅니다. Range는 압축을 푼 내용 기준이라 압축된 파일은 구간 앞부분까지
+    풀면서 건너뛰어야 하므로, 이어받기 요청은 sendfile 없이 처음부터 풀어 읽습니다 (저장 공간을 두 배로 쓰지 않는 대신).
+
+    content_hash(파일 내용 해시)가 있으면 강한 ETag를 쓰고 If-Range를 그 ETag와 비교합니다.
+    없으면 mtime과 크기로 만든 약한 ETag만 있으므로, RFC 7233에 따라 If-Range가 붙은 요청에는 전체를 보냅니다.
+    """
+    compressed = compressor.is_compressed(path)
+    encoding = compressor.content_codec(path) if compressed else None
+    send_encoded = encoding is not None and _accepts_encoding(request, encoding)
+    if content_hash is not None:
+        # 압축된 그대로 보내는 응답은 다른 표현이므로 ETag를 구분
+        identity_etag = f'"{content_hash}"'
+        etag = f'"{content_hash}-{encoding}"' if send_encoded else identity_etag
+    else:
+        identity_etag = None
+        etag = file_etag(path)
+    size = compressor.raw_size(path) if compressed else path.stat().st_size
+    headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+    if compressed:
+        headers["Vary"] = "Accept-Encoding"
+
+    if_none_match = request.headers.get("if-none-match")
+    # If-None-Match는 약한 비교
+    if if_none_match and _opaque_tag(etag) in [_opaque_tag(tag.strip()) for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range는 강한 비교: 강한 ETag가 같을 때만 구간을 보내고, 날짜나 약한 ETag면 전체를 보냄
+    if range_header and (not if_range or (identity_etag is not None and if_range.strip() == identity_etag)):
+        byte_range = _parse_range(range_header, size)
+        if byte_range is not None:
+            start, end = byte_range
+            if start >= size or start > end:
+                headers["Content-Range"] = f"bytes */{size}"
+                return Response(status_code=416, headers=headers)
+            headers["ETag"] = identity_etag or etag
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(os.path.basename(filename))}"
+            return StreamingResponse(
+                compressor.iter_chunks(path, start, end) if compressed else _iter_file_range(path, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers=headers
+            )
+
+    if compressed:
+        if send_encoded:
+            # 압축된 파일을 그대로 sendfile로 전달하고 클라이언트가 풂
+            headers["Content-Encoding"] = encoding
+            return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+        headers["Content-Length"] = str(size)
+        headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(os.path.basename(filename))}"
+        return StreamingResponse(compressor.iter_chunks(path), media_type=media_type, headers=headers)
+
+    # 전체 파일은 sendfile을 사용하는 FileResponse로 전달
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
@@ -0,0 +1,394 @@
+"""파싱, OCR, 분석, 변환 작업을 작업자 프로세스에 나눠 주는 작업 대기열(broker).
+
+기본은 SQLite 파일 하나를 쓰며, 같은 호스트의 API 작업자와 작업 처리 프로세스가 함께 씁니다.
+다른 호스트의 작업자는 이 모듈을 TCP 서버로 띄워 접속합니다.
+
+    python -m tasks.broker --host 0.0.0.0 --port 7400
+    TASK_BROKER_URL=tcp://대기열호스트:7400 python -m tasks.worker
+"""
+from typing import Dict, Iterable, List, Optional
+import argparse
+import json
+import logging
+import math
+import os
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+# SQLite 파일 경로 또는 tcp://호스트:포트
+TASK_BROKER_URL = os.getenv("TASK_BROKER_URL", "task_queue/tasks.sqlite3")
+# TCP 대기열에 접속할 때 확인하는 공유 토큰 (비어 있으면 확인하지 않음)
+TASK_BROKER_TOKEN = os.getenv("TASK_BROKER_TOKEN", "")
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", 3))
+# 재시도 대기 시간(초)의 기준값. 시도할 때마다 두 배로 늘어남
+TASK_RETRY_DELAY = float(os.getenv("TASK_RETRY_DELAY", 5))
+# 끝난 작업의 결과를 보관하는 시간(초)
+TASK_RESULT_TTL = float(os.getenv("TASK_RESULT_TTL", 7 * 24 * 3600))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+STATUSES = (QUEUED, RUNNING, DONE, DEAD)
+
+# 숫자가 작을수록 먼저 꺼냄 (scheduling.admission의 우선순위 이름과 같음)
+PRIORITY_ORDER = {"interactive": 0, "batch": 1}
+
+class Broker:
+    """작업을 넣고, 임대(lease)하여 꺼내고, 완료/실패를 알리는 대기열.
+
+    꺼낸 작업은 임대 기간 안에 ack 또는 fail해야 하며, 작업자가 죽어 임대가 끝나면 다른 작업자가
+    다시 꺼냅니다. 각 메서드는 JSON으로 주고받을 수 있는 값만 받고 반환합니다.
+    """
+
+    def enqueue(self, kind: str, payload: Dict, priority: str = "interactive",
+                max_attempts: int = TASK_MAX_ATTEMPTS, delay: float = 0) -> str:
+        raise NotImplementedError
+
+    def claim(self, worker: str, kinds: Iterable[str], lease: float) -> Optional[Dict]:
+        """kinds 중 꺼낼 수 있는 작업 하나를 임대합니다. 반환값의 token으로 heartbeat/ack/fail합니다."""
+        raise NotImplementedError
+
+    def heartbeat(self, task_id: str, token: str, lease: float) -> bool:
+        """임대를 연장합니다. 이미 다른 작업자에게 넘어갔으면 False."""
+        raise NotImplementedError
+
+    def ack(self, task_id: str, token: str, result: Optional[Dict] = None) -> bool:
+        raise NotImplementedError
+
+    def fail(self, task_id: str, token: str, error: str, retry: bool = True) -> Optional[str]:
+        """실패를 알리고 바뀐 상태(queued: 재시도 예정, dead: 더는 시도하지 않음)를 반환합니다."""
+        raise NotImplementedError
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def list(self, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        raise NotImplementedError
+
+    def retry(self, task_id: str) -> bool:
+        """실패로 끝난(dead) 작업을 시도 횟수를 초기화하여 다시 넣습니다."""
+        raise NotImplementedError
+
+    def purge(self, older_than: float = TASK_RESULT_TTL) -> int:
+        """older_than초보다 오래전에 끝난 작업을 지웁니다. 실패 작업은 확인할 수 있도록 남겨 둡니다."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        raise NotImplementedError
+
+def retry_delay(attempts: int, base: float = TASK_RETRY_DELAY) -> float:
+    return base * math.pow(2, max(attempts - 1, 0))
+
+def _row(row: sqlite3.Row) -> Dict:
+    task = dict(row)
+    task["payload"] = json.loads(task["payload"])
+    task["result"] = json.loads(task["result"]) if task["result"] is not None else None
+    task["priority"] = next((name for name, order in PRIORITY_ORDER.items() if order == task["priority"]), "batch")
+    return task
+
+class SQLiteBroker(Broker):
+    """작업을 SQLite 테이블 하나에 저장합니다. 여러 프로세스가 같은 파일을 쓰며, 꺼내기는 쓰기 잠금(BEGIN IMMEDIATE) 안에서 합니다."""
+
+    def __init__(self, path: Path = Path(TASK_BROKER_URL)):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # 트랜잭션을 직접 관리 (꺼내기를 원자적으로 하기 위해)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_until REAL,
+                token TEXT,
+                worker TEXT,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, priority, available_at);
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, kind: str, payload: Dict, priority: str = "interactive",
+                max_attempts: int = TASK_MAX_ATTEMPTS, delay: float = 0) -> str:
+        task_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO tasks (id, kind, payload, priority, status, max_attempts, available_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (task_id, kind, json.dumps(payload, ensure_ascii=False), PRIORITY_ORDER.get(priority, 0),
+                 QUEUED, max(1, max_attempts), now + delay, now, now)
+            )
+        return task_id
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float):
+        """임대가 끝났는데 응답이 없는 작업(작업자가 죽은 경우)을 다시 넣거나 실패로 돌립니다."""
+        conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END,"
+            " error = '임대 만료: ' || COALESCE(worker, ''), token = NULL, lease_until = NULL,"
+            " available_at = ?, updated_at = ? WHERE status = ? AND lease_until < ?",
+            (DEAD, QUEUED, now, now, RUNNING, now)
+        )
+
+    def claim(self, worker: str, kinds: Iterable[str], lease: float) -> Optional[Dict]:
+        kinds = list(kinds)
+        if not kinds:
+            return None
+        token = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            row = conn.execute(
+                f"SELECT id FROM tasks WHERE status = ? AND available_at <= ? AND kind IN ({','.join('?' * len(kinds))})"
+                " ORDER BY priority, available_at LIMIT 1",
+                (QUEUED, now, *kinds)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1, token = ?, worker = ?, lease_until = ?,"
+                " updated_at = ? WHERE id = ?",
+                (RUNNING, token, worker, now + lease, now, row["id"])
+            )
+            return _row(conn.execute("SELECT * FROM tasks WHERE id = ?", (row["id"],)).fetchone())
+
+    def heartbeat(self, task_id: str, token: str, lease: float) -> bool:
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND token = ? AND status = ?",
+                (time.time() + lease, task_id, token, RUNNING)
+            ).rowcount == 1
+
+    def ack(self, task_id: str, token: str, result: Optional[Dict] = None) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = NULL, token = NULL, lease_until = NULL, updated_at = ?"
+                " WHERE id = ? AND token = ? AND status = ?",
+                (DONE, json.dumps(result, ensure_ascii=False), now, task_id, token, RUNNING)
+            ).rowcount == 1
+
+    def fail(self, task_id: str, token: str, error: str, retry: bool = True) -> Optional[str]:
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM tasks WHERE id = ? AND token = ? AND status = ?",
+                (task_id, token, RUNNING)
+            ).fetchone()
+            if row is None:
+                return None
+            status = QUEUED if retry and row["attempts"] < row["max_attempts"] else DEAD
+            conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, token = NULL, lease_until = NULL, available_at = ?,"
+                " updated_at = ? WHERE id = ?",
+                (status, error[:4000], now + retry_delay(row["attempts"]), now, task_id)
+            )
+            return status
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return _row(row) if row is not None else None
+
+    def list(self, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if kind:
+            conditions.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM tasks {where} ORDER BY updated_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [_row(row) for row in rows]
+
+    def retry(self, task_id: str) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE tasks SET status = ?, attempts = 0, available_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (QUEUED, now, now, task_id, DEAD)
+            ).rowcount == 1
+
+    def purge(self, older_than: float = TASK_RESULT_TTL) -> int:
+        with self._transaction() as conn:
+            return conn.execute(
+                "DELETE FROM tasks WHERE status = ? AND updated_at < ?", (DONE, time.time() - older_than)
+            ).rowcount
+
+    def stats(self) -> Dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status").fetchall()
+            oldest = self._conn.execute(
+                "SELECT MIN(available_at) FROM tasks WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+        kinds: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in rows:
+            kinds.setdefault(kind, {name: 0 for name in STATUSES})[status] = count
+        totals = {name: sum(counts[name] for counts in kinds.values()) for name in STATUSES}
+        return {
+            **totals,
+            "kinds": kinds,
+            # 가장 오래 기다린 작업의 대기 시간(초). 작업자가 모자라면 계속 늘어남
+            "oldest_queued_s": round(max(time.time() - oldest, 0), 3) if oldest is not None else 0
+        }
+
+# TCP로 호출할 수 있는 메서드
+REMOTE_METHODS = ("enqueue", "claim", "heartbeat", "ack", "fail", "get", "list", "retry", "purge", "stats")
+
+class BrokerServer(socketserver.ThreadingTCPServer):
+    """대기열 메서드를 한 줄짜리 JSON 요청/응답으로 제공합니다. 다른 호스트의 작업자가 접속합니다."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, broker: Broker, token: str = TASK_BROKER_TOKEN):
+        self.broker = broker
+        self.token = token
+        super().__init__(address, BrokerRequestHandler)
+
+class BrokerRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if self.server.token and request.get("token") != self.server.token:
+                    raise PermissionError("대기열 토큰이 맞지 않습니다.")
+                if request.get("method") not in REMOTE_METHODS:
+                    raise ValueError(f"지원하지 않는 메서드입니다: {request.get('method')}")
+                result = getattr(self.server.broker, request["method"])(*request.get("args", []), **request.get("kwargs", {}))
+                response = {"result": result}
+            except Exception as e:
+                logging.error(f"대기열 요청 처리 실패: {str(e)}")
+                response = {"error": f"{type(e).__name__}: {str(e)}"}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+class BrokerError(Exception):
+    """TCP 대기열 서버가 요청을 처리하지 못했습니다."""
+
+class SocketBroker(Broker):
+    """BrokerServer에 접속하는 대기열. 스레드마다 연결을 하나씩 유지하고, 끊기면 한 번 다시 접속합니다."""
+
+    def __init__(self, host: str, port: int, token: str = TASK_BROKER_TOKEN, timeout: float = 30):
+        self.address = (host, port)
+        self.token = token
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            sock = socket.create_connection(self.address, timeout=self.timeout)
+            connection = (sock, sock.makefile("rb"))
+            self._local.connection = connection
+        return connection
+
+    def _close(self):
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            connection[1].close()
+            connection[0].close()
+
+    def _call(self, method: str, *args, **kwargs):
+        request = (json.dumps({"method": method, "args": args, "kwargs": kwargs, "token": self.token},
+                              ensure_ascii=False) + "\n").encode("utf-8")
+        for attempt in range(2):
+            try:
+                sock, reader = self._connection()
+                sock.sendall(request)
+                line = reader.readline()
+                if not line:
+                    raise ConnectionError("대기열 서버가 연결을 닫았습니다.")
+                break
+            except OSError:
+                self._close()
+                if attempt:
+                    raise
+        response = json.loads(line)
+        if "error" in response:
+            raise BrokerError(response["error"])
+        return response["result"]
+
+    def enqueue(self, kind, payload, priority="interactive", max_attempts=TASK_MAX_ATTEMPTS, delay=0):
+        return self._call("enqueue", kind, payload, priority, max_attempts, delay)
+
+    def claim(self, worker, kinds, lease):
+        return self._call("claim", worker, list(kinds), lease)
+
+    def heartbeat(self, task_id, token, lease):
+        return self._call("heartbeat", task_id, token, lease)
+
+    def ack(self, task_id, token, result=None):
+        return self._call("ack", task_id, token, result)
+
+    def fail(self, task_id, token, error, retry=True):
+        return self._call("fail", task_id, token, error, retry)
+
+    def get(self, task_id):
+        return self._call("get", task_id)
+
+    def list(self, status=None, kind=None, limit=100):
+        return self._call("list", status, kind, limit)
+
+    def retry(self, task_id):
+        return self._call("retry", task_id)
+
+    def purge(self, older_than=TASK_RESULT_TTL):
+        return self._call("purge", older_than)
+
+    def stats(self):
+        return self._call("stats")
+
+def create_broker(url: str = TASK_BROKER_URL) -> Broker:
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].rpartition(":")
+        return SocketBroker(host, int(port))
+    return SQLiteBroker(Path(url))
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="다른 호스트의 작업자가 접속하는 작업 대기열 서버")
+    parser.add_argument("--path", default=TASK_BROKER_URL, help="SQLite 파일 경로")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=7400)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with BrokerServer((args.host, args.port), SQLiteBroker(Path(args.path))) as server:
+        logging.info(f"작업 대기열 서버 시작: {args.host}:{args.port} ({args.path})")
+        server.serve_forever()
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,149 @@
+"""작업 대기열에서 파싱, OCR, 분석, 변환 작업을 꺼내 처리하는 작업자 프로세스.
+
+API 서버와 같은 저장소(BLOB_BACKEND), 변경 기록(CHANGE_JOURNAL_PATH), 대기열(TASK_BROKER_URL)을
+보도록 설정하면 다른 호스트에서도 실행할 수 있으며, 작업자를 늘리면 API 서버를 건드리지 않고 처리량이 늘어납니다.
+
+    python -m tasks.worker --processes 4
+    python -m tasks.worker --kinds ocr --processes 2      # OCR만 처리하는 작업자
+"""
+from typing import Callable, Dict, Iterable, Optional
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+
+from tasks.broker import Broker
+
+TASK_WORKER_KINDS = os.getenv("TASK_WORKER_KINDS", "")
+# 작업 하나를 임대하는 시간(초). 처리하는 동안 1/3마다 연장하므로 작업자가 죽었을 때만 만료됨
+TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", 120))
+# 꺼낼 작업이 없을 때 다시 확인하기까지 기다리는 시간(초)
+TASK_POLL_SECONDS = float(os.getenv("TASK_POLL_SECONDS", 1.0))
+# 끝난 작업을 정리하는 주기(초)
+TASK_PURGE_SECONDS = 3600
+
+class PermanentTaskError(Exception):
+    """다시 시도해도 성공할 수 없는 실패(파일 없음, 잘못된 형식 등). 재시도하지 않고 바로 실패 처리합니다."""
+
+class Worker:
+    """대기열에서 작업을 하나씩 꺼내 handlers[kind](payload)로 처리하고 결과를 대기열에 저장합니다."""
+
+    def __init__(
+        self,
+        broker: Broker,
+        handlers: Dict[str, Callable[[Dict], Optional[Dict]]],
+        kinds: Optional[Iterable[str]] = None,
+        name: Optional[str] = None,
+        lease: float = TASK_LEASE_SECONDS,
+        poll: float = TASK_POLL_SECONDS
+    ):
+        self.broker = broker
+        self.handlers = handlers
+        self.kinds = [kind for kind in (kinds or handlers) if kind in handlers]
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = lease
+        self.poll = poll
+        self.processed = 0
+        self.failed = 0
+        self._stop = threading.Event()
+
+    def stop(self):
+        """지금 처리 중인 작업을 마친 뒤 멈춥니다."""
+        self._stop.set()
+
+    def _keep_lease(self, task: Dict, done: threading.Event):
+        while not done.wait(self.lease / 3):
+            try:
+                if not self.broker.heartbeat(task["id"], task["token"], self.lease):
+                    logging.error(f"작업 임대를 잃었습니다: {task['kind']} {task['id']}")
+                    return
+            except Exception as e:
+                logging.error(f"작업 임대 연장 실패: {task['id']}: {str(e)}")
+
+    def run_once(self) -> bool:
+        """작업 하나를 처리합니다. 꺼낼 작업이 없으면 False."""
+        task = self.broker.claim(self.name, self.kinds, self.lease)
+        if task is None:
+            return False
+
+        done = threading.Event()
+        keeper = threading.Thread(target=self._keep_lease, args=(task, done), daemon=True)
+        keeper.start()
+        start = time.perf_counter()
+        try:
+            result = self.handlers[task["kind"]](task["payload"])
+        except Exception as e:
+            done.set()
+            self.failed += 1
+            retry = not isinstance(e, PermanentTaskError)
+            status = self.broker.fail(task["id"], task["token"], f"{type(e).__name__}: {str(e)}", retry=retry)
+            logging.error(
+                f"작업 실패 ({task['attempts']}/{task['max_attempts']}회, {status}): {task['kind']} {task['id']}: {str(e)}"
+            )
+            logging.debug(traceback.format_exc())
+        else:
+            done.set()
+            self.processed += 1
+            if not self.broker.ack(task["id"], task["token"], result):
+                logging.error(f"임대가 끝난 뒤에 완료한 작업입니다: {task['kind']} {task['id']}")
+            logging.info(f"작업 완료: {task['kind']} {task['id']} ({time.perf_counter() - start:.3f}초)")
+        finally:
+            keeper.join()
+        return True
+
+    def run(self):
+        logging.info(f"작업자 시작: {self.name} ({', '.join(self.kinds)})")
+        last_purge = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_purge > TASK_PURGE_SECONDS:
+                    self.broker.purge()
+                    last_purge = time.monotonic()
+                if not self.run_once():
+                    self._stop.wait(self.poll)
+            except Exception as e:
+                # 대기열에 접속하지 못하는 등: 잠시 뒤 다시 시도
+                logging.error(f"작업 대기열 오류: {str(e)}")
+                self._stop.wait(self.poll * 5)
+        logging.info(f"작업자 종료: {self.name} (완료 {self.processed}, 실패 {self.failed})")
+
+def run_process(kinds: Optional[Iterable[str]]):
+    """작업자 프로세스 하나. 앱 모듈을 불러와 같은 저장소, 색인, 모델로 작업을 처리합니다."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    import main
+
+    worker = Worker(main.TASK_BROKER, main.TASK_HANDLERS, kinds)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    worker.run()
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="작업 대기열 처리 작업자")
+    parser.add_argument("--kinds", default=TASK_WORKER_KINDS, help="처리할 작업 종류 (쉼표로 구분, 기본: 전부)")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()] or None
+    if args.processes <= 1:
+        run_process(kinds)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_process, args=(kinds,), name=f"task-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    # 부모가 받은 종료 신호를 자식에게 넘기고 모두 끝날 때까지 기다림
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+    signal.signal(signal.SIGINT, lambda *_: [process.terminate() for process in processes])
+    for process in processes:
+        process.join()
+
+if __name__ == "__main__":
+    main_cli()
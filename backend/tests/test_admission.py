@@ -0,0 +1,191 @@
+import asyncio
+
+import pytest
+
+from scheduling.admission import (
+    BATCH, INTERACTIVE, AdmissionController, AdmissionPool, Rejected, client_address, parse_limits, parse_networks
+)
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+async def _settle():
+    # 차례를 받은 대기 태스크가 실행될 때까지 이벤트 루프를 몇 번 돌림
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def _hold(pool: AdmissionPool, client: str, priority: str, order: list, release: asyncio.Event):
+    async with pool.slot(client, priority):
+        order.append(client)
+        await release.wait()
+
+def test_interactive_requests_go_first_and_keep_a_slot():
+    async def scenario():
+        pool = AdmissionPool("analysis", limit=2)
+        order = []
+        release = asyncio.Event()
+        # 일괄 요청은 limit - 1개까지만 실행되어 대화형 요청의 자리가 남음
+        tasks = [asyncio.create_task(_hold(pool, f"batch-{i}", BATCH, order, release)) for i in range(2)]
+        await _settle()
+        assert order == ["batch-0"]
+        assert pool.stats()["waiting"] == {INTERACTIVE: 0, BATCH: 1}
+
+        tasks.append(asyncio.create_task(_hold(pool, "user", INTERACTIVE, order, release)))
+        await _settle()
+        assert order == ["batch-0", "user"]
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["batch-0", "user", "batch-1"]
+        assert pool.stats()["running"] == {INTERACTIVE: 0, BATCH: 0}
+
+    run(scenario())
+
+def test_waiting_interactive_request_is_served_before_waiting_batch():
+    async def scenario():
+        pool = AdmissionPool("analysis", limit=1)
+        order = []
+        first = asyncio.Event()
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(pool, "a", INTERACTIVE, order, first))]
+        await _settle()
+        tasks.append(asyncio.create_task(_hold(pool, "batch", BATCH, order, release)))
+        await _settle()
+        tasks.append(asyncio.create_task(_hold(pool, "b", INTERACTIVE, order, release)))
+        await _settle()
+
+        first.set()
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b", "batch"]
+
+    run(scenario())
+
+def test_clients_take_turns():
+    async def scenario():
+        pool = AdmissionPool("analysis", limit=1)
+        order = []
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(pool, "busy", INTERACTIVE, order, release))]
+        await _settle()
+        # 한 클라이언트가 먼저 여러 요청을 넣어도 다른 클라이언트와 번갈아 차례를 받음
+        for client in ("busy", "busy", "busy", "quiet", "other"):
+            tasks.append(asyncio.create_task(_hold(pool, client, INTERACTIVE, order, release)))
+            await _settle()
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["busy", "busy", "quiet", "other", "busy", "busy"]
+
+    run(scenario())
+
+def test_per_client_and_queue_limits():
+    async def scenario():
+        pool = AdmissionPool("analysis", limit=1, max_queue=3, max_per_client=2)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(pool, "a", INTERACTIVE, [], release)) for _ in range(3)]
+        await _settle()
+
+        with pytest.raises(Rejected) as error:
+            await pool.acquire("a")
+        assert error.value.status_code == 429 and error.value.reason == "client_limit"
+
+        tasks.append(asyncio.create_task(_hold(pool, "b", INTERACTIVE, [], release)))
+        await _settle()
+        with pytest.raises(Rejected) as error:
+            await pool.acquire("c")
+        assert error.value.status_code == 503 and error.value.reason == "queue_full"
+        assert error.value.retry_after >= 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert pool.stats()["rejected"] == {"client_limit": 1, "queue_full": 1}
+        assert pool.stats()["admitted"] == 4
+
+    run(scenario())
+
+def test_timeout_leaves_the_queue():
+    async def scenario():
+        pool = AdmissionPool("analysis", limit=1, max_wait=0.05)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(pool, "a", INTERACTIVE, [], release))
+        await _settle()
+
+        with pytest.raises(Rejected) as error:
+            await pool.acquire("b")
+        assert error.value.status_code == 503 and error.value.reason == "timeout"
+        assert pool.waiting == 0
+
+        release.set()
+        await holder
+        # 시간 초과한 요청에 자리를 넘기지 않음
+        assert pool.stats()["running"][INTERACTIVE] == 0
+
+    run(scenario())
+
+def test_cancelled_waiter_gives_its_slot_to_the_next():
+    async def scenario():
+        pool = AdmissionPool("analysis", limit=1)
+        order = []
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(pool, "a", INTERACTIVE, order, release))
+        await _settle()
+        cancelled = asyncio.create_task(_hold(pool, "b", INTERACTIVE, order, release))
+        waiting = asyncio.create_task(_hold(pool, "c", INTERACTIVE, order, release))
+        await _settle()
+
+        cancelled.cancel()
+        await _settle()
+        assert pool.waiting == 1
+
+        release.set()
+        await asyncio.gather(holder, waiting)
+        assert cancelled.cancelled()
+        assert order == ["a", "c"]
+        assert pool.stats()["running"][INTERACTIVE] == 0
+
+    run(scenario())
+
+def test_cancelled_right_after_admission_returns_the_slot():
+    async def scenario():
+        pool = AdmissionPool("analysis", limit=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(pool, "a", INTERACTIVE, [], release))
+        await _settle()
+        late = asyncio.create_task(_hold(pool, "b", INTERACTIVE, [], asyncio.Event()))
+        await _settle()
+
+        # 차례를 넘겨받는 것과 같은 순간에 취소됨: 취소가 이기든 차례가 이기든 자리는 돌아와야 함
+        release.set()
+        await holder
+        late.cancel()
+        await asyncio.gather(late, return_exceptions=True)
+
+        assert pool.stats()["running"][INTERACTIVE] == 0
+        assert await pool.acquire("c") == 0.0
+
+    run(scenario())
+
+def test_client_address_uses_forwarded_only_from_trusted_proxies():
+    proxies = parse_networks("127.0.0.1, 10.0.0.0/8")
+
+    assert client_address("203.0.113.5", "198.51.100.1", proxies) == "203.0.113.5"
+    assert client_address("127.0.0.1", None, proxies) == "127.0.0.1"
+    assert client_address("127.0.0.1", "198.51.100.1", proxies) == "198.51.100.1"
+    # 클라이언트가 헤더 앞쪽에 넣은 주소는 무시하고 가장 가까운 믿을 수 없는 주소를 씀
+    assert client_address("10.0.0.2", "1.1.1.1, 198.51.100.1, 10.0.0.9", proxies) == "198.51.100.1"
+    assert client_address("10.0.0.2", "10.0.0.7, 10.0.0.9", proxies) == "10.0.0.7"
+    assert client_address(None, None, proxies) == "unknown"
+    assert client_address("127.0.0.1", "198.51.100.1", []) == "127.0.0.1"
+
+def test_controller_maps_routes_to_configured_pools():
+    assert parse_limits("analysis=2, sparql=0,bad,entities=") == {"analysis": 2, "sparql": 1}
+
+    controller = AdmissionController(
+        {"/analyze/{filename}": "analysis", "/query": "sparql", "/other": "missing"}, {"analysis": 2, "sparql": 4}
+    )
+
+    assert controller.pool_for("/analyze/{filename}").limit == 2
+    assert controller.pool_for("/other") is None
+    assert controller.pool_for("/files/") is None
+    assert set(controller.stats()) == {"analysis", "sparql"}
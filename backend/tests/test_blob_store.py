@@ -0,0 +1,210 @@
+import io
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from storage.blob_store import BlobCache, ClientError, S3BlobStore
+
+class StubBody:
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+
+    def read(self) -> bytes:
+        return self._stream.read()
+
+    def iter_chunks(self, size: int):
+        return iter(lambda: self._stream.read(size), b"")
+
+class StubS3:
+    """S3BlobStore가 쓰는 boto3 S3 클라이언트 메서드만 메모리에서 흉내 냅니다 (MinIO 대역).
+
+    목록은 page_size개씩 나누어 돌려주고, 멀티파트 조각은 마지막 조각을 빼고 min_part_size 이상이어야 합니다.
+    """
+
+    def __init__(self, page_size: int = 2, min_part_size: int = 4):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+        self.page_size = page_size
+        self.min_part_size = min_part_size
+        self.fail_part = None
+        self._clock = 1_700_000_000
+
+    def _now(self) -> datetime:
+        self._clock += 1
+        return datetime.fromtimestamp(self._clock, tz=timezone.utc)
+
+    def _object(self, key: str, operation: str):
+        if key not in self.objects:
+            raise ClientError({"Error": {"Code": "404" if operation == "HeadObject" else "NoSuchKey"}}, operation)
+        return self.objects[key]
+
+    def head_object(self, Bucket, Key):
+        data, modified = self._object(Key, "HeadObject")
+        return {"ContentLength": len(data), "LastModified": modified}
+
+    def put_object(self, Bucket, Key, Body):
+        self.calls.append("put_object")
+        self.objects[Key] = (Body.read(), self._now())
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append(("upload_part", PartNumber, len(Body)))
+        if PartNumber == self.fail_part:
+            raise ClientError({"Error": {"Code": "InternalError"}}, "UploadPart")
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        assert numbers == sorted(parts)
+        assert all(len(parts[number]) >= self.min_part_size for number in numbers[:-1])
+        self.objects[Key] = (b"".join(parts[number] for number in numbers), self._now())
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+        self.uploads.pop(UploadId, None)
+
+    def get_object(self, Bucket, Key, Range=None):
+        data, modified = self._object(Key, "GetObject")
+        if Range is not None:
+            start, end = (int(value) for value in Range[len("bytes="):].split("-"))
+            self.calls.append(("range", start, end))
+            data = data[start:end + 1]
+        return {"Body": StubBody(data), "ContentLength": len(data), "LastModified": modified}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def copy_object(self, Bucket, Key, CopySource):
+        data, _ = self._object(CopySource["Key"], "CopyObject")
+        self.objects[Key] = (data, self._now())
+
+    def get_paginator(self, name):
+        assert name == "list_objects_v2"
+        stub = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                keys = sorted(key for key in stub.objects if key.startswith(Prefix))
+                for start in range(0, len(keys), stub.page_size):
+                    stub.calls.append("list_page")
+                    yield {"Contents": [
+                        {"Key": key, "Size": len(stub.objects[key][0]), "LastModified": stub.objects[key][1]}
+                        for key in keys[start:start + stub.page_size]
+                    ]}
+
+        return Paginator()
+
+@pytest.fixture
+def s3():
+    return StubS3()
+
+@pytest.fixture
+def store(s3):
+    return S3BlobStore(bucket="docs", prefix="app", part_size=4, client=s3)
+
+def _file(tmp_path, name: str, data: bytes):
+    path = tmp_path / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+def test_small_files_use_a_single_put(store, s3, tmp_path):
+    info = store.put_file("uploads/a.pdf", _file(tmp_path, "a.pdf", b"abc"))
+
+    assert s3.calls == ["put_object"]
+    assert info.key == "uploads/a.pdf" and info.size == 3
+    assert s3.objects["app/uploads/a.pdf"][0] == b"abc"
+
+def test_large_files_are_uploaded_in_parts(store, s3, tmp_path):
+    store.put_file("uploads/big.pdf", _file(tmp_path, "big.pdf", b"0123456789"))
+
+    assert s3.calls == [("upload_part", 1, 4), ("upload_part", 2, 4), ("upload_part", 3, 2)]
+    assert s3.objects["app/uploads/big.pdf"][0] == b"0123456789"
+
+def test_failed_multipart_upload_is_aborted(store, s3, tmp_path):
+    s3.fail_part = 2
+
+    with pytest.raises(ClientError):
+        store.put_file("uploads/big.pdf", _file(tmp_path, "big.pdf", b"0123456789"))
+
+    assert s3.calls[-1] == "abort_multipart_upload"
+    assert not s3.uploads and "app/uploads/big.pdf" not in s3.objects
+
+def test_range_reads_and_missing_keys(store, tmp_path):
+    store.put_file("parsed/a.pdoc", _file(tmp_path, "a.pdoc", b"0123456789"))
+
+    assert store.read_range("parsed/a.pdoc", 2, 5) == b"2345"
+    assert store.stat("parsed/missing") is None
+    with pytest.raises(FileNotFoundError):
+        store.read_range("parsed/missing", 0, 1)
+    with pytest.raises(FileNotFoundError):
+        store.get_file("parsed/missing", tmp_path / "missing")
+
+def test_listing_follows_every_page(store, s3, tmp_path):
+    for i in range(5):
+        store.put_file(f"uploads/{i}.pdf", _file(tmp_path, f"{i}.pdf", b"x" * (i + 1)))
+    store.put_file("parsed/0.pdoc", _file(tmp_path, "0.pdoc", b"x"))
+    s3.calls.clear()
+
+    infos = list(store.list("uploads/"))
+
+    assert [info.key for info in infos] == [f"uploads/{i}.pdf" for i in range(5)]
+    assert [info.size for info in infos] == [1, 2, 3, 4, 5]
+    assert s3.calls == ["list_page"] * 3
+
+def test_cache_downloads_once_and_reads_ranges_without_downloading(store, s3, tmp_path):
+    root = tmp_path / "node"
+    remote = BlobCache(store, root=root, ttl=0)
+    store.put_file("parsed/a.pdoc", _file(tmp_path, "a.pdoc", b"0123456789" * 100))
+    local = root / "parsed" / "a.pdoc"
+
+    with remote.open(local, partial=True) as f:
+        f.seek(500)
+        assert f.read(4) == b"0123"
+    assert not local.exists()
+    assert any(call[0] == "range" for call in s3.calls if isinstance(call, tuple))
+
+    assert remote.fetch(local) and remote.fetch(local)
+    assert local.read_bytes() == b"0123456789" * 100
+    stats = remote.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    # 다른 노드가 바꾼 객체는 다시 내려받음
+    store.put_file("parsed/a.pdoc", _file(tmp_path, "b.pdoc", b"new"))
+    assert remote.fetch(local)
+    assert local.read_bytes() == b"new"
+
+def test_cache_evicts_least_recently_used_copies(store, tmp_path):
+    root = tmp_path / "node"
+    remote = BlobCache(store, root=root, ttl=0, max_bytes=10)
+    for name in ("a", "b", "c"):
+        store.put_file(f"uploads/{name}.pdf", _file(tmp_path, f"{name}.pdf", b"x" * 4))
+
+    for name in ("a", "b", "c"):
+        remote.fetch(root / "uploads" / f"{name}.pdf")
+
+    assert not (root / "uploads" / "a.pdf").exists()
+    assert (root / "uploads" / "b.pdf").exists() and (root / "uploads" / "c.pdf").exists()
+    assert remote.stats()["cached_bytes"] == 8
+
+def test_move_and_remove(store, s3, tmp_path):
+    root = tmp_path / "node"
+    remote = BlobCache(store, root=root, ttl=0)
+    source = _file(root, "uploads/a.pdf", b"abc")
+    remote.push(source)
+
+    remote.move(source, root / "uploads" / "b.pdf")
+    assert set(s3.objects) == {"app/uploads/b.pdf"}
+    assert (root / "uploads" / "b.pdf").read_bytes() == b"abc"
+    assert abs(os.stat(root / "uploads" / "b.pdf").st_mtime - store.stat("uploads/b.pdf").modified) < 0.001
+
+    remote.remove(root / "uploads" / "b.pdf")
+    assert not s3.objects and not remote.exists(root / "uploads" / "b.pdf")
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from storage.change_journal import ChangeJournal
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "journal" / "journal.log"
+
+def _follow(journal: ChangeJournal) -> list:
+    received = []
+    journal.subscribe(received.append)
+    return received
+
+def test_delivers_only_other_workers_changes(path):
+    writer = ChangeJournal(path)
+    writer.append("parse", "old.pdf")
+    reader = ChangeJournal(path)
+    received = _follow(reader)
+    own = _follow(writer)
+
+    writer.append("rename", "a.pdf", "b.pdf")
+    reader.append("delete", "c.pdf")
+
+    # 시작하기 전의 기록과 자기 기록은 건너뜀
+    assert reader.poll() == 1
+    assert [(event["op"], event["files"]) for event in received] == [("rename", ["a.pdf", "b.pdf"])]
+    assert reader.is_local(received[0])
+    assert writer.poll() == 1
+    assert [event["op"] for event in own] == ["delete"]
+    assert not reader.pending() and reader.poll() == 0
+    assert reader.applied == 1
+
+def test_partial_line_waits_for_the_newline(path):
+    reader = ChangeJournal(path)
+    received = _follow(reader)
+    line = json.dumps({"origin": "other:1:x", "op": "parse", "files": ["a.pdf"]}).encode("utf-8")
+
+    with path.open("ab") as f:
+        f.write(line[:10])
+    assert reader.pending()
+    assert reader.poll() == 0
+
+    with path.open("ab") as f:
+        f.write(line[10:] + b"\n" + b"not json\n")
+    assert reader.poll() == 1
+    assert received == [{"origin": "other:1:x", "op": "parse", "files": ["a.pdf"]}]
+
+def test_reads_the_rest_of_a_rotated_file(path):
+    writer = ChangeJournal(path, max_bytes=400)
+    reader = ChangeJournal(path)
+    received = _follow(reader)
+
+    for i in range(3):
+        writer.append("parse", f"{i}.pdf")
+    assert reader.poll() == 3
+    # 크기를 넘으면 journal.log.1로 돌림: 읽는 쪽은 이전 파일의 남은 줄과 새 파일을 이어 읽음
+    for i in range(3, 6):
+        writer.append("parse", f"{i}.pdf")
+
+    assert path.with_name("journal.log.1").exists()
+    assert path.stat().st_size <= 400
+    assert reader.pending()
+    assert reader.poll() == 3
+    assert [event["files"][0] for event in received] == [f"{i}.pdf" for i in range(6)]
+
+    writer.append("parse", "6.pdf")
+    assert reader.poll() == 1 and received[-1]["files"] == ["6.pdf"]
+
+def test_failing_handler_does_not_stop_the_others(path):
+    writer = ChangeJournal(path)
+    reader = ChangeJournal(path)
+
+    def broken(event):
+        raise RuntimeError("handler failed")
+
+    reader.subscribe(broken)
+    received = _follow(reader)
+    writer.append("metadata", "a.pdf")
+
+    assert reader.poll() == 1
+    assert received[0]["op"] == "metadata"
+
+def test_poll_without_waiting_skips_while_another_thread_dispatches(path):
+    writer = ChangeJournal(path)
+    reader = ChangeJournal(path)
+    writer.append("parse", "a.pdf")
+
+    with reader._dispatch_lock:
+        assert reader.poll(wait=False) == 0
+    assert reader.poll(wait=False) == 1
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+
+from generators.writers import WRITERS
+from storage.conversion_cache import ConversionCache
+
+def _store(cache: ConversionCache, source: Path, filename: str, format: str) -> Path:
+    # main._converted_path와 같은 배치: CONVERTED_DIR/{형식}/{문서}.{확장자}
+    output = cache.cache_dir / format / f"{filename}.{WRITERS[format].extension}"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(format)
+    cache.store(source, output, filename)
+    return output
+
+@pytest.fixture
+def cache(tmp_path):
+    return ConversionCache(tmp_path / "converted")
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "doc.parsed"
+    path.write_bytes(b"parsed")
+    return path
+
+@pytest.mark.parametrize("format", sorted(WRITERS))
+def test_invalidate_removes_every_writer_output(cache, source, format):
+    output = _store(cache, source, "report.pdf", format)
+    other = _store(cache, source, "report.pdf.tables", format)
+
+    cache.invalidate("report.pdf")
+
+    assert not output.exists()
+    assert cache.lookup(source, output) is None
+    # 이름이 "report.pdf."로 시작하는 다른 문서의 결과는 남아야 함
+    assert other.exists()
+    assert cache.lookup(source, other) == other
+
+def test_size_limit_counts_entries_from_every_process(tmp_path, source):
+    # 작업자 두 개가 같은 디렉토리를 쓰는 경우: 한쪽이 저장한 항목도 다른 쪽의 용량 계산과 삭제 대상에 들어가야 함
+    first = ConversionCache(tmp_path / "converted", max_bytes=10)
+    second = ConversionCache(tmp_path / "converted", max_bytes=10)
+    old = first.cache_dir / "markdown" / "a.pdf.md"
+    old.parent.mkdir(parents=True)
+    old.write_text("x" * 8)
+    first.store(source, old, "a.pdf")
+    new = second.cache_dir / "markdown" / "b.pdf.md"
+    new.write_text("y" * 8)
+
+    second.store(source, new, "b.pdf")
+
+    assert not old.exists()
+    assert first.lookup(source, old) is None
+    assert first.lookup(source, new) == new
+    assert first.stats()["entries"] == second.stats()["entries"] == 1
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from storage.compression import Compressor
+from storage.document_store import DocumentStore
+
+PAGES = [
+    {"page": 1, "text": "1. 서론\n\n첫 문단입니다.\n\n", "hash": "h1"},
+    {"page": 2, "text": "둘째 페이지 본문.\n\n", "hash": "h2"},
+    {"page": 3, "text": "1.2 결론\n\n마지막 문단.", "hash": "h3"},
+]
+TABLES = [{"page": 2, "rows": [["a", "b"]]}, {"page": 9, "rows": [["범위 밖"]]}]
+EQUATIONS = [{"page": 1, "latex": "E=mc^2"}]
+
+@pytest.fixture(params=["gzip", "none"])
+def store(request, tmp_path):
+    return DocumentStore(tmp_path / "store", compressor=Compressor(request.param, dict_dir=tmp_path / "dicts"))
+
+@pytest.fixture
+def saved(store):
+    store.save("report.pdf", {"title": "보고서", "pages": 3}, PAGES, TABLES, EQUATIONS, ["연구"])
+    return store
+
+def test_round_trip(saved):
+    document = saved.load("report.pdf")
+
+    assert document["content"] == "".join(page["text"] for page in PAGES)
+    assert document["metadata"] == {"title": "보고서", "pages": 3}
+    assert document["tags"] == ["연구"]
+    # 범위를 벗어난 페이지 번호의 표는 마지막 페이지에 붙음
+    assert [table["rows"] for table in document["tables"]] == [[["a", "b"]], [["범위 밖"]]]
+    assert document["equations"] == EQUATIONS
+    assert saved.list_documents() == ["report.pdf"]
+
+def test_pages_keep_hashes_and_blocks(saved):
+    pages = list(saved.iter_pages("report.pdf"))
+
+    assert [page["hash"] for page in pages] == ["h1", "h2", "h3"]
+    assert [entry["hash"] for entry in saved.read_header("report.pdf")["pages"]] == ["h1", "h2", "h3"]
+    content = "".join(page["text"] for page in PAGES)
+    first, third = pages[0]["blocks"], pages[2]["blocks"]
+    assert [(block["type"], block.get("level")) for block in first] == [("heading", 1), ("paragraph", None)]
+    assert content[first[1]["start"]:first[1]["end"]] == "첫 문단입니다."
+    # 블록 오프셋은 문서 전체 기준
+    assert content[third[0]["start"]:third[0]["end"]] == "1.2 결론" and third[0]["level"] == 2
+
+def test_iter_pages_reads_only_requested_pages(saved):
+    assert [page["page"] for page in saved.iter_pages("report.pdf", [3, 1])] == [1, 3]
+
+def test_read_page_range(saved):
+    result = saved.read("report.pdf", start_page=2, end_page=3)
+
+    assert result["content"] == PAGES[1]["text"] + PAGES[2]["text"]
+    assert len(result["tables"]) == 2 and result["equations"] == []
+    start = len(PAGES[0]["text"])
+    assert result["range"] == {
+        "start_page": 2, "end_page": 3, "offset": start, "end": start + len(result["content"]),
+        "text_length": sum(len(page["text"]) for page in PAGES), "page_count": 3
+    }
+
+def test_read_character_window_across_pages(saved):
+    content = "".join(page["text"] for page in PAGES)
+    offset = len(PAGES[0]["text"]) - 4
+
+    result = saved.read("report.pdf", fields=["content"], offset=offset, limit=10)
+
+    assert result["content"] == content[offset:offset + 10]
+    assert set(result) == {"content", "range"}
+    assert (result["range"]["start_page"], result["range"]["end_page"]) == (1, 2)
+    assert (result["range"]["offset"], result["range"]["end"]) == (offset, offset + 10)
+
+def test_read_window_past_the_end_and_metadata_only(saved, monkeypatch):
+    text_length = sum(len(page["text"]) for page in PAGES)
+    result = saved.read("report.pdf", offset=text_length + 100, limit=5)
+    assert result["content"] == "" and result["range"]["start_page"] is None
+    assert result["range"]["offset"] == text_length
+
+    # 메타데이터만 요청하면 페이지 청크를 읽지 않음
+    monkeypatch.setattr(saved, "iter_pages", lambda *args: pytest.fail("본문을 읽음"))
+    assert saved.read("report.pdf", fields=["metadata", "tags"])["tags"] == ["연구"]
+
+def test_update_metadata_keeps_pages(saved):
+    content_hash = saved.content_hash("report.pdf")
+
+    saved.update_metadata("report.pdf", {"author": "홍길동"}, tags=["연구", "2024"])
+
+    header = saved.read_header("report.pdf")
+    assert header["metadata"] == {"title": "보고서", "pages": 3, "author": "홍길동"}
+    assert header["tags"] == ["연구", "2024"]
+    assert saved.content_hash("report.pdf") == content_hash
+    assert saved.load("report.pdf")["content"] == "".join(page["text"] for page in PAGES)
+
+    saved.update_metadata("report.pdf", tags=[])
+    assert saved.read_header("report.pdf")["metadata"]["author"] == "홍길동"
+    assert saved.read_header("report.pdf")["tags"] == []
+
+def test_legacy_json_is_read_and_upgraded_on_update(store):
+    legacy = store.root / "old.pdf.json"
+    legacy.write_text(json.dumps({"content": "예전 문서\n\n본문", "metadata": {"title": "예전"}, "tags": ["a"]}))
+
+    assert store.exists("old.pdf")
+    assert store.load("old.pdf")["content"] == "예전 문서\n\n본문"
+
+    store.update_metadata("old.pdf", {"title": "새 제목"})
+
+    assert not legacy.exists()
+    assert store.read_header("old.pdf")["metadata"] == {"title": "새 제목"}
+    assert store.read_header("old.pdf")["tags"] == ["a"]
+    assert store.load("old.pdf")["content"] == "예전 문서\n\n본문"
+
+def test_rename_and_delete(saved):
+    saved.rename("report.pdf", "final.pdf")
+    assert not saved.exists("report.pdf")
+    assert saved.read("final.pdf", fields=["metadata"])["metadata"]["title"] == "보고서"
+
+    saved.delete("final.pdf")
+    assert saved.list_documents() == []
+    with pytest.raises(FileNotFoundError):
+        saved.read_header("final.pdf")
@@ -0,0 +1,168 @@
+import email
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from parsers.grobid_pool import SharedGrobidClient
+
+TEI = (
+    '<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body>'
+    "<p>질량과 에너지의 관계는 다음과 같다.</p>"
+    '<formula coords="2,10,20,30,40">E=mc^2<label>(1)</label></formula>'
+    "</body></text></TEI>"
+)
+
+class GrobidStub:
+    """processFulltextDocument만 흉내 내는 프로세스 안 HTTP 서버. 받은 요청과 동시 요청 수를 기록합니다."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.busy = 0  # 앞으로 503으로 응답할 요청 수
+        self.requests = []
+        self.alive_checks = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.alive_checks += 1
+                self.send_response(200 if self.path == "/api/isalive" else 404)
+                self.send_header("Content-Length", "4")
+                self.end_headers()
+                self.wfile.write(b"true")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with stub._lock:
+                    stub.requests.append({"port": self.client_address[1], "headers": dict(self.headers), "body": body})
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                    busy = stub.busy > 0
+                    stub.busy -= busy
+                time.sleep(stub.delay)
+                with stub._lock:
+                    stub.active -= 1
+                payload = b"busy" if busy else TEI.encode("utf-8")
+                self.send_response(503 if busy else 200)
+                self.send_header("Content-Type", "application/xml")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub():
+    server = GrobidStub()
+    yield server
+    server.close()
+
+def _client(tmp_path, stub: GrobidStub, **config) -> SharedGrobidClient:
+    config_path = tmp_path / "grobid_config.json"
+    config_path.write_text(json.dumps({"grobid": {
+        "concurrency": 2, "batch_size": 10, "max_retries": 2, "sleep_time": 0, "coordinates": ["formula"], **config
+    }}))
+    return SharedGrobidClient(config_path=str(config_path), server=stub.url, cache_dir=tmp_path / "cache")
+
+def _pdf(tmp_path, name: str, content: bytes):
+    path = tmp_path / name
+    path.write_bytes(b"%PDF-1.4\n" + content)
+    return path
+
+def test_extracts_formulas_from_streamed_multipart(tmp_path, stub):
+    client = _client(tmp_path, stub)
+    path = _pdf(tmp_path, "a.pdf", b"x" * 200000)
+
+    formulas = client.extract_formulas(path)
+
+    assert formulas == [{"page": 2, "latex": "E=mc^2", "label": "(1)", "context": "질량과 에너지의 관계는 다음과 같다."}]
+    request = stub.requests[0]
+    message = email.message_from_bytes(
+        f"Content-Type: {request['headers']['Content-Type']}\r\n\r\n".encode() + request["body"]
+    )
+    parts = {part.get_param("name", header="content-disposition"): part for part in message.get_payload()}
+    assert parts["teiCoordinates"].get_payload() == "formula"
+    assert parts["input"].get_payload(decode=True) == path.read_bytes()
+
+def test_reuses_pooled_connections(tmp_path, stub):
+    client = _client(tmp_path, stub)
+    for i in range(3):
+        client.extract_formulas(_pdf(tmp_path, f"{i}.pdf", str(i).encode()))
+
+    assert len(stub.requests) == 3
+    assert len({request["port"] for request in stub.requests}) == 1
+
+def test_batch_respects_concurrency_and_deduplicates(tmp_path):
+    stub = GrobidStub(delay=0.1)
+    try:
+        client = _client(tmp_path, stub)
+        paths = [_pdf(tmp_path, f"{i}.pdf", str(i).encode()) for i in range(4)]
+        paths.append(_pdf(tmp_path, "copy.pdf", b"0"))
+
+        results = client.extract_formulas_batch(paths)
+    finally:
+        stub.close()
+
+    # 같은 내용(0.pdf와 copy.pdf)은 한 번만 제출
+    assert len(stub.requests) == 4
+    assert set(results) == {str(path) for path in paths}
+    assert results[str(paths[-1])] == results[str(paths[0])]
+    assert 1 < stub.max_active <= 2
+    assert len({request["port"] for request in stub.requests}) <= 2
+
+def test_retries_when_server_is_busy(tmp_path, stub):
+    client = _client(tmp_path, stub)
+    stub.busy = 2
+
+    assert len(client.extract_formulas(_pdf(tmp_path, "a.pdf", b"a"))) == 1
+    assert len(stub.requests) == 3
+
+def test_gives_up_after_max_retries(tmp_path, stub):
+    client = _client(tmp_path, stub, max_retries=1)
+    stub.busy = 5
+
+    with pytest.raises(Exception):
+        client.extract_formulas(_pdf(tmp_path, "a.pdf", b"a"))
+    assert len(stub.requests) == 2
+    # 실패한 결과는 캐시하지 않음
+    assert not list((tmp_path / "cache").glob("*.json"))
+
+def test_cache_hits_by_content_hash(tmp_path, stub):
+    client = _client(tmp_path, stub)
+    first = client.extract_formulas(_pdf(tmp_path, "a.pdf", b"same"))
+
+    # 이름이 달라도 내용이 같으면 서버에 다시 묻지 않음 (새 클라이언트도 같은 캐시 디렉토리를 씀)
+    again = _client(tmp_path, stub).extract_formulas(_pdf(tmp_path, "b.pdf", b"same"))
+    batch = client.extract_formulas_batch([tmp_path / "a.pdf"])
+
+    assert again == first == batch[str(tmp_path / "a.pdf")]
+    assert len(stub.requests) == 1
+
+def test_is_alive_is_remembered(tmp_path, stub):
+    client = _client(tmp_path, stub)
+
+    assert client.is_alive() is True
+    assert client.is_alive() is True
+    assert stub.alive_checks == 1
+
+def test_unreachable_server_is_not_alive(tmp_path, stub):
+    client = _client(tmp_path, stub)
+    stub.close()
+
+    assert client.is_alive() is False
@@ -0,0 +1,81 @@
+import os
+import time
+from concurrent.futures import CancelledError
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from extractors import ocr
+
+def _gone(pid: int) -> bool:
+    """종료되어 회수됐거나 좀비 상태인 프로세스"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except FileNotFoundError:
+        return True
+
+@pytest.mark.skipif(not os.path.exists("/proc"), reason="/proc이 있는 시스템에서만 확인")
+def test_kill_terminates_stuck_workers_and_tracks_pending():
+    pool = ocr._OCRPool(1)
+    pid = pool.submit(os.getpid).result(timeout=30)
+    stuck = pool.submit(time.sleep, 60)
+    queued = pool.submit(time.sleep, 60)
+    assert pool.pending == 2
+
+    pool.kill()
+
+    deadline = time.monotonic() + 10
+    while not _gone(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _gone(pid)
+    for future in (stuck, queued):
+        with pytest.raises((BrokenProcessPool, CancelledError)):
+            future.result(timeout=10)
+    assert pool.pending == 0
+
+def test_reset_replaces_the_shared_pool(monkeypatch):
+    monkeypatch.setattr(ocr, "_pool", None)
+    pool = ocr._get_pool()
+    try:
+        assert ocr._get_pool() is pool
+        ocr._reset_pool(pool)
+        assert ocr.pending() == 0
+        fresh = ocr._get_pool()
+        assert fresh is not pool
+        # 이미 바뀐 풀을 다시 버려도 새 풀은 그대로
+        ocr._reset_pool(pool)
+        assert ocr._get_pool() is fresh
+    finally:
+        ocr._reset_pool(ocr._get_pool())
+
+class _Images:
+    pdf_path = "doc.pdf"
+
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+
+    def get(self, pages, dpi, timeout=None):
+        return {page: self.tmp_path / f"page_{page}.png" for page in pages}
+
+def _crash_once(image_path: str, lang: str, timeout: float) -> str:
+    # 처음 실행하면 작업자 프로세스가 죽어 풀이 깨짐
+    marker = image_path + ".crashed"
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return "인식한 텍스트 " * 5
+
+def test_broken_pool_is_replaced_and_page_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr, "_pool", None)
+    monkeypatch.setattr(ocr, "ocr_page", _crash_once)
+    stage = ocr.OCRStage(cache_dir=tmp_path / "cache")
+    pages = [{"page": 1, "text": "", "hash": "h1"}, {"page": 2, "text": "본문 " * 20, "hash": "h2"}]
+
+    try:
+        assert stage.run(pages, _Images(tmp_path)) == [1]
+    finally:
+        ocr._reset_pool(ocr._get_pool())
+
+    assert pages[0]["text"].startswith("인식한 텍스트")
+    assert (tmp_path / "cache" / f"h1_{stage.dpi}_{stage.lang}.txt").exists()
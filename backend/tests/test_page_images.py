@@ -0,0 +1,66 @@
+import os
+import time
+
+from extractors import page_images
+from extractors.page_images import PageImages, prune_page_cache, remove_page_images
+
+def _image(cache_dir, pdf_hash, page, size=100, age=0.0, dpi=200):
+    path = cache_dir / pdf_hash / str(dpi) / f"page_{page}.png"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+def test_prune_removes_expired_then_least_recently_used(tmp_path):
+    expired = _image(tmp_path, "a", 1, age=3600)
+    old = _image(tmp_path, "b", 1, age=60)
+    recent = _image(tmp_path, "b", 2, age=10)
+    newest = _image(tmp_path, "c", 1)
+
+    removed = prune_page_cache(tmp_path, max_bytes=250, max_age=1800)
+
+    assert removed == 2
+    assert not expired.exists() and not old.exists()
+    assert recent.exists() and newest.exists()
+    # 비게 된 문서 디렉토리도 지움
+    assert not (tmp_path / "a").exists()
+
+def test_prune_keeps_images_in_use(tmp_path):
+    in_use = _image(tmp_path, "a", 1, age=60)
+    other = _image(tmp_path, "b", 1)
+
+    prune_page_cache(tmp_path, max_bytes=100, max_age=3600, keep=[in_use])
+
+    assert in_use.exists() and not other.exists()
+
+def test_remove_page_images_drops_one_document(tmp_path):
+    removed = _image(tmp_path, "a", 1)
+    kept = _image(tmp_path, "b", 1)
+
+    remove_page_images("a", tmp_path)
+    remove_page_images(None, tmp_path)
+
+    assert not removed.exists() and kept.exists()
+
+def test_cached_pages_are_not_rendered_again(tmp_path, monkeypatch):
+    cached = _image(tmp_path, "doc", 1, age=600, dpi=300)
+    rendered = []
+
+    class Image:
+        def save(self, path):
+            path.write_bytes(b"png")
+
+    def convert_from_path(path, dpi, first_page, last_page, timeout=None):
+        rendered.append((first_page, dpi))
+        return [Image()]
+
+    monkeypatch.setattr(page_images, "convert_from_path", convert_from_path)
+    images = PageImages(tmp_path / "doc.pdf", "doc", cache_dir=tmp_path)
+
+    assert images.get([1, 2], dpi=300) == {1: cached, 2: tmp_path / "doc" / "300" / "page_2.png"}
+    # 사용 시각 갱신
+    assert cached.stat().st_mtime > time.time() - 60
+    # 다른 단계가 다른 DPI로 요청해도 같은 파싱에서 렌더링한 이미지를 씀
+    assert images.get([1, 2, 3], dpi=200)[2] == tmp_path / "doc" / "300" / "page_2.png"
+    assert rendered == [(2, 300), (3, 200)]
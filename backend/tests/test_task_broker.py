@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from tasks.broker import DEAD, DONE, QUEUED, RUNNING, SQLiteBroker
+from tasks.worker import PermanentTaskError, Worker
+
+# 임대 만료를 기다리는 테스트용 임대 시간(초)
+LEASE = 0.05
+
+@pytest.fixture
+def broker(tmp_path):
+    return SQLiteBroker(tmp_path / "tasks.sqlite3")
+
+def _expire():
+    time.sleep(LEASE * 2)
+
+def test_expired_lease_requeues_then_dead_letters(broker):
+    task_id = broker.enqueue("parse", {"filename": "report.pdf"}, max_attempts=2)
+
+    first = broker.claim("worker-a", ["parse"], LEASE)
+    assert first["id"] == task_id and first["attempts"] == 1
+    _expire()
+
+    # 다음 꺼내기에서 만료된 임대가 풀려 같은 작업을 다시 받음
+    second = broker.claim("worker-b", ["parse"], LEASE)
+    assert second["id"] == task_id and second["attempts"] == 2
+    assert broker.get(task_id)["status"] == RUNNING
+    _expire()
+
+    # max_attempts를 다 쓴 작업은 다시 넣지 않고 실패 처리
+    assert broker.claim("worker-c", ["parse"], LEASE) is None
+    task = broker.get(task_id)
+    assert task["status"] == DEAD
+    assert task["attempts"] == 2
+    assert "worker-b" in task["error"]
+
+def test_stale_token_cannot_ack_or_fail(broker):
+    task_id = broker.enqueue("parse", {"filename": "report.pdf"})
+
+    stale = broker.claim("worker-a", ["parse"], LEASE)
+    _expire()
+    current = broker.claim("worker-b", ["parse"], 60)
+    assert current["id"] == task_id and current["token"] != stale["token"]
+
+    assert broker.ack(task_id, stale["token"], {"ok": False}) is False
+    assert broker.fail(task_id, stale["token"], "late") is None
+    assert broker.heartbeat(task_id, stale["token"], 60) is False
+    assert broker.get(task_id)["status"] == RUNNING
+
+    assert broker.ack(task_id, current["token"], {"ok": True}) is True
+    task = broker.get(task_id)
+    assert task["status"] == DONE
+    assert task["result"] == {"ok": True}
+
+def test_permanent_error_skips_retries(broker):
+    def handler(payload):
+        raise PermanentTaskError("파일 없음")
+
+    task_id = broker.enqueue("parse", {"filename": "missing.pdf"}, max_attempts=3)
+    worker = Worker(broker, {"parse": handler}, name="worker-a", poll=0)
+
+    assert worker.run_once() is True
+    task = broker.get(task_id)
+    assert task["status"] == DEAD
+    assert task["attempts"] == 1
+    assert task["error"].startswith("PermanentTaskError")
+    assert worker.run_once() is False
+
+def test_transient_error_requeues_with_backoff(broker):
+    def handler(payload):
+        raise OSError("일시적인 오류")
+
+    task_id = broker.enqueue("parse", {"filename": "report.pdf"}, max_attempts=3)
+    worker = Worker(broker, {"parse": handler}, name="worker-a", poll=0)
+
+    assert worker.run_once() is True
+    task = broker.get(task_id)
+    assert task["status"] == QUEUED
+    assert task["attempts"] == 1
+    assert task["token"] is None
+    # 재시도 지연 동안은 다시 꺼내지 않음
+    assert task["available_at"] > time.time()
+    assert worker.run_once() is False
+
+def test_failure_on_last_attempt_dead_letters(broker):
+    task_id = broker.enqueue("parse", {"filename": "report.pdf"}, max_attempts=1)
+    task = broker.claim("worker-a", ["parse"], 60)
+
+    assert broker.fail(task_id, task["token"], "OSError: 일시적인 오류") == DEAD
+    assert broker.get(task_id)["status"] == DEAD
+    # 관리자가 다시 넣으면 처음부터 시도
+    assert broker.retry(task_id) is True
+    assert broker.get(task_id)["attempts"] == 0
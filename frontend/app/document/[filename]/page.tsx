@@ -5,6 +5,9 @@ import axios from 'axios';
 import { useParams } from 'next/navigation';
 import toast from 'react-hot-toast';
 
+// 첫 화면과 "더 보기" 한 번에 가져올 본문 길이 (문자 수)
+const CONTENT_WINDOW = 20000;
+
 interface Document {
   filename: string;
   content: string;
@@ -15,9 +18,20 @@ interface Document {
   };
 }
 
+interface DocumentRange {
+  start_page: number | null;
+  end_page: number | null;
+  offset: number;
+  end: number;
+  text_length: number;
+  page_count: number;
+}
+
 export default function DocumentPage() {
   const [document, setDocument] = useState<Document | null>(null);
+  const [range, setRange] = useState<DocumentRange | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const params = useParams();
 
   useEffect(() => {
@@ -26,8 +40,13 @@ export default function DocumentPage() {
 
   const fetchDocument = async () => {
     try {
-      const response = await axios.get(`http://localhost:8008/documents/${params.filename}`);
+      // 메타데이터와 첫 화면 분량의 본문만 요청
+      const response = await axios.get(`http://localhost:8008/documents/${params.filename}`, {
+        params: { fields: ['metadata', 'content'], offset: 0, limit: CONTENT_WINDOW },
+        paramsSerializer: { indexes: null }
+      });
       setDocument(response.data);
+      setRange(response.data.range);
     } catch (error) {
       toast.error('문서를 불러오는 중 오류가 발생했습니다.');
     } finally {
@@ -35,6 +54,23 @@ export default function DocumentPage() {
     }
   };
 
+  const fetchMore = async () => {
+    if (!document || !range) return;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(`http://localhost:8008/documents/${params.filename}`, {
+        params: { fields: ['content'], offset: range.end, limit: CONTENT_WINDOW },
+        paramsSerializer: { indexes: null }
+      });
+      setDocument({ ...document, content: document.content + response.data.content });
+      setRange(response.data.range);
+    } catch (error) {
+      toast.error('문서를 불러오는 중 오류가 발생했습니다.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center">
@@ -65,7 +101,18 @@ export default function DocumentPage() {
         <div className="prose max-w-none">
           {document.content}
         </div>
+        {range && range.end < range.text_length && (
+          <div className="mt-8 text-center">
+            <button
+              onClick={fetchMore}
+              disabled={loadingMore}
+              className="px-4 py-2 bg-blue-500 text-white rounded hover:bg-blue-600 disabled:opacity-50"
+            >
+              {loadingMore ? '불러오는 중...' : '더 보기'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
-} 
\ No newline at end of file
+}
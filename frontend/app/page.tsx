@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import { useRouter } from 'next/navigation';
 import toast from 'react-hot-toast';
@@ -146,6 +146,22 @@ export default function Home() {
     }
   };
 
+  // 검색 결과 발췌문에서 일치 구간(highlights 오프셋)을 강조
+  const renderSnippet = (result: any) => {
+    if (!result.highlights || result.highlights.length === 0) {
+      return result.snippet;
+    }
+    const parts: React.ReactNode[] = [];
+    let position = 0;
+    result.highlights.forEach(([start, end]: [number, number], index: number) => {
+      parts.push(result.snippet.slice(position, start));
+      parts.push(<mark key={index}>{result.snippet.slice(start, end)}</mark>);
+      position = end;
+    });
+    parts.push(result.snippet.slice(position));
+    return parts;
+  };
+
   const handleAdvancedSearch = async () => {
     if (!searchQuery.trim() && !searchFilters.author && !searchFilters.startDate && !searchFilters.endDate && searchFilters.tags.length === 0) {
       setSearchResults([]);
@@ -264,8 +280,10 @@ export default function Home() {
       const response = await axios.get(`${API_BASE_URL}/convert/${filename}?format=${format}`);
       
       // 다운로드 링크 생성
-      const downloadResponse = await axios.get(`${API_BASE_URL}/download/${filename}?format=${format}`);
-      const blob = new Blob([downloadResponse.data.content], { type: 'text/plain' });
+      const downloadResponse = await axios.get(`${API_BASE_URL}/download/${filename}?format=${format}`, {
+        responseType: 'blob'
+      });
+      const blob = downloadResponse.data;
       const url = window.URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = url;
@@ -304,14 +322,16 @@ export default function Home() {
   const handleConvertAll = async (filename: string) => {
     try {
       setConverting(filename);
-      const response = await axios.post(`${API_BASE_URL}/files/${filename}/convert-all`);
+      const response = await axios.post(`${API_BASE_URL}/files/${filename}/convert-all`, null, {
+        responseType: 'blob'
+      });
       
       // ZIP 파일 다운로드
-      const blob = new Blob([response.data.content], { type: 'application/zip' });
+      const blob = new Blob([response.data], { type: 'application/zip' });
       const url = window.URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = url;
-      a.download = response.data.filename;
+      a.download = `${filename}_converted.zip`;
       document.body.appendChild(a);
       a.click();
       document.body.removeChild(a);
@@ -439,7 +459,7 @@ export default function Home() {
                   <p className="text-sm text-gray-500">
                     작성자: {result.author} | 작성일: {result.date}
                   </p>
-                  <p className="mt-2 text-gray-700">{result.snippet}</p>
+                  <p className="mt-2 text-gray-700">{renderSnippet(result)}</p>
                   <div className="mt-4 flex gap-2">
                     <button
                       onClick={() => router.push(`/document/${result.filename}`)}